@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Add the parent directory to sys.path so we can import asgi_app.py
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+# ASGI counterpart of api/index.py; point the vercel.json rewrite here to use it
+from asgi_app import app
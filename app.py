@@ -1,47 +1,307 @@
-from flask import Flask, render_template, request, jsonify, make_response, session, redirect, url_for, flash
+from flask import Flask, render_template, request, jsonify, make_response, session, redirect, url_for, flash, Response, stream_with_context
 import os
+import sys
+import hmac
+import itertools
 import json
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, as_completed
 from functools import wraps
-from fpdf import FPDF
-from supabase import create_client, Client, ClientOptions
 from dotenv import load_dotenv
-import google.generativeai as genai
+from cache import TTLCache
+from resume_repository import (
+    fetch_resume_page, fetch_resume_version, new_version, save_resume_data, save_resumes_batch,
+    update_resume_if_version,
+)
+from write_behind import VersionConflict, WriteBehindBuffer
+from pdf_cache import PDF_RENDER_VERSION, PDFCache, content_key
+from pdf_jobs import JobQueue, JobTimeout, QueueFull, extract_job, render_job
+import pdf_fonts
+from resume_parser import PDF_SUPPORT, extract_pdf_text
+from batch_export import stream_zip, variant_filename
+from bulk_transfer import FORMATS, export_lines, import_lines, iter_lines
+from json_patch import JSONPatchError, apply_json_patch, apply_merge_patch
+from resume_history import ResumeHistory
+from llm_cache import LLMCache, normalize_text
+from jd_preprocess import estimate_tokens, fit_text, prepare_jd
+from resilience import Dependency, Rejected
+import instrumentation
+from instrumentation import phase, record
+import static_assets
 
 load_dotenv()
 
-try:
-    from PyPDF2 import PdfReader
-except ImportError:
-    PdfReader = None
-
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'your_secret_key_here_change_this_in_production')
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
+# Every response carries a Server-Timing header; latency histograms are served at
+# /metrics. PROFILE_SAMPLE_RATE runs that fraction of requests under cProfile.
+instrumentation.init_app(
+    app,
+    sample_rate=float(os.environ.get('PROFILE_SAMPLE_RATE', 0)),
+    profile_dir=os.environ.get('PROFILE_DIR') or None,
+    metrics_token=os.environ.get('METRICS_TOKEN') or None,
+)
+
+# The stylesheet and script are served minified, precompressed and fingerprinted
+# from /assets/ with immutable caching; the larger JSON responses are compressed.
+static_assets.init_app(app, compress_endpoints=('get_resume_data', 'analyze_jd'))
+
 # Supabase Setup
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY")
 
-if GEMINI_API_KEY:
-    genai.configure(api_key=GEMINI_API_KEY)
-
-if SUPABASE_URL and SUPABASE_KEY:
-    supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-else:
-    supabase = None
+if not (SUPABASE_URL and SUPABASE_KEY):
     print("Warning: Supabase credentials not found. Auth and storage will not work.")
 
+# Every outbound call takes a slot from its dependency's guard. Callers beyond
+# the concurrency limit queue briefly, then get 429. A dependency that keeps
+# failing trips its breaker and is answered with 503 right away until it recovers.
+BREAKER_SETTINGS = dict(
+    failure_rate=float(os.environ.get('BREAKER_FAILURE_RATE', 0.5)),
+    min_calls=int(os.environ.get('BREAKER_MIN_CALLS', 10)),
+    window=float(os.environ.get('BREAKER_WINDOW', 30)),
+    open_seconds=float(os.environ.get('BREAKER_OPEN_SECONDS', 15)),
+)
+# Under WSGI every Gemini call holds a request thread while it waits, so only a
+# few are let through. Under asgi_app.py they are coroutines on the event loop,
+# and thousands can be in flight at once.
+GEMINI_LIMITS = {'wsgi': (16, 32), 'asgi': (1000, 2000)}
+
+def gemini_limits(mode):
+    """`(max_concurrent, max_waiting)` for Gemini calls under a serving mode; the env overrides both."""
+    concurrent, waiting = GEMINI_LIMITS[mode]
+    return (int(os.environ.get('GEMINI_MAX_CONCURRENT', concurrent)),
+            int(os.environ.get('GEMINI_MAX_WAITING', waiting)))
+
+gemini_guard = Dependency(
+    'gemini',
+    *gemini_limits('wsgi'),
+    wait_timeout=float(os.environ.get('GEMINI_WAIT_TIMEOUT', 2)),
+    deadline=float(os.environ.get('GEMINI_DEADLINE', 30)),
+    **BREAKER_SETTINGS,
+)
+supabase_guard = Dependency(
+    'supabase',
+    max_concurrent=int(os.environ.get('SUPABASE_MAX_CONCURRENT', 64)),
+    max_waiting=int(os.environ.get('SUPABASE_MAX_WAITING', 128)),
+    wait_timeout=float(os.environ.get('SUPABASE_WAIT_TIMEOUT', 1)),
+    # Enforced by the HTTP client's own timeout
+    deadline=float(os.environ.get('SUPABASE_HTTP_TIMEOUT', 30)),
+    **BREAKER_SETTINGS,
+)
+
+DEPENDENCIES = {'gemini': gemini_guard, 'supabase': supabase_guard}
+BREAKER_STATES = {'closed': 0, 'half_open': 1, 'open': 2}
+instrumentation.register(instrumentation.Gauge(
+    'resume_dependency_breaker_state', 'Circuit breaker state: 0 closed, 1 half-open, 2 open.', ('dependency',),
+    lambda: {(name,): BREAKER_STATES[d.stats()['state']] for name, d in DEPENDENCIES.items()}))
+instrumentation.register(instrumentation.Gauge(
+    'resume_dependency_calls', 'Outbound calls in flight and waiting for a slot.', ('dependency', 'status'),
+    lambda: {(name, key): d.stats()[key] for name, d in DEPENDENCIES.items() for key in ('active', 'waiting')}))
+instrumentation.register(instrumentation.Gauge(
+    'resume_dependency_rejections_total', 'Outbound calls refused to protect the app.', ('dependency', 'reason'),
+    lambda: {(name, reason): d.stats()[f'rejected_{reason}'] for name, d in DEPENDENCIES.items()
+             for reason in ('overloaded', 'open')}, kind='counter'))
+
+def rejected_response(e):
+    return jsonify({'error': str(e)}), e.status, {'Retry-After': str(e.retry_after)}
+
+@app.errorhandler(Rejected)
+def handle_rejected(e):
+    return rejected_response(e)
+
+# The Supabase, Gemini, PDF and NumPy stacks are imported on first use, not at
+# import time: each request needs at most one of them, and every serverless
+# cold start would otherwise pay for all of them.
+_lazy_lock = threading.Lock()
+_supabase = None
+http_client = None
+genai = None
+
+def get_http_client():
+    """The pooled keep-alive HTTP client shared by all per-user Supabase clients."""
+    global http_client
+    with _lazy_lock:
+        if http_client is None:
+            import httpx
+            # Per-user clients share one pooled keep-alive HTTP connection pool instead of
+            # opening a new session (and TLS handshake) on every request.
+            http_client = httpx.Client(
+                timeout=float(os.environ.get('SUPABASE_HTTP_TIMEOUT', 30)),
+                limits=httpx.Limits(
+                    max_connections=int(os.environ.get('SUPABASE_MAX_CONNECTIONS', 100)),
+                    max_keepalive_connections=int(os.environ.get('SUPABASE_MAX_KEEPALIVE', 20)),
+                ),
+                follow_redirects=True,
+            )
+        return http_client
+
+_admin_supabase = None
+
+def get_admin_supabase():
+    """A service-role Supabase client for the admin bulk routes, or None.
+
+    It bypasses row-level security, so it is only ever used behind admin_required.
+    """
+    global _admin_supabase
+    service_key = os.environ.get('SUPABASE_SERVICE_KEY')
+    if not (SUPABASE_URL and service_key):
+        return None
+    http = get_http_client()
+    with _lazy_lock:
+        if _admin_supabase is None:
+            from supabase import ClientOptions, create_client
+            _admin_supabase = create_client(SUPABASE_URL, service_key, options=ClientOptions(httpx_client=http))
+        return _admin_supabase
+
+def get_anon_supabase():
+    """The shared anonymous Supabase client used for auth, or None if unconfigured."""
+    global _supabase
+    if not (SUPABASE_URL and SUPABASE_KEY):
+        return None
+    with _lazy_lock:
+        if _supabase is None:
+            from supabase import create_client
+            _supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+        return _supabase
+
+def gemini_model():
+    """A Gemini model handle; the SDK is imported and configured on first use."""
+    global genai
+    with _lazy_lock:
+        if genai is None:
+            import google.generativeai
+            google.generativeai.configure(api_key=GEMINI_API_KEY)
+            genai = google.generativeai
+    return genai.GenerativeModel(GEMINI_MODEL)
+
+# Authenticated clients keyed by access token. Supabase JWTs expire after an hour
+# by default, so entries never outlive the token they were built for.
+client_cache = TTLCache(
+    maxsize=int(os.environ.get('SUPABASE_CLIENT_CACHE_SIZE', 256)),
+    ttl=int(os.environ.get('SUPABASE_CLIENT_CACHE_TTL', 3600)),
+)
+
+# Stored resumes keyed by user id, as `(data, version)`. Every database write
+# drops the user's entry; the TTL bounds staleness across workers.
+resume_cache = TTLCache(
+    maxsize=int(os.environ.get('RESUME_CACHE_SIZE', 1024)),
+    ttl=int(os.environ.get('RESUME_CACHE_TTL', 300)),
+)
+# Write generation per user. A read only caches what it fetched if no write
+# landed meanwhile, so a save racing a cache miss cannot leave the old
+# document cached until the TTL runs out.
+resume_generations = TTLCache(
+    maxsize=int(os.environ.get('RESUME_CACHE_SIZE', 1024)),
+    ttl=int(os.environ.get('RESUME_CACHE_TTL', 300)) * 2,
+)
+_resume_cache_lock = threading.Lock()
+_generation_counter = itertools.count(1)
+
+def resume_generation(user_id):
+    """Token to take before fetching a resume and hand to `cache_resume`."""
+    return resume_generations.get(user_id)
+
+def cache_resume(user_id, value, generation):
+    """Cache a fetched `(data, version)` unless the user's resume was written since."""
+    with _resume_cache_lock:
+        if resume_generations.get(user_id) == generation:
+            resume_cache.set(user_id, value)
+
+def invalidate_resume(user_id):
+    """Drop the cached resume after a write, and keep reads in flight from caching theirs."""
+    with _resume_cache_lock:
+        resume_generations.set(user_id, next(_generation_counter))
+        resume_cache.pop(user_id)
+
+# Every stored resume is also appended to the user's version history, as a
+# snapshot or a delta from the version before (see resume_history.py).
+RESUME_HISTORY = os.environ.get('RESUME_HISTORY', '1') != '0'
+resume_history = ResumeHistory(
+    max_chain=int(os.environ.get('RESUME_HISTORY_MAX_CHAIN', 50)),
+    snapshot_ratio=float(os.environ.get('RESUME_HISTORY_SNAPSHOT_RATIO', 1.0)),
+    maxsize=int(os.environ.get('RESUME_CACHE_SIZE', 1024)),
+    ttl=int(os.environ.get('RESUME_CACHE_TTL', 300)),
+)
+
+def write_resume(db, user_id, data, version, base=None):
+    """Persist a resume and invalidate the cached copy.
+
+    With a `base` version the row is only replaced while it is still at that
+    version; otherwise VersionConflict is raised.
+    """
+    with supabase_guard.slot(), phase('db-write'):
+        if base is None:
+            save_resume_data(db, user_id, data, version)
+        elif not update_resume_if_version(db, user_id, data, base, version):
+            invalidate_resume(user_id)
+            raise VersionConflict(f"resume of {user_id} is no longer at version {base}")
+    invalidate_resume(user_id)
+    record_history(db, user_id, data, version)
+
+def record_history(db, user_id, data, version):
+    """Add a stored resume to its history; a failure here never fails the save."""
+    if not RESUME_HISTORY:
+        return
+    try:
+        with supabase_guard.slot(), phase('history-write'):
+            resume_history.record(db, user_id, data, version)
+    except Exception as e:
+        print(f"Error recording resume history: {e}")
+
+# Autosaves are buffered per user and written on this cadence (seconds). Vercel
+# freezes functions between requests, so buffering defaults to off there.
+RESUME_FLUSH_INTERVAL = float(os.environ.get('RESUME_FLUSH_INTERVAL', 0 if os.environ.get('VERCEL') else 5))
+save_buffer = WriteBehindBuffer(
+    write_resume,
+    interval=RESUME_FLUSH_INTERVAL,
+    max_attempts=int(os.environ.get('RESUME_FLUSH_MAX_ATTEMPTS', 3)),
+)
+save_buffer.start()
+
 def get_supabase():
     """Get a Supabase client authenticated with the user's token if available."""
-    token = session.get('access_token')
+    return supabase_for_token(session.get('access_token'))
+
+def supabase_for_token(token):
+    """The cached Supabase client for an access token, or the anonymous one."""
     if token and SUPABASE_URL and SUPABASE_KEY:
-        return create_client(
-            SUPABASE_URL, 
-            SUPABASE_KEY, 
-            options=ClientOptions(headers={"Authorization": f"Bearer {token}"})
-        )
-    return supabase
+        client = client_cache.get(token)
+        if client is None:
+            from supabase import ClientOptions, create_client
+            client = create_client(
+                SUPABASE_URL,
+                SUPABASE_KEY,
+                options=ClientOptions(
+                    headers={"Authorization": f"Bearer {token}"},
+                    httpx_client=get_http_client(),
+                )
+            )
+            client_cache.set(token, client)
+        return client
+    return get_anon_supabase()
+
+def load_resume_version(db, user_id):
+    """Read `(data, version)` for a user: pending save, then cache, then database."""
+    pending = save_buffer.get(user_id)
+    if pending:
+        return pending
+    cached = resume_cache.get(user_id)
+    if cached is None:
+        generation = resume_generation(user_id)
+        with supabase_guard.slot(), phase('db-read'):
+            cached = fetch_resume_version(db, user_id)
+        cache_resume(user_id, cached, generation)
+    return cached
+
+def load_resume(db, user_id):
+    """Read a user's resume, preferring a buffered save that is not flushed yet."""
+    return load_resume_version(db, user_id)[0]
 
 def login_required(f):
     @wraps(f)
@@ -51,18 +311,34 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+# The bulk export/import and stats routes are off unless ADMIN_TOKEN is set,
+# and then need `Authorization: Bearer <ADMIN_TOKEN>`.
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN') or None
+
+def admin_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if not ADMIN_TOKEN:
+            return jsonify({'error': 'Not found'}), 404
+        if not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {ADMIN_TOKEN}'):
+            return jsonify({'error': 'Unauthorized'}), 401
+        return f(*args, **kwargs)
+    return decorated_function
+
 @app.route('/signup', methods=['GET', 'POST'])
 def signup():
     if request.method == 'POST':
         email = request.form.get('email')
         password = request.form.get('password')
+        supabase = get_anon_supabase()
         
         if not supabase:
             flash("Supabase not configured.")
             return render_template('signup.html')
 
         try:
-            response = supabase.auth.sign_up({"email": email, "password": password})
+            with supabase_guard.slot():
+                response = supabase.auth.sign_up({"email": email, "password": password})
             if response.user:
                 flash("Signup successful! Please check your email to confirm, or login if auto-confirmed.", "success")
                 return redirect(url_for('login'))
@@ -78,13 +354,15 @@ def login():
     if request.method == 'POST':
         email = request.form.get('email')
         password = request.form.get('password')
+        supabase = get_anon_supabase()
 
         if not supabase:
             flash("Supabase not configured.", "error")
             return render_template('login.html')
 
         try:
-            response = supabase.auth.sign_in_with_password({"email": email, "password": password})
+            with supabase_guard.slot():
+                response = supabase.auth.sign_in_with_password({"email": email, "password": password})
             if response.user:
                 session['user'] = response.user.id
                 session['access_token'] = response.session.access_token
@@ -97,10 +375,17 @@ def login():
 
 @app.route('/logout')
 def logout():
+    user_id = session.get('user')
+    if user_id:
+        save_buffer.flush(user_id)
+    token = session.get('access_token')
+    if token:
+        client_cache.pop(token)
     session.clear()
-    if supabase:
+    # Never created means nobody signed in through this worker
+    if _supabase:
         try:
-            supabase.auth.sign_out()
+            _supabase.auth.sign_out()
         except:
             pass
     return redirect(url_for('login'))
@@ -110,18 +395,21 @@ def logout():
 def index():
     # Fetch user data from Supabase
     user_id = session.get('user')
-    resume_data = {}
+    resume_data, resume_version = {}, None
     db = get_supabase()
     
     if db and user_id:
         try:
-            response = db.table('resumes').select('data').eq('user_id', user_id).execute()
-            if response.data and len(response.data) > 0:
-                resume_data = response.data[0]['data']
+            stored, version = load_resume_version(db, user_id)
+            if stored is not None:
+                # The editor saves against this, so a page rendered from a stale
+                # cache gets a 412 on its first save instead of overwriting
+                resume_data, resume_version = stored, version or content_key(stored)
         except Exception as e:
             print(f"Error fetching resume: {e}")
 
-    return render_template('index.html', resume_data=resume_data)
+    return render_template('index.html', resume_data=resume_data, resume_version=resume_version,
+                           pdf_themes=pdf_fonts.available_themes())
 
 @app.route('/api/save-resume', methods=['POST'])
 @login_required
@@ -134,37 +422,349 @@ def save_resume():
         return jsonify({'error': 'Database not connected'}), 500
 
     try:
-        # Check if record exists
-        existing = db.table('resumes').select('id').eq('user_id', user_id).execute()
-        
-        if existing.data and len(existing.data) > 0:
-            # Update
-            db.table('resumes').update({'data': data, 'updated_at': 'now()'}).eq('user_id', user_id).execute()
-        else:
-            # Insert
-            db.table('resumes').insert({'user_id': user_id, 'data': data}).execute()
-            
-        return jsonify({'success': True})
+        stored, current = load_resume_version(db, user_id)
+        error = save_precondition_failed(stored, current)
+        if error:
+            return error
+        version = new_version()
+        if not save_buffer.put_if(user_id, db, data, current, version):
+            return jsonify({'error': 'Resume has changed'}), 412
+        response = jsonify({'success': True, 'version': version})
+        response.set_etag(version)
+        return response
+    except Rejected as e:
+        return rejected_response(e)
     except Exception as e:
         print(f"Error saving resume: {e}")
         return jsonify({'error': str(e)}), 500
 
+def save_precondition_failed(stored, current):
+    """The 412/428 response for a full save whose If-Match does not fit the stored resume, else None.
+
+    If-Match may only be left out while the user has no resume yet. Rows saved
+    before versioning are matched by the content hash `/api/resume-data` sends.
+    """
+    if request.if_match:
+        if not request.if_match.contains(current or content_key(stored or {})):
+            return jsonify({'error': 'Resume has changed', 'version': current}), 412
+    elif stored is not None:
+        return jsonify({'error': 'If-Match header with the resume version is required'}), 428
+    return None
+
+@app.route('/api/save-resume', methods=['PATCH'])
+@login_required
+def patch_resume():
+    """Apply a JSON Patch or merge patch to the stored resume.
+
+    The client sends the version it last saved in `If-Match`. Stale versions are
+    rejected with 412 and the client falls back to a full save, which checks
+    `If-Match` as well.
+    """
+    user_id = session.get('user')
+    db = get_supabase()
+
+    if not db or not user_id:
+        return jsonify({'error': 'Database not connected'}), 500
+    if not request.if_match:
+        return jsonify({'error': 'If-Match header with the resume version is required'}), 428
+
+    patch = request.get_json(silent=True)
+    if patch is None:
+        return jsonify({'error': 'Invalid patch body'}), 400
+
+    try:
+        pending = save_buffer.get(user_id)
+        data, version = load_resume_version(db, user_id)
+        if data is None:
+            return jsonify({'error': 'No saved resume to patch'}), 404
+        if not version or not request.if_match.contains(version):
+            return jsonify({'error': 'Resume has changed', 'version': version}), 412
+
+        try:
+            if request.mimetype == 'application/merge-patch+json':
+                data = apply_merge_patch(data, patch)
+            else:
+                data = apply_json_patch(data, patch)
+        except JSONPatchError as e:
+            return jsonify({'error': str(e)}), 400
+
+        if pending:
+            stored_version = new_version()
+            if not save_buffer.replace(user_id, db, data, version, stored_version):
+                stored_version = None
+        else:
+            with supabase_guard.slot(), phase('db-write'):
+                stored_version = update_resume_if_version(db, user_id, data, version)
+            invalidate_resume(user_id)
+            if stored_version:
+                record_history(db, user_id, data, stored_version)
+        if stored_version is None:
+            return jsonify({'error': 'Resume has changed'}), 412
+
+        response = jsonify({'success': True, 'version': stored_version})
+        response.set_etag(stored_version)
+        return response
+    except Rejected as e:
+        return rejected_response(e)
+    except Exception as e:
+        print(f"Error patching resume: {e}")
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/resume-data')
 @login_required
 def get_resume_data():
     # This endpoint might be redundant if we pass data in index(), but keeping for compatibility
     user_id = session.get('user')
-    resume_data = {}
+    resume_data, version = {}, None
     db = get_supabase()
     if db and user_id:
         try:
-            response = db.table('resumes').select('data').eq('user_id', user_id).execute()
-            if response.data:
-                resume_data = response.data[0]['data']
-        except:
-            pass
-    return jsonify(resume_data)
+            resume_data, version = load_resume_version(db, user_id)
+            resume_data = resume_data or {}
+        except Rejected as e:
+            # An empty resume here would look like a real one to the editor
+            return rejected_response(e)
+        except Exception as e:
+            print(f"Error fetching resume: {e}")
+    return resume_data_response(resume_data, version)
+
+def resume_data_response(resume_data, version):
+    response = jsonify(resume_data)
+    # Rows saved before versioning have no version; fall back to a content hash
+    response.set_etag(version or content_key(resume_data))
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
+@app.route('/api/resume-history')
+@login_required
+def list_resume_history():
+    """Saved versions, newest first; page with `?before=<seq>&limit=<n>`."""
+    user_id = session.get('user')
+    db = get_supabase()
 
+    if not RESUME_HISTORY:
+        return jsonify({'error': 'Resume history is disabled'}), 404
+    if not db or not user_id:
+        return jsonify({'error': 'Database not connected'}), 500
+    before = request.args.get('before', type=int)
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    try:
+        with supabase_guard.slot(), phase('history-read'):
+            versions = resume_history.versions(db, user_id, before=before, limit=limit)
+        return jsonify({
+            'versions': versions,
+            'next_before': versions[-1]['seq'] if len(versions) == limit else None,
+        })
+    except Rejected as e:
+        return rejected_response(e)
+    except Exception as e:
+        print(f"Error listing resume history: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/resume-history/<int:seq>')
+@login_required
+def get_resume_history_version(seq):
+    user_id = session.get('user')
+    db = get_supabase()
+
+    if not RESUME_HISTORY:
+        return jsonify({'error': 'Resume history is disabled'}), 404
+    if not db or not user_id:
+        return jsonify({'error': 'Database not connected'}), 500
+    try:
+        with supabase_guard.slot(), phase('history-read'):
+            data, version = resume_history.load(db, user_id, seq)
+        if data is None:
+            return jsonify({'error': 'No such version'}), 404
+        response = jsonify({'seq': seq, 'version': version, 'data': data})
+        # A history entry never changes
+        response.headers['Cache-Control'] = 'private, max-age=86400'
+        return response
+    except Rejected as e:
+        return rejected_response(e)
+    except Exception as e:
+        print(f"Error loading resume version: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/resume-history/diff')
+@login_required
+def diff_resume_history():
+    """JSON Patch from version `?from=<seq>` to `?to=<seq>`."""
+    user_id = session.get('user')
+    db = get_supabase()
+
+    if not RESUME_HISTORY:
+        return jsonify({'error': 'Resume history is disabled'}), 404
+    if not db or not user_id:
+        return jsonify({'error': 'Database not connected'}), 500
+    from_seq = request.args.get('from', type=int)
+    to_seq = request.args.get('to', type=int)
+    if from_seq is None or to_seq is None:
+        return jsonify({'error': 'Both from and to versions are required'}), 400
+    try:
+        with supabase_guard.slot(), phase('history-read'):
+            ops = resume_history.diff(db, user_id, from_seq, to_seq)
+        if ops is None:
+            return jsonify({'error': 'No such version'}), 404
+        return jsonify({'from': from_seq, 'to': to_seq, 'ops': ops})
+    except Rejected as e:
+        return rejected_response(e)
+    except Exception as e:
+        print(f"Error diffing resume versions: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/resume-history/<int:seq>/restore', methods=['POST'])
+@login_required
+def restore_resume_version(seq):
+    """Save an earlier version as the current resume; it becomes a new version."""
+    user_id = session.get('user')
+    db = get_supabase()
+
+    if not RESUME_HISTORY:
+        return jsonify({'error': 'Resume history is disabled'}), 404
+    if not db or not user_id:
+        return jsonify({'error': 'Database not connected'}), 500
+    try:
+        with supabase_guard.slot(), phase('history-read'):
+            data, _ = resume_history.load(db, user_id, seq)
+        if data is None:
+            return jsonify({'error': 'No such version'}), 404
+        # Written through, like a PDF download, so the next read sees it
+        version = new_version()
+        save_buffer.put(user_id, db, data, version)
+        save_buffer.flush(user_id)
+        response = jsonify({'success': True, 'version': version, 'data': data})
+        response.set_etag(version)
+        return response
+    except Rejected as e:
+        return rejected_response(e)
+    except Exception as e:
+        print(f"Error restoring resume version: {e}")
+        return jsonify({'error': str(e)}), 500
+
+BULK_PAGE_SIZE = int(os.environ.get('BULK_PAGE_SIZE', 1000))
+BULK_BATCH_SIZE = int(os.environ.get('BULK_BATCH_SIZE', 500))
+BULK_CONCURRENCY = int(os.environ.get('BULK_CONCURRENCY', 4))
+# Imports are streamed, so they get their own cap instead of MAX_CONTENT_LENGTH
+BULK_IMPORT_MAX_MB = int(os.environ.get('BULK_IMPORT_MAX_MB', 4096))
+
+@app.route('/api/admin/resumes/export')
+@admin_required
+def export_resumes():
+    """Stream every resume as NDJSON (`?format=ndjson|jsonresume`)."""
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in FORMATS:
+        return jsonify({'error': f'Unknown format; use one of {", ".join(FORMATS)}'}), 400
+    db = get_admin_supabase()
+    if not db:
+        return jsonify({'error': 'SUPABASE_SERVICE_KEY is not configured'}), 500
+
+    def fetch_page(after, limit):
+        with supabase_guard.slot(), phase('db-read'):
+            return fetch_resume_page(db, after=after, limit=limit)
+
+    page_size = min(max(request.args.get('page_size', BULK_PAGE_SIZE, type=int), 1), 5000)
+    response = Response(stream_with_context(export_lines(fetch_page, fmt, page_size)),
+                        mimetype='application/x-ndjson')
+    response.headers['Content-Disposition'] = f'attachment; filename=resumes-{fmt}.ndjson'
+    return response
+
+@app.route('/api/admin/resumes/import', methods=['POST'])
+@admin_required
+def import_resumes():
+    """Upsert resumes from an NDJSON body, read as it arrives.
+
+    Imported documents get new versions but are not added to the version history.
+    """
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in FORMATS:
+        return jsonify({'error': f'Unknown format; use one of {", ".join(FORMATS)}'}), 400
+    db = get_admin_supabase()
+    if not db:
+        return jsonify({'error': 'SUPABASE_SERVICE_KEY is not configured'}), 500
+    request.max_content_length = BULK_IMPORT_MAX_MB * 1024 * 1024
+    # Raises 413 up front when Content-Length is over the cap
+    stream = request.stream
+
+    def write_batch(rows):
+        # A buffered save flushed after this batch would overwrite the import
+        save_buffer.discard([row['user_id'] for row in rows])
+        with supabase_guard.slot(), phase('db-write'):
+            save_resumes_batch(db, rows)
+        for row in rows:
+            invalidate_resume(row['user_id'])
+
+    try:
+        summary = import_lines(iter_lines(stream), write_batch, fmt=fmt,
+                               batch_size=BULK_BATCH_SIZE, concurrency=BULK_CONCURRENCY)
+    except Exception as e:
+        print(f"Error importing resumes: {e}")
+        return jsonify({'error': str(e)}), 500
+    return jsonify(summary)
+
+@app.route('/api/cache-stats')
+@admin_required
+def cache_stats():
+    return jsonify({
+        'supabase_clients': client_cache.stats(),
+        'resume_writes': save_buffer.stats(),
+        'resumes': resume_cache.stats(),
+        'pdf_renders': pdf_cache.stats(),
+        # Only reported once a render has loaded the layout engine
+        'pdf_fragments': sys.modules['pdf_layout'].fragment_cache.stats() if 'pdf_layout' in sys.modules else None,
+        # This process only; each PDF pool worker loads fonts of its own
+        'pdf_fonts': pdf_fonts.stats(),
+        'pdf_jobs': pdf_jobs.stats(),
+        'jd_analysis': jd_cache.stats(),
+        'resume_history': resume_history.stats(),
+    })
+
+@app.route('/api/dependencies')
+@admin_required
+def dependency_stats():
+    """Breaker state, concurrency and wait queues of every outbound dependency."""
+    return jsonify({
+        **{name: guard.stats() for name, guard in DEPENDENCIES.items()},
+        'pdf_jobs': pdf_jobs.stats(),
+    })
+
+
+# Caps on PDF text extraction; contact details live on the first pages. A JD is
+# read up to JD_MAX_CHARS characters, then cleaned up and packed into about
+# JD_TOKEN_BUDGET tokens for the model
+UPLOAD_MAX_PAGES = int(os.environ.get('UPLOAD_MAX_PAGES', 10))
+JD_MAX_PAGES = int(os.environ.get('JD_MAX_PAGES', 10))
+JD_MAX_CHARS = int(os.environ.get('JD_MAX_CHARS', 30000))
+JD_TOKEN_BUDGET = int(os.environ.get('JD_TOKEN_BUDGET', 1500))
+
+# Popular job postings are analysed once and then served from cache. Answers are
+# keyed on the normalized JD, the model and the prompt version, so bump
+# JD_PROMPT_VERSION whenever the analysis prompt changes.
+GEMINI_MODEL = os.environ.get('GEMINI_MODEL', 'gemini-2.5-flash')
+JD_PROMPT_VERSION = 2
+jd_cache = LLMCache(
+    maxsize=int(os.environ.get('JD_CACHE_SIZE', 512)),
+    ttl=int(os.environ.get('JD_CACHE_TTL', 7 * 24 * 3600)),
+    path=os.environ.get('JD_CACHE_PATH', os.path.join(tempfile.gettempdir(), 'resume-builder-jd-cache.sqlite3')) or None,
+)
+
+prompt_tokens = instrumentation.Counter(
+    'resume_prompt_tokens_total', 'Estimated prompt input tokens kept or trimmed before Gemini.',
+    ('prompt', 'status'))
+instrumentation.register(prompt_tokens)
+
+def report_prompt_tokens(prompt, tokens_in, tokens_out, seconds):
+    """Count the tokens a prompt's input kept and lost; shown in Server-Timing as `<prompt>-prep`."""
+    prompt_tokens.inc(prompt, 'kept', amount=tokens_out)
+    prompt_tokens.inc(prompt, 'trimmed', amount=tokens_in - tokens_out)
+    record(f'{prompt}-prep', seconds, f'{tokens_in - tokens_out} of {tokens_in} tokens trimmed')
+
+def prepare_jd_text(text):
+    """The JD as the model gets it: boilerplate removed, packed into JD_TOKEN_BUDGET."""
+    start = time.perf_counter()
+    prepared = prepare_jd(text[:JD_MAX_CHARS], JD_TOKEN_BUDGET)
+    report_prompt_tokens('jd', prepared['tokens_in'], prepared['tokens_out'], time.perf_counter() - start)
+    return prepared['text']
 
 @app.route('/upload-pdf', methods=['POST'])
 @login_required
@@ -180,335 +780,246 @@ def upload_pdf():
     if not file.filename.lower().endswith('.pdf'):
         return jsonify({'error': 'File must be a PDF'}), 400
     
-    try:
-        # Read PDF and extract text
-        if PdfReader is None:
-            return jsonify({'error': 'PDF processing not available. Install PyPDF2.'}), 500
-        
-        pdf_reader = PdfReader(file)
-        text = ''
-        
-        # Extract text from all pages
-        for page in pdf_reader.pages:
-            text += page.extract_text() + '\n'
-        
-        # Parse the extracted text to find contact information
-        extracted_data = parse_resume_text(text)
+    if not PDF_SUPPORT:
+        return jsonify({'error': 'PDF processing not available. Install PyPDF2.'}), 500
 
+    try:
+        pdf_bytes = file.read()
         # Do not use global state or file system for user data
         # Just return the extracted data to the frontend
-        
+        with phase('pdf-extract'):
+            extracted_data = pdf_jobs.run(extract_job, pdf_bytes, UPLOAD_MAX_PAGES, size=len(pdf_bytes))
         return jsonify(extracted_data)
-    
+
+    except QueueFull:
+        return jsonify({'error': 'Server is busy processing PDFs. Please try again shortly.'}), 503, {'Retry-After': '5'}
+    except JobTimeout:
+        return jsonify({'error': 'Processing the PDF took too long'}), 504
     except Exception as e:
         print(f"Error processing PDF: {str(e)}")
         return jsonify({'error': f'Error processing PDF: {str(e)}'}), 500
 
-def parse_resume_text(text):
-    """Parse resume text and extract key information"""
-    data = {
-        'name': '',
-        'email': '',
-        'phone': '',
-        'location': '',
-        'linkedin': '',
-        'github': '',
-        'portfolio': '',
-        'summary': ''
-    }
-    
-    lines = text.split('\n')
-    
-    # Extract information from lines
-    for i, line in enumerate(lines):
-        line = line.strip()
-        
-        # Email extraction
-        if '@' in line and ('.' in line or 'gmail' in line.lower() or 'yahoo' in line.lower()):
-            if not data['email']:
-                data['email'] = line.split()[0] if ' ' in line else line
-        
-        # Phone extraction
-        if ('+' in line or '-' in line) and any(c.isdigit() for c in line):
-            if len(line) < 20 and any(c.isdigit() for c in line):
-                if not data['phone']:
-                    data['phone'] = line
-        
-        # LinkedIn extraction
-        if 'linkedin' in line.lower():
-            if not data['linkedin']:
-                data['linkedin'] = line.strip()
-        
-        # GitHub extraction
-        if 'github' in line.lower():
-            if not data['github']:
-                data['github'] = line.strip()
-        
-        # Portfolio extraction
-        if 'portfolio' in line.lower() or 'website' in line.lower():
-            if not data['portfolio']:
-                data['portfolio'] = line.strip()
-        
-        # Try to extract name from first non-empty line if no name yet
-        if not data['name'] and i < 5 and len(line) > 2 and len(line) < 100:
-            if not any(c.isdigit() for c in line) and '@' not in line and '+' not in line:
-                data['name'] = line
-    
-    return data
-
-def sanitize_text(text):
-    if not text:
-        return ""
-    replacements = {
-        '\u2013': '-',
-        '\u2014': '--',
-        '\u2018': "'",
-        '\u2019': "'",
-        '\u201c': '"',
-        '\u201d': '"',
-        '\u2022': '*',
-        '\u2026': '...',
-        '\u00a0': ' '
-    }
-    for char, replacement in replacements.items():
-        text = text.replace(char, replacement)
-    
-    # Final safety net: encode to latin-1, replacing errors with '?'
-    return text.encode('latin-1', 'replace').decode('latin-1')
-
-def recursive_sanitize(obj):
-    if isinstance(obj, dict):
-        return {k: recursive_sanitize(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [recursive_sanitize(i) for i in obj]
-    elif isinstance(obj, str):
-        return sanitize_text(obj)
-    else:
-        return obj
-
-class PDF(FPDF):
-    def header(self):
-        pass  # We'll handle the header manually in the body to control data
-
-    def footer(self):
-        self.set_y(-15)
-        self.set_font('Arial', 'I', 8)
-        self.set_text_color(128, 128, 128)
-        self.cell(0, 10, 'Page ' + str(self.page_no()) + '/{nb}', 0, 0, 'C')
-
-    def section_title(self, title):
-        self.ln(5)
-        self.set_font('Arial', 'B', 14)
-        self.set_text_color(35, 76, 106)  # Secondary Color
-        self.cell(0, 10, title, 0, 1, 'L')
-        self.set_draw_color(69, 104, 130)  # Accent Color
-        self.line(10, self.get_y(), 200, self.get_y())
-        self.ln(2)
-
-    def chapter_body(self, body):
-        self.set_font('Arial', '', 10)
-        self.set_text_color(0, 0, 0)
-        self.multi_cell(0, 5, body)
-        self.ln()
+# CPU-bound PDF work runs in a process pool. Vercel functions cannot fork
+# reliably, so everything runs inline there unless PDF_WORKERS is set.
+pdf_jobs = JobQueue(
+    workers=int(os.environ.get('PDF_WORKERS', 0 if os.environ.get('VERCEL') else min(4, os.cpu_count() or 1))),
+    max_pending=int(os.environ.get('PDF_MAX_PENDING', 32)),
+    timeout=float(os.environ.get('PDF_JOB_TIMEOUT', 30)),
+    sync_max_bytes=int(os.environ.get('PDF_SYNC_MAX_BYTES', 1024)),
+)
+
+pdf_cache = PDFCache(
+    maxsize=int(os.environ.get('PDF_CACHE_SIZE', 256)),
+    maxbytes=int(os.environ.get('PDF_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+    directory=os.environ.get('PDF_CACHE_DIR') or None,
+    disk_maxbytes=int(os.environ.get('PDF_CACHE_DIR_MAX_BYTES', 1024 * 1024 * 1024)),
+    disk_ttl=int(os.environ.get('PDF_CACHE_DIR_TTL', 30 * 86400)),
+)
+
+def pdf_render_key(data, *parts):
+    """Cache key and ETag of a rendered resume; raises ValueError for an unknown theme."""
+    return content_key(data, PDF_RENDER_VERSION, pdf_fonts.resolve_theme(data.get('theme')), *parts)
 
 @app.route('/generate-pdf', methods=['POST'])
 @login_required
 def generate_pdf():
     try:
         data = request.json
+        try:
+            key = pdf_render_key(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         # Save data to database before generating PDF
         user_id = session.get('user')
         db = get_supabase()
         if db and user_id:
             try:
-                # Check if record exists
-                existing = db.table('resumes').select('id').eq('user_id', user_id).execute()
-                
-                if existing.data and len(existing.data) > 0:
-                    # Update
-                    db.table('resumes').update({'data': data, 'updated_at': 'now()'}).eq('user_id', user_id).execute()
-                else:
-                    # Insert
-                    db.table('resumes').insert({'user_id': user_id, 'data': data}).execute()
+                # The download should match what is stored, so flush right away
+                with phase('save'):
+                    save_buffer.put(user_id, db, data, new_version())
+                    save_buffer.flush(user_id)
             except Exception as e:
                 print(f"Error saving resume during generation: {e}")
 
-        # Sanitize data to prevent UnicodeEncodeError
-        data = recursive_sanitize(data)
-        
-        pdf = PDF()
-        pdf.alias_nb_pages()
-        pdf.add_page()
-        
-        # Colors
-        primary_color = (27, 60, 83)
-        secondary_color = (35, 76, 106)
-        accent_color = (69, 104, 130)
-
-        # Header Section
-        pdf.set_fill_color(*primary_color)
-        # Draw a larger rectangle to accommodate potential wrapping
-        pdf.rect(0, 0, 210, 50, 'F')
-        
-        pdf.set_y(10)
-        pdf.set_font('Arial', 'B', 24)
-        pdf.set_text_color(255, 255, 255)
-        pdf.cell(0, 10, data.get('personal', {}).get('fullName', 'Your Name'), 0, 1, 'C')
-        
-        pdf.set_font('Arial', '', 10)
-        contact_info = []
-        p = data.get('personal', {})
-        if p.get('email'): contact_info.append(p['email'])
-        if p.get('phone'): contact_info.append(p['phone'])
-        if p.get('location'): contact_info.append(p['location'])
-        
-        # Use multi_cell for contact info to prevent truncation
-        pdf.set_x(10) # Ensure we start from left margin
-        pdf.multi_cell(190, 6, ' | '.join(contact_info), align='C')
-        
-        links = []
-        if p.get('linkedin'): links.append(f"LinkedIn: {p['linkedin']}")
-        if p.get('github'): links.append(f"GitHub: {p['github']}")
-        if p.get('portfolio'): links.append(f"Portfolio: {p['portfolio']}")
-        
-        if links:
-            pdf.set_font('Arial', '', 9) # Slightly smaller font for links
-            # Use multi_cell to wrap long lines of links
-            pdf.set_x(10) # Ensure we start from left margin
-            pdf.multi_cell(190, 6, ' | '.join(links), align='C')
-
-        # Reset Y to ensure content starts after the header background
-        pdf.set_y(55)
-
-        # Summary
-        if data.get('summary'):
-            pdf.section_title('Professional Summary')
-            pdf.set_font('Arial', '', 10)
-            pdf.set_text_color(50, 50, 50)
-            pdf.multi_cell(0, 5, data['summary'])
-
-        # Skills
-        if data.get('skills'):
-            pdf.section_title('Skills')
-            for skill in data['skills']:
-                if skill.get('category') and skill.get('items'):
-                    pdf.set_font('Arial', 'B', 10)
-                    pdf.set_text_color(*secondary_color)
-                    pdf.write(5, f"{skill['category']}: ")
-                    pdf.set_font('Arial', '', 10)
-                    pdf.set_text_color(0, 0, 0)
-                    pdf.write(5, skill['items'])
-                    pdf.ln(6)
-
-        # Experience
-        if data.get('experience'):
-            pdf.section_title('Experience')
-            for exp in data['experience']:
-                pdf.set_font('Arial', 'B', 11)
-                pdf.set_text_color(*primary_color)
-                pdf.cell(130, 6, exp.get('title', ''), 0, 0)
-                pdf.set_font('Arial', 'I', 10)
-                pdf.set_text_color(100, 100, 100)
-                pdf.cell(0, 6, f"{exp.get('startDate', '')} - {exp.get('endDate', '')}", 0, 1, 'R')
-                
-                pdf.set_font('Arial', 'B', 10)
-                pdf.set_text_color(*secondary_color)
-                pdf.cell(0, 5, f"{exp.get('company', '')} | {exp.get('location', '')}", 0, 1)
-                
-                if exp.get('description'):
-                    pdf.set_font('Arial', '', 10)
-                    pdf.set_text_color(50, 50, 50)
-                    pdf.multi_cell(0, 5, exp['description'])
-                pdf.ln(3)
-
-        # Education
-        if data.get('education'):
-            pdf.section_title('Education')
-            for edu in data['education']:
-                pdf.set_font('Arial', 'B', 11)
-                pdf.set_text_color(*primary_color)
-                pdf.cell(140, 6, edu.get('degree', ''), 0, 0)
-                pdf.set_font('Arial', 'I', 10)
-                pdf.set_text_color(100, 100, 100)
-                pdf.cell(0, 6, edu.get('year', ''), 0, 1, 'R')
-                
-                pdf.set_font('Arial', '', 10)
-                pdf.set_text_color(*secondary_color)
-                pdf.cell(0, 5, edu.get('university', ''), 0, 1)
-                if edu.get('cgpa'):
-                    pdf.set_font('Arial', 'I', 9)
-                    pdf.cell(0, 5, f"CGPA/GPA: {edu['cgpa']}", 0, 1)
-                pdf.ln(2)
-
-        # Projects
-        if data.get('projects'):
-            pdf.section_title('Projects')
-            for proj in data['projects']:
-                pdf.set_font('Arial', 'B', 11)
-                pdf.set_text_color(*primary_color)
-                pdf.cell(0, 6, proj.get('title', ''), 0, 1)
-                
-                if proj.get('techStack'):
-                    pdf.set_font('Arial', 'I', 9)
-                    pdf.set_text_color(*accent_color)
-                    pdf.cell(0, 5, f"Tech Stack: {proj['techStack']}", 0, 1)
-                
-                if proj.get('description'):
-                    pdf.set_font('Arial', '', 10)
-                    pdf.set_text_color(50, 50, 50)
-                    pdf.multi_cell(0, 5, proj['description'])
-                pdf.ln(3)
-
-        # Certifications
-        if data.get('certifications'):
-            pdf.section_title('Certifications')
-            for cert in data['certifications']:
-                pdf.set_font('Arial', 'B', 10)
-                pdf.set_text_color(*primary_color)
-                
-                # Add clickable link if URL is provided
-                cert_name = cert.get('name', '')
-                cert_link = cert.get('link', '').strip()
-                
-                if cert_link and (cert_link.startswith('http://') or cert_link.startswith('https://')):
-                    # Add as clickable link
-                    pdf.cell(140, 5, cert_name, 0, 0, link=cert_link)
-                else:
-                    # Add as regular text
-                    pdf.cell(140, 5, cert_name, 0, 0)
-                
-                pdf.set_font('Arial', 'I', 9)
-                pdf.set_text_color(100, 100, 100)
-                pdf.cell(0, 5, cert.get('date', ''), 0, 1, 'R')
-                
-                pdf.set_font('Arial', '', 9)
-                pdf.set_text_color(*secondary_color)
-                pdf.cell(0, 5, cert.get('organization', ''), 0, 1)
-                pdf.ln(2)
-
-        # Output PDF
-        try:
-            # Try fpdf2 style first (returns bytearray)
-            pdf_content = pdf.output()
-            if isinstance(pdf_content, str):
-                # Fallback for older fpdf (returns string)
-                pdf_content = pdf_content.encode('latin-1')
-            elif isinstance(pdf_content, bytearray):
-                pdf_content = bytes(pdf_content)
-        except TypeError:
-            # Fallback if arguments are required (older versions)
-            pdf_content = pdf.output(dest='S').encode('latin-1')
-
-        response = make_response(bytes(pdf_content))
+        # Text is sanitized for the theme's fonts while laying out each section
+        if request.if_none_match.contains(key):
+            response = make_response('', 304)
+            response.set_etag(key)
+            return response
+
+        timings = []
+        pdf_content = pdf_cache.get(key)
+        if pdf_content is None:
+            with phase('render'):
+                pdf_content, timings = pdf_jobs.run(render_job, data, size=len(request.data))
+            pdf_cache.set(key, pdf_content)
+        # Measured inside the renderer, which may be a pool process
+        for name, seconds, cached in timings:
+            record(f'pdf-{name}', seconds, 'cached' if cached else None)
+
+        response = make_response(pdf_content)
+        response.set_etag(key)
         response.headers['Content-Type'] = 'application/pdf'
         response.headers['Content-Disposition'] = 'attachment; filename=resume.pdf'
         return response
 
+    except QueueFull:
+        return jsonify({'error': 'Server is busy generating PDFs. Please try again shortly.'}), 503, {'Retry-After': '5'}
+    except JobTimeout:
+        return jsonify({'error': 'PDF generation took too long'}), 504
     except Exception as e:
         print(f"PDF Generation Error: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+BATCH_MAX_VARIANTS = int(os.environ.get('BATCH_MAX_VARIANTS', 20))
+
+@app.route('/api/export-batch', methods=['POST'])
+@login_required
+def export_batch():
+    """Render several resume variants in parallel and stream them as a ZIP.
+
+    Body: {"base": {...}, "variants": [{"name": "...", "overrides": {...},
+    "section_order": [...]} | {"name": "...", "data": {...}}]}. Overrides are
+    merge patches applied to the base resume.
+    """
+    payload = request.get_json(silent=True) or {}
+    variants = payload.get('variants')
+    if not isinstance(variants, list) or not variants:
+        return jsonify({'error': 'At least one variant is required'}), 400
+    if len(variants) > min(BATCH_MAX_VARIANTS, pdf_jobs.max_pending):
+        return jsonify({'error': f'At most {min(BATCH_MAX_VARIANTS, pdf_jobs.max_pending)} variants per batch'}), 400
+
+    base = payload.get('base') or {}
+    if not isinstance(base, dict):
+        return jsonify({'error': 'base must be an object'}), 400
+
+    # Check every variant before starting any render
+    renders = []
+    for i, variant in enumerate(variants):
+        if not isinstance(variant, dict):
+            return jsonify({'error': f'Variant {i + 1} must be an object'}), 400
+        if 'data' in variant:
+            data = variant['data']
+            if not isinstance(data, dict):
+                return jsonify({'error': f'Variant {i + 1}: data must be an object'}), 400
+        else:
+            overrides = variant.get('overrides') or {}
+            if not isinstance(overrides, dict):
+                return jsonify({'error': f'Variant {i + 1}: overrides must be an object'}), 400
+            data = apply_merge_patch(base, overrides)
+        order = variant.get('section_order')
+        if order is not None and not (isinstance(order, list) and all(isinstance(name, str) for name in order)):
+            return jsonify({'error': f'Variant {i + 1}: section_order must be a list of section names'}), 400
+        order = order or None
+        try:
+            key = pdf_render_key(data, *(order or ()))
+        except ValueError as e:
+            return jsonify({'error': f'Variant {i + 1}: {e}'}), 400
+        renders.append((variant, data, order, key))
+
+    cached = [pdf_cache.get(key) for _, _, _, key in renders]
+    try:
+        # The whole batch gets queue slots or none does, so a busy server
+        # never keeps rendering variants of a request it turned away
+        queued = iter(pdf_jobs.start_all(
+            [(render_job, (data, order)) for (_, data, order, _), pdf in zip(renders, cached) if pdf is None],
+            size=len(request.data),
+        ))
+    except QueueFull:
+        return jsonify({'error': 'Server is busy generating PDFs. Please try again shortly.'}), 503, {'Retry-After': '5'}
+    futures = {}
+    names = set()
+    for i, ((variant, _, _, key), pdf) in enumerate(zip(renders, cached)):
+        if pdf is None:
+            future = next(queued)
+        else:
+            future = Future()
+            future.set_result((pdf, []))
+        futures[future] = (variant_filename(variant.get('name'), i, names), key)
+
+    def finished_files():
+        try:
+            for future in as_completed(futures, timeout=pdf_jobs.timeout * len(futures)):
+                filename, key = futures[future]
+                try:
+                    pdf_content = future.result()[0]
+                    pdf_cache.set(key, pdf_content)
+                    yield filename, pdf_content
+                except Exception as e:
+                    yield filename[:-4] + '.error.txt', f'Rendering failed: {e}'
+        except JobTimeout:
+            yield 'errors.txt', 'Some variants took too long to render and were skipped.'
+
+    response = Response(stream_with_context(stream_zip(finished_files())), mimetype='application/zip')
+    response.headers['Content-Disposition'] = 'attachment; filename=resumes.zip'
+    return response
+
+@app.route('/api/jobs/render-pdf', methods=['POST'])
+@login_required
+def submit_render_job():
+    """Queue a PDF render and return a job id to poll."""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Resume data required'}), 400
+    try:
+        pdf_fonts.resolve_theme(data.get('theme'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        job_id = pdf_jobs.submit(session['user'], 'render-pdf', render_job, data, size=len(request.data))
+    except QueueFull:
+        return jsonify({'error': 'Too many PDF jobs queued'}), 503, {'Retry-After': '5'}
+    return jsonify({'job_id': job_id, 'status_url': url_for('job_status', job_id=job_id)}), 202
+
+@app.route('/api/jobs/extract-pdf', methods=['POST'])
+@login_required
+def submit_extract_job():
+    """Queue text extraction for an uploaded resume PDF."""
+    file = request.files.get('pdf')
+    if not file or not file.filename.lower().endswith('.pdf'):
+        return jsonify({'error': 'A PDF file is required'}), 400
+    if not PDF_SUPPORT:
+        return jsonify({'error': 'PDF processing not available. Install PyPDF2.'}), 500
+    pdf_bytes = file.read()
+    try:
+        job_id = pdf_jobs.submit(session['user'], 'extract-pdf', extract_job, pdf_bytes, UPLOAD_MAX_PAGES,
+                                 size=len(pdf_bytes))
+    except QueueFull:
+        return jsonify({'error': 'Too many PDF jobs queued'}), 503, {'Retry-After': '5'}
+    return jsonify({'job_id': job_id, 'status_url': url_for('job_status', job_id=job_id)}), 202
+
+@app.route('/api/jobs/<job_id>')
+@login_required
+def job_status(job_id):
+    job = pdf_jobs.get(job_id, session['user'])
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    status = pdf_jobs.status(job)
+    if status['status'] == 'done':
+        status['result_url'] = url_for('job_result', job_id=job_id)
+    return jsonify(status)
+
+@app.route('/api/jobs/<job_id>/result')
+@login_required
+def job_result(job_id):
+    job = pdf_jobs.get(job_id, session['user'])
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    status = pdf_jobs.status(job)
+    if status['status'] in ('queued', 'running'):
+        return jsonify(status), 202
+    if status['status'] != 'done':
+        return jsonify(status), 500
+
+    result = job['future'].result()
+    if job['kind'] == 'render-pdf':
+        response = make_response(result[0])
+        response.headers['Content-Type'] = 'application/pdf'
+        response.headers['Content-Disposition'] = 'attachment; filename=resume.pdf'
+        return response
+    return jsonify(result)
+
 @app.route('/preview', methods=['POST'])
 @login_required
 def preview():
@@ -532,12 +1043,11 @@ def analyze_jd():
     text_to_analyze = ""
 
     if jd_file and jd_file.filename.lower().endswith('.pdf'):
-        if PdfReader is None:
+        if not PDF_SUPPORT:
             return jsonify({'error': 'PDF processing not available. Install PyPDF2.'}), 500
         try:
-            pdf_reader = PdfReader(jd_file)
-            for page in pdf_reader.pages:
-                text_to_analyze += page.extract_text() + '\n'
+            with phase('pdf-extract'):
+                text_to_analyze = extract_pdf_text(jd_file, max_pages=JD_MAX_PAGES, max_chars=JD_MAX_CHARS)
         except Exception as e:
             return jsonify({'error': f'Error reading PDF: {str(e)}'}), 500
     elif jd_text:
@@ -545,10 +1055,27 @@ def analyze_jd():
     else:
         return jsonify({'error': 'No Job Description provided'}), 400
 
+    text_to_analyze = prepare_jd_text(text_to_analyze)
+    key = content_key(normalize_text(text_to_analyze), GEMINI_MODEL, JD_PROMPT_VERSION)
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
-        prompt = f"""
+        return jsonify(jd_cache.get_or_compute(key, lambda: gemini_analyze_jd(text_to_analyze)))
+    except Rejected as e:
+        return rejected_response(e)
+    except Exception as e:
+        return jsonify({'error': f'Gemini Error: {str(e)}'}), 500
+
+
+def gemini_analyze_jd(text_to_analyze):
+    """Ask Gemini for the JD analysis and parse its JSON answer."""
+    model = gemini_model()
+    with gemini_guard.slot(), phase('gemini'):
+        response = model.generate_content(
+            jd_prompt(text_to_analyze), request_options={'timeout': gemini_guard.deadline})
+    return parse_jd_answer(response.text)
+
+
+def jd_prompt(text_to_analyze):
+    return f"""
         Analyze the following Job Description and extract the following information in JSON format:
         1. "summary": You are an expert resume strategist and career writer. Your task is to generate a concise, ATS-friendly professional summary tailored to the Job Description (JD) provided.
         2. "skills": A list of key technical and soft skills mentioned or required.
@@ -558,24 +1085,58 @@ def analyze_jd():
         6. "job_title": The job title/position being advertised.
 
         Job Description:
-        {text_to_analyze[:10000]} 
+        {text_to_analyze} 
         """
 
-        response = model.generate_content(prompt)
-        
-        response_text = response.text.strip()
-        # Clean up markdown code blocks if present
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.startswith("```"):
-            response_text = response_text[3:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-            
-        return jsonify(json.loads(response_text))
 
-    except Exception as e:
-        return jsonify({'error': f'Gemini Error: {str(e)}'}), 500
+def parse_jd_answer(response_text):
+    """Parse the model's JSON answer, which may be wrapped in a Markdown fence."""
+    response_text = response_text.strip()
+    # Clean up markdown code blocks if present
+    if response_text.startswith("```json"):
+        response_text = response_text[7:]
+    if response_text.startswith("```"):
+        response_text = response_text[3:]
+    if response_text.endswith("```"):
+        response_text = response_text[:-3]
+
+    return json.loads(response_text)
+
+
+# Local keyword scoring needs no LLM call, so several postings can be compared at once
+MATCH_MAX_JDS = int(os.environ.get('MATCH_MAX_JDS', 50))
+
+@app.route('/api/match-score', methods=['POST'])
+@login_required
+def match_score():
+    """Score a resume against one (`jd_text`) or many (`jd_texts`) job descriptions.
+
+    Scores the `resume` in the body, or the user's saved resume when absent.
+    """
+    payload = request.get_json(silent=True) or {}
+    jd_texts = payload.get('jd_texts')
+    single = jd_texts is None
+    if single:
+        jd_texts = [payload['jd_text']] if payload.get('jd_text') else []
+    if not isinstance(jd_texts, list) or not jd_texts or not all(isinstance(t, str) for t in jd_texts):
+        return jsonify({'error': 'Provide jd_text or a list of jd_texts'}), 400
+    if len(jd_texts) > MATCH_MAX_JDS:
+        return jsonify({'error': f'At most {MATCH_MAX_JDS} job descriptions per request'}), 400
+
+    data = payload.get('resume')
+    if not isinstance(data, dict):
+        data = {}
+        db = get_supabase()
+        if db:
+            try:
+                data = load_resume(db, session['user']) or {}
+            except Exception as e:
+                print(f"Error loading resume for scoring: {e}")
+
+    from match_scoring import score_resume
+    with phase('score'):
+        results = score_resume(data, [text[:JD_MAX_CHARS] for text in jd_texts])
+    return jsonify(results[0] if single else {'results': results})
 
 
 @app.route('/generate-cover-letter', methods=['POST'])
@@ -584,21 +1145,75 @@ def generate_cover_letter():
     if not GEMINI_API_KEY:
         return jsonify({'error': 'Gemini API key not configured'}), 500
 
-    data = request.json
-    job_title = data.get('job_title', 'the position')
-    company_name = data.get('company_name', 'your company')
-    jd_summary = data.get('jd_summary', '')
-    user_name = data.get('user_name', '')
-    user_email = data.get('user_email', '')
-    user_phone = data.get('user_phone', '')
-    user_skills = data.get('user_skills', '')
-    user_experience = data.get('user_experience', '')
-    user_summary = data.get('user_summary', '')
+    prompt, subject = cover_letter_prompt(request.json)
+
+    # Clients that accept Server-Sent Events get the letter as it is generated
+    if 'text/event-stream' in request.headers.get('Accept', ''):
+        return Response(
+            stream_with_context(stream_cover_letter(prompt, subject)),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+        )
 
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        
-        prompt = f"""
+        model = gemini_model()
+        with gemini_guard.slot(), phase('gemini'):
+            response = model.generate_content(prompt, request_options={'timeout': gemini_guard.deadline})
+        cover_letter = response.text.strip()
+
+        return jsonify({
+            'cover_letter': cover_letter,
+            'subject': subject
+        })
+
+    except Rejected as e:
+        return rejected_response(e)
+    except Exception as e:
+        return jsonify({'error': f'Error generating cover letter: {str(e)}'}), 500
+
+
+# Most tokens each request field may add to the cover letter prompt; longer
+# values are cut at a sentence, list item or word boundary
+COVER_LETTER_FIELD_TOKENS = {
+    'job_title': 30,
+    'company_name': 30,
+    'jd_summary': 400,
+    'user_name': 20,
+    'user_email': 20,
+    'user_phone': 10,
+    'user_skills': 200,
+    'user_experience': 250,
+    'user_summary': 250,
+}
+COVER_LETTER_DEFAULTS = {'job_title': 'the position', 'company_name': 'your company'}
+
+def cover_letter_fields(data):
+    """The request's cover letter fields with whitespace collapsed and each cut to its cap."""
+    start = time.perf_counter()
+    fields, tokens_in = {}, 0
+    for name, tokens in COVER_LETTER_FIELD_TOKENS.items():
+        value = ' '.join(str(data.get(name, COVER_LETTER_DEFAULTS.get(name, '')) or '').split())
+        tokens_in += estimate_tokens(value)
+        fields[name] = fit_text(value, tokens)
+    tokens_out = sum(estimate_tokens(value) for value in fields.values())
+    report_prompt_tokens('cover-letter', tokens_in, tokens_out, time.perf_counter() - start)
+    return fields
+
+
+def cover_letter_prompt(data):
+    """Build the Gemini prompt and the email subject for a cover letter request."""
+    fields = cover_letter_fields(data)
+    job_title = fields['job_title']
+    company_name = fields['company_name']
+    jd_summary = fields['jd_summary']
+    user_name = fields['user_name']
+    user_email = fields['user_email']
+    user_phone = fields['user_phone']
+    user_skills = fields['user_skills']
+    user_experience = fields['user_experience']
+    user_summary = fields['user_summary']
+
+    prompt = f"""
         You are a professional career coach and cover letter expert. Write a compelling, personalized cover letter for a job application.
 
         Job Details:
@@ -625,25 +1240,37 @@ def generate_cover_letter():
         Return ONLY the cover letter text, no additional formatting or explanations.
         """
 
-        response = model.generate_content(prompt)
-        cover_letter = response.text.strip()
-        
-        # Generate email subject
-        subject = f"Application for {job_title} Position - {user_name}"
-        
-        return jsonify({
-            'cover_letter': cover_letter,
-            'subject': subject
-        })
+    # Generate email subject
+    subject = f"Application for {job_title} Position - {user_name}"
+    return prompt, subject
+
 
+def sse_event(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+def stream_cover_letter(prompt, subject):
+    """Yield the subject, then each chunk of the letter as Gemini produces it.
+
+    Events: `subject`, any number of `chunk`, then `done` or `error`.
+    """
+    # The subject needs no model call, so the first bytes go out immediately
+    yield sse_event('subject', {'subject': subject})
+    try:
+        model = gemini_model()
+        # Headers are already sent, so this only reaches /metrics
+        with gemini_guard.slot(), phase('gemini-stream'):
+            for chunk in model.generate_content(
+                    prompt, stream=True, request_options={'timeout': gemini_guard.deadline}):
+                if chunk.text:
+                    yield sse_event('chunk', {'text': chunk.text})
+        yield sse_event('done', {})
     except Exception as e:
-        return jsonify({'error': f'Error generating cover letter: {str(e)}'}), 500
+        yield sse_event('error', {'error': f'Error generating cover letter: {str(e)}'})
 
 # This is already in your code at `/api/resume-data` endpoint
 def fetch_resume_from_db(user_id):
-    db = get_supabase()
-    response = db.table('resumes').select('data').eq('user_id', user_id).execute()
-    return response.data[0]['data'] if response.data else None
+    return load_resume(get_supabase(), user_id)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,478 @@
+"""ASGI entry point: the I/O-bound routes run as coroutines, the rest as WSGI.
+
+Under the WSGI server every Gemini or Supabase call holds a worker thread for
+the whole network wait, so a handful of slow model answers can starve `/login`.
+Here JD analysis, cover letters and resume reads/saves await async Gemini and
+Supabase clients on the event loop instead; thousands of them can be
+outstanding on one worker. Every other route is the unchanged Flask view, run
+on a bounded thread pool.
+
+The async views run inside a regular Flask request context, so `request`,
+`session`, `jsonify`, `login_required` and the timing hooks all work as usual.
+
+    uvicorn asgi_app:app --workers 2
+"""
+import asyncio
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Response, jsonify, request, session
+from werkzeug.exceptions import HTTPException
+
+import app as resume_app
+from app import (
+    GEMINI_API_KEY, JD_MAX_CHARS, JD_MAX_PAGES, JD_PROMPT_VERSION, GEMINI_MODEL, SUPABASE_KEY,
+    SUPABASE_URL, cache_resume, cover_letter_prompt, gemini_guard, gemini_model, get_supabase,
+    invalidate_resume, jd_cache, jd_prompt, login_required, parse_jd_answer, prepare_jd_text,
+    record_history, rejected_response, resume_cache, resume_data_response, resume_generation, save_buffer,
+    save_precondition_failed, sse_event, supabase_guard,
+)
+from cache import TTLCache
+from instrumentation import phase
+from llm_cache import normalize_text
+from pdf_cache import content_key
+from resilience import Rejected
+from resume_parser import PDF_SUPPORT, extract_pdf_text
+from resume_repository import afetch_resume_version, asave_resume_data, aupdate_resume_if_version, new_version
+
+flask_app = resume_app.app
+
+# Waiting coroutines hold no thread, so far more Gemini calls may be outstanding
+gemini_guard.max_concurrent, gemini_guard.max_waiting = resume_app.gemini_limits('asgi')
+
+# Threads for the synchronous Flask views; the async views do not use them
+wsgi_pool = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('ASGI_WSGI_THREADS', 32)),
+    thread_name_prefix='wsgi',
+)
+
+
+class StreamingResponse(Response):
+    """A response whose body is an async iterator of `str` or `bytes` chunks."""
+
+    def __init__(self, chunks, **kwargs):
+        super().__init__(**kwargs)
+        self.chunks = chunks
+
+
+# Async clients are bound to the event loop that created them; an ASGI worker
+# runs a single loop for its lifetime.
+_async_http_client = None
+_async_anon_supabase = None
+async_client_cache = TTLCache(
+    maxsize=int(os.environ.get('SUPABASE_CLIENT_CACHE_SIZE', 256)),
+    ttl=int(os.environ.get('SUPABASE_CLIENT_CACHE_TTL', 3600)),
+)
+
+def get_async_http_client():
+    global _async_http_client
+    if _async_http_client is None:
+        import httpx
+        _async_http_client = httpx.AsyncClient(
+            timeout=float(os.environ.get('SUPABASE_HTTP_TIMEOUT', 30)),
+            limits=httpx.Limits(
+                max_connections=int(os.environ.get('SUPABASE_MAX_CONNECTIONS', 100)),
+                max_keepalive_connections=int(os.environ.get('SUPABASE_MAX_KEEPALIVE', 20)),
+            ),
+            follow_redirects=True,
+        )
+    return _async_http_client
+
+async def get_async_supabase():
+    """Async counterpart of `get_supabase()` for the current session."""
+    global _async_anon_supabase
+    if not (SUPABASE_URL and SUPABASE_KEY):
+        return None
+    from supabase import AsyncClientOptions, acreate_client
+    token = session.get('access_token')
+    if not token:
+        if _async_anon_supabase is None:
+            _async_anon_supabase = await acreate_client(SUPABASE_URL, SUPABASE_KEY)
+        return _async_anon_supabase
+    client = async_client_cache.get(token)
+    if client is None:
+        client = await acreate_client(
+            SUPABASE_URL,
+            SUPABASE_KEY,
+            options=AsyncClientOptions(
+                headers={"Authorization": f"Bearer {token}"},
+                httpx_client=get_async_http_client(),
+            )
+        )
+        async_client_cache.set(token, client)
+    return client
+
+async def load_resume_version(db, user_id):
+    """Async `app.load_resume_version`: pending save, then cache, then database."""
+    pending = save_buffer.get(user_id)
+    if pending:
+        return pending
+    cached = resume_cache.get(user_id)
+    if cached is None:
+        generation = resume_generation(user_id)
+        async with supabase_guard.aslot():
+            with phase('db-read'):
+                cached = await supabase_guard.run(afetch_resume_version(db, user_id))
+        cache_resume(user_id, cached, generation)
+    return cached
+
+
+# Views, keyed by the Flask endpoint they replace
+
+@login_required
+async def save_resume():
+    user_id = session.get('user')
+    data = request.json
+
+    if not (SUPABASE_URL and SUPABASE_KEY) or not user_id:
+        return jsonify({'error': 'Database not connected'}), 500
+
+    try:
+        db = await get_async_supabase()
+        stored, current = await load_resume_version(db, user_id)
+        error = save_precondition_failed(stored, current)
+        if error:
+            return error
+        version = new_version()
+        if save_buffer.enabled:
+            # Only queued here; the flush thread writes it with the sync client
+            if not save_buffer.put_if(user_id, get_supabase(), data, current, version):
+                return jsonify({'error': 'Resume has changed'}), 412
+        else:
+            async with supabase_guard.aslot():
+                with phase('db-write'):
+                    if current is None:
+                        await supabase_guard.run(asave_resume_data(db, user_id, data, version))
+                    elif not await supabase_guard.run(aupdate_resume_if_version(db, user_id, data, current, version)):
+                        invalidate_resume(user_id)
+                        return jsonify({'error': 'Resume has changed'}), 412
+            invalidate_resume(user_id)
+            # History is written with the sync client, off the event loop
+            await asyncio.to_thread(record_history, get_supabase(), user_id, data, version)
+        response = jsonify({'success': True, 'version': version})
+        response.set_etag(version)
+        return response
+    except Rejected as e:
+        return rejected_response(e)
+    except Exception as e:
+        print(f"Error saving resume: {e}")
+        return jsonify({'error': str(e)}), 500
+
+@login_required
+async def get_resume_data():
+    user_id = session.get('user')
+    resume_data, version = {}, None
+    db = await get_async_supabase()
+    if db and user_id:
+        try:
+            resume_data, version = await load_resume_version(db, user_id)
+            resume_data = resume_data or {}
+        except Rejected as e:
+            return rejected_response(e)
+        except Exception as e:
+            print(f"Error fetching resume: {e}")
+    return resume_data_response(resume_data, version)
+
+@login_required
+async def analyze_jd():
+    if not GEMINI_API_KEY:
+        return jsonify({'error': 'Gemini API key not configured'}), 500
+
+    jd_text = request.form.get('jd_text')
+    jd_file = request.files.get('jd_file')
+
+    if jd_file and jd_file.filename.lower().endswith('.pdf'):
+        if not PDF_SUPPORT:
+            return jsonify({'error': 'PDF processing not available. Install PyPDF2.'}), 500
+        try:
+            # CPU-bound; keep it off the event loop
+            with phase('pdf-extract'):
+                text_to_analyze = await asyncio.to_thread(
+                    extract_pdf_text, jd_file, max_pages=JD_MAX_PAGES, max_chars=JD_MAX_CHARS)
+        except Exception as e:
+            return jsonify({'error': f'Error reading PDF: {str(e)}'}), 500
+    elif jd_text:
+        text_to_analyze = jd_text
+    else:
+        return jsonify({'error': 'No Job Description provided'}), 400
+
+    # A few milliseconds even at JD_MAX_CHARS; not worth a thread hop
+    text_to_analyze = prepare_jd_text(text_to_analyze)
+    key = content_key(normalize_text(text_to_analyze), GEMINI_MODEL, JD_PROMPT_VERSION)
+    try:
+        return jsonify(await jd_cache.aget_or_compute(key, lambda: gemini_analyze_jd(text_to_analyze)))
+    except Rejected as e:
+        return rejected_response(e)
+    except Exception as e:
+        return jsonify({'error': f'Gemini Error: {str(e)}'}), 500
+
+async def gemini_analyze_jd(text_to_analyze):
+    model = gemini_model()
+    async with gemini_guard.aslot():
+        with phase('gemini'):
+            response = await gemini_guard.run(model.generate_content_async(
+                jd_prompt(text_to_analyze), request_options={'timeout': gemini_guard.deadline}))
+    return parse_jd_answer(response.text)
+
+@login_required
+async def generate_cover_letter():
+    if not GEMINI_API_KEY:
+        return jsonify({'error': 'Gemini API key not configured'}), 500
+
+    prompt, subject = cover_letter_prompt(request.json)
+
+    if 'text/event-stream' in request.headers.get('Accept', ''):
+        return StreamingResponse(
+            stream_cover_letter(prompt, subject),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+        )
+
+    try:
+        model = gemini_model()
+        async with gemini_guard.aslot():
+            with phase('gemini'):
+                response = await gemini_guard.run(model.generate_content_async(
+                    prompt, request_options={'timeout': gemini_guard.deadline}))
+        return jsonify({
+            'cover_letter': response.text.strip(),
+            'subject': subject
+        })
+    except Rejected as e:
+        return rejected_response(e)
+    except Exception as e:
+        return jsonify({'error': f'Error generating cover letter: {str(e)}'}), 500
+
+async def stream_cover_letter(prompt, subject):
+    """Async `app.stream_cover_letter`; same events."""
+    yield sse_event('subject', {'subject': subject})
+    try:
+        model = gemini_model()
+        async with gemini_guard.aslot():
+            with phase('gemini-stream'):
+                chunks = await gemini_guard.run(model.generate_content_async(
+                    prompt, stream=True, request_options={'timeout': gemini_guard.deadline}))
+                async for chunk in chunks:
+                    if chunk.text:
+                        yield sse_event('chunk', {'text': chunk.text})
+        yield sse_event('done', {})
+    except Exception as e:
+        yield sse_event('error', {'error': f'Error generating cover letter: {str(e)}'})
+
+ASYNC_VIEWS = {
+    'save_resume': save_resume,
+    'get_resume_data': get_resume_data,
+    'analyze_jd': analyze_jd,
+    'generate_cover_letter': generate_cover_letter,
+}
+
+
+# ASGI plumbing
+
+def wsgi_environ(scope, body=b''):
+    """Translate an ASGI HTTP scope and its buffered body into a WSGI environ."""
+    server = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1] or 80),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': (scope.get('client') or ('', 0))[0],
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_LENGTH':
+            continue
+        key = name if name == 'CONTENT_TYPE' else f'HTTP_{name}'
+        environ[key] = f'{environ[key]},{value}' if key in environ else value
+    return environ
+
+
+class ReceiveStream(io.RawIOBase):
+    """`wsgi.input` that pulls the body from ASGI `receive` as the view reads it.
+
+    Read from a pool thread, so a WSGI route can consume an upload of any size
+    (a bulk import) without the whole body being buffered first.
+    """
+
+    def __init__(self, receive, loop):
+        self._receive = receive
+        self._loop = loop
+        self._pending = b''
+        self._done = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._pending and not self._done:
+            message = asyncio.run_coroutine_threadsafe(self._receive(), self._loop).result()
+            if message['type'] == 'http.disconnect':
+                self._done = True
+                break
+            self._pending = message.get('body', b'')
+            self._done = not message.get('more_body')
+        n = min(len(buffer), len(self._pending))
+        buffer[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+
+def stream_body(environ, scope, receive):
+    """Make `environ` read its body from `receive` on demand."""
+    environ['wsgi.input'] = io.BufferedReader(ReceiveStream(receive, asyncio.get_running_loop()), 64 * 1024)
+    length = next((v for k, v in scope.get('headers', []) if k.lower() == b'content-length'), None)
+    if length is None:
+        # Chunked upload: read to the end of the stream
+        del environ['CONTENT_LENGTH']
+        environ['wsgi.input_terminated'] = True
+    else:
+        environ['CONTENT_LENGTH'] = length.decode('latin-1')
+
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+def _header_list(headers):
+    return [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]
+
+
+async def call_async_view(view, environ, send):
+    # Mirrors Flask.wsgi_app / full_dispatch_request around an awaited view
+    with flask_app.request_context(environ):
+        try:
+            try:
+                rv = flask_app.preprocess_request()
+                if rv is None:
+                    rv = view()
+                    if asyncio.iscoroutine(rv):
+                        rv = await rv
+            except Exception as e:
+                rv = flask_app.handle_user_exception(e)
+            response = flask_app.finalize_request(rv)
+        except Exception as e:
+            response = flask_app.handle_exception(e)
+
+    # werkzeug drops the body of 304s and HEAD requests and fixes up headers here
+    wsgi_headers = response.get_wsgi_headers(environ)
+    streaming = isinstance(response, StreamingResponse)
+    if streaming:
+        # Computed from the empty placeholder body
+        wsgi_headers.pop('Content-Length', None)
+    headers = _header_list(wsgi_headers.items())
+    await send({'type': 'http.response.start', 'status': response.status_code, 'headers': headers})
+    if streaming and environ['REQUEST_METHOD'] != 'HEAD':
+        async for chunk in response.chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+    else:
+        await send({'type': 'http.response.body', 'body': b''.join(response.get_app_iter(environ))})
+
+
+async def call_wsgi(environ, send):
+    """Run the Flask WSGI app on the thread pool, streaming its body back."""
+    loop = asyncio.get_running_loop()
+    # Bounded, so a slow client holds back the producing thread
+    queue = asyncio.Queue(maxsize=8)
+    started = {}
+    done = object()
+
+    def put(item):
+        asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+    def start_response(status, headers, exc_info=None):
+        started['status'] = int(status.split(' ', 1)[0])
+        started['headers'] = _header_list(headers)
+        return lambda data: put(data)
+
+    def run():
+        # One thread iterates the whole body: stream_with_context generators
+        # expect the request context they pushed to stay on their thread
+        try:
+            body = flask_app(environ, start_response)
+            try:
+                for chunk in body:
+                    if chunk:
+                        put(chunk)
+            finally:
+                if hasattr(body, 'close'):
+                    body.close()
+        finally:
+            put(done)
+
+    future = loop.run_in_executor(wsgi_pool, run)
+    sent_start = False
+    chunk = None
+    try:
+        while True:
+            chunk = await queue.get()
+            if not sent_start:
+                status, headers = started.get('status', 500), started.get('headers', [])
+                await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+                sent_start = True
+            if chunk is done:
+                break
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b''})
+    except BaseException:
+        # Let the producer finish instead of blocking on a full queue forever
+        while chunk is not done:
+            chunk = await queue.get()
+        raise
+    finally:
+        await future
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if _async_http_client is not None:
+                    await _async_http_client.aclose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    if scope['type'] != 'http':
+        return
+
+    environ = wsgi_environ(scope)
+    try:
+        endpoint, _ = flask_app.url_map.bind_to_environ(environ).match()
+    except HTTPException:
+        endpoint = None
+    view = ASYNC_VIEWS.get(endpoint)
+    if view is None:
+        stream_body(environ, scope, receive)
+        await call_wsgi(environ, send)
+        return
+    body = await read_body(receive)
+    if body is None:
+        return
+    environ = wsgi_environ(scope, body)
+    await call_async_view(view, environ, send)
@@ -0,0 +1,47 @@
+import re
+import zipfile
+
+
+class _ZipSink:
+    """Write-only file object that hands ZipFile output back in chunks.
+
+    ZipFile falls back to data descriptors when the target cannot seek, so the
+    archive can be streamed without ever holding all of it in memory.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(files):
+    """Yield a ZIP archive chunk by chunk as `(name, content)` pairs arrive."""
+    sink = _ZipSink()
+    # PDFs are already compressed, so storing them avoids a pointless deflate pass
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED) as archive:
+        for name, content in files:
+            archive.writestr(name, content)
+            yield sink.drain()
+    yield sink.drain()
+
+
+def variant_filename(name, index, taken):
+    """A safe, unique `.pdf` file name for a variant."""
+    stem = re.sub(r'[^A-Za-z0-9._-]+', '_', str(name or '')).strip('._') or f'resume-{index + 1}'
+    candidate, n = stem, 2
+    while candidate in taken:
+        candidate = f'{stem}-{n}'
+        n += 1
+    taken.add(candidate)
+    return f'{candidate}.pdf'
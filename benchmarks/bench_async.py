@@ -0,0 +1,146 @@
+"""Slow Gemini calls under the sync WSGI app vs. the ASGI app with async views.
+
+    python benchmarks/bench_async.py --requests 1000 --threads 16 --latency 2
+
+Fires `--requests` concurrent /analyze-jd calls against a fake model that takes
+`--latency` seconds, and while they are outstanding measures how long GET
+/login takes. The WSGI run uses a pool of `--threads` request threads (like a
+gthread worker); the ASGI run drives asgi_app.app in-process on one event loop.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fakes.genai as fake_genai
+from fakes.genai import FakeGenerativeModel
+from fakes.postgrest import FakePostgrest
+
+PROBES = 20
+
+
+def posting(i):
+    return f'Backend Engineer #{i}. Python, Flask, PostgreSQL. Contact jobs{i}@example.com'
+
+
+async def asgi_request(app, method, path, body=b'', headers=()):
+    """Call an ASGI app in-process; returns `(status, headers, body)`."""
+    messages = []
+    received = False
+
+    async def receive():
+        nonlocal received
+        if received:
+            await asyncio.Event().wait()
+        received = True
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app({
+        'type': 'http', 'method': method, 'path': path, 'query_string': b'', 'root_path': '',
+        'scheme': 'http', 'http_version': '1.1', 'server': ('localhost', 80), 'client': ('127.0.0.1', 0),
+        'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers],
+    }, receive, send)
+    start = messages[0]
+    return (start['status'], {k.decode(): v.decode() for k, v in start['headers']},
+            b''.join(m.get('body', b'') for m in messages[1:]))
+
+
+def run_wsgi(resume_app, requests, threads):
+    client = resume_app.app.test_client()
+    client.post('/login', data={'email': 'bench@example.com', 'password': 'bench'})
+
+    # Latencies count from submission, so time spent waiting for a thread is included
+    def analyze(i, submitted):
+        assert client.post('/analyze-jd', data={'jd_text': posting(i)}).status_code == 200
+        return time.perf_counter() - submitted
+
+    def probe(submitted):
+        assert resume_app.app.test_client().get('/login').status_code == 200
+        return time.perf_counter() - submitted
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        jobs = [pool.submit(analyze, i, time.perf_counter()) for i in range(requests)]
+        time.sleep(0.01)
+        probes = [pool.submit(probe, time.perf_counter()) for _ in range(PROBES)]
+        analyze_times = [j.result() for j in jobs]
+        probe_times = [p.result() for p in probes]
+    return time.perf_counter() - start, analyze_times, probe_times
+
+
+async def run_asgi(app, requests, offset):
+    form = [('content-type', 'application/x-www-form-urlencoded')]
+    _, headers, _ = await asgi_request(app, 'POST', '/login', urlencode(
+        {'email': 'bench@example.com', 'password': 'bench'}).encode(), form)
+    cookie = [('cookie', headers['set-cookie'].split(';')[0])]
+
+    async def analyze(i):
+        start = time.perf_counter()
+        status, _, _ = await asgi_request(app, 'POST', '/analyze-jd',
+                                          urlencode({'jd_text': posting(i)}).encode(), form + cookie)
+        assert status == 200
+        return time.perf_counter() - start
+
+    async def probe():
+        await asyncio.sleep(0.01)
+        start = time.perf_counter()
+        status, _, _ = await asgi_request(app, 'GET', '/login')
+        assert status == 200
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        asyncio.gather(*(analyze(offset + i) for i in range(requests))),
+        asyncio.gather(*(probe() for _ in range(PROBES))),
+    )
+    return (time.perf_counter() - start, *results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--threads', type=int, default=16, help='WSGI request threads')
+    parser.add_argument('--latency', type=float, default=2.0,
+                        help='simulated model latency per call, in seconds')
+    args = parser.parse_args()
+
+    server = FakePostgrest().start()
+    os.environ.update({
+        'SUPABASE_URL': server.url,
+        'SUPABASE_KEY': 'bench-anon-key',
+        'GEMINI_API_KEY': 'bench-key',
+        'JD_CACHE_PATH': '',
+    })
+    # Let every request through the Gemini guard; this measures the servers, not the limits
+    os.environ.setdefault('GEMINI_MAX_CONCURRENT', str(args.requests))
+    os.environ.setdefault('GEMINI_MAX_WAITING', str(args.requests))
+    import app as resume_app
+    import asgi_app
+    resume_app.genai = fake_genai
+    FakeGenerativeModel.latency = args.latency
+
+    try:
+        results = [('WSGI', run_wsgi(resume_app, args.requests, args.threads))]
+        # Different postings, so the JD cache does not answer the second run
+        results.append(('ASGI', asyncio.run(run_asgi(asgi_app.app, args.requests, args.requests))))
+    finally:
+        server.stop()
+
+    print(f"{args.requests} concurrent /analyze-jd, model latency {args.latency}s, {args.threads} WSGI threads")
+    print(f"{'mode':<6}{'wall s':>9}{'jd p50 s':>10}{'jd max s':>10}{'/login p50 ms':>15}{'/login max ms':>15}")
+    for label, (wall, analyze_times, probe_times) in results:
+        print(f"{label:<6}{wall:>9.2f}{statistics.median(analyze_times):>10.2f}{max(analyze_times):>10.2f}"
+              f"{statistics.median(probe_times) * 1000:>15.1f}{max(probe_times) * 1000:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+"""Tail latency during a Gemini brownout, with and without the dependency guards.
+
+    python benchmarks/bench_brownout.py --requests 200 --threads 16 --latency 5 --failure-rate 0.8
+
+The fake model answers after `--latency` seconds and fails `--failure-rate` of
+its calls. Meanwhile `--requests` /analyze-jd calls and a stream of
+/api/resume-data reads arrive on a pool of `--threads` request threads (a gthread
+worker). "unguarded" disables the limits, deadline and breaker; "guarded" uses
+the limits given on the command line and trips after 5 calls.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fakes.genai as fake_genai
+from fakes.genai import FakeGenerativeModel
+from fakes.postgrest import FakePostgrest
+from resilience import Dependency
+
+UNLIMITED = dict(max_concurrent=10 ** 6, max_waiting=10 ** 6, wait_timeout=10 ** 6, deadline=10 ** 6,
+                 min_calls=10 ** 9)
+
+
+def posting(i):
+    return f'Data Engineer #{i}. Spark, Airflow, SQL. Contact jobs{i}@example.com'
+
+
+def run(resume_app, guard, requests, threads, offset):
+    resume_app.gemini_guard = guard
+    FakeGenerativeModel.reset_counters()
+    client = resume_app.app.test_client()
+    client.post('/login', data={'email': 'bench@example.com', 'password': 'bench'})
+
+    # Latencies count from submission, so queueing for a thread is included
+    def analyze(i, submitted):
+        status = client.post('/analyze-jd', data={'jd_text': posting(offset + i)}).status_code
+        return status, time.perf_counter() - submitted
+
+    def read(submitted):
+        status = client.get('/api/resume-data').status_code
+        return status, time.perf_counter() - submitted
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        jobs, reads = [], []
+        for i in range(requests):
+            jobs.append(pool.submit(analyze, i, time.perf_counter()))
+            if i % 4 == 0:
+                reads.append(pool.submit(read, time.perf_counter()))
+            # A steady arrival rate of 50 requests/s
+            time.sleep(0.02)
+        jobs = [j.result() for j in jobs]
+        reads = [r.result() for r in reads]
+    return time.perf_counter() - start, jobs, reads, FakeGenerativeModel.calls, guard.stats()
+
+
+def p99(values):
+    values = sorted(values)
+    return values[max(0, int(round(0.99 * len(values))) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--latency', type=float, default=5.0, help='model latency during the brownout')
+    parser.add_argument('--failure-rate', type=float, default=0.8)
+    parser.add_argument('--max-concurrent', type=int, default=4)
+    parser.add_argument('--max-waiting', type=int, default=8)
+    parser.add_argument('--wait-timeout', type=float, default=0.5)
+    parser.add_argument('--deadline', type=float, default=2.0)
+    args = parser.parse_args()
+
+    server = FakePostgrest(latency=0.002).start()
+    os.environ.update({
+        'SUPABASE_URL': server.url,
+        'SUPABASE_KEY': 'bench-anon-key',
+        'GEMINI_API_KEY': 'bench-key',
+        'JD_CACHE_PATH': '',
+    })
+    import app as resume_app
+    resume_app.genai = fake_genai
+    FakeGenerativeModel.latency = args.latency
+    FakeGenerativeModel.failure_rate = args.failure_rate
+
+    guarded = dict(max_concurrent=args.max_concurrent, max_waiting=args.max_waiting,
+                   wait_timeout=args.wait_timeout, deadline=args.deadline, min_calls=5, open_seconds=30)
+    try:
+        results = [
+            # Distinct postings per run, so the JD cache cannot answer the second one
+            (label, run(resume_app, Dependency('gemini', **settings), args.requests, args.threads, n * args.requests))
+            for n, (label, settings) in enumerate((('unguarded', UNLIMITED), ('guarded', guarded)))
+        ]
+    finally:
+        server.stop()
+
+    print(f"{args.requests} /analyze-jd at {args.latency}s model latency and {args.failure_rate:.0%} "
+          f"failures, {args.threads} request threads")
+    print(f"{'mode':<11}{'wall s':>8}{'jd p50 s':>10}{'jd p99 s':>10}{'read p50 ms':>13}{'read p99 ms':>13}"
+          f"{'model calls':>13}  statuses")
+    for label, (wall, jobs, reads, calls, stats) in results:
+        statuses = ' '.join(f'{s}x{n}' for s, n in sorted(Counter(s for s, _ in jobs).items()))
+        print(f"{label:<11}{wall:>8.1f}{statistics.median(t for _, t in jobs):>10.2f}{p99([t for _, t in jobs]):>10.2f}"
+              f"{statistics.median(t for _, t in reads) * 1000:>13.1f}{p99([t for _, t in reads]) * 1000:>13.1f}"
+              f"{calls:>13}  {statuses}")
+    stats = results[1][1][4]
+    print(f"guarded breaker: {stats['state']}, opened {stats['times_opened']}x, "
+          f"{stats['rejected_open']} fast-failed, {stats['rejected_overloaded']} over the limit")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""Bulk export/import through the admin API vs. one resume at a time.
+
+    python benchmarks/bench_bulk.py --resumes 20000 100000 --latency 0.002 --memory
+
+Seeds a local Supabase stand-in with `--resumes` rows, then:
+
+- streams them out of /api/admin/resumes/export to a file;
+- empties the table and streams the file back into /api/admin/resumes/import;
+- checks that every resume came back unchanged.
+
+With `--memory`, peak Python memory is traced over each transfer, including
+the stand-in's own per-page buffers but not the rows it keeps, and stays flat
+as the row count grows.
+Tracing slows everything down, so the times are then not representative. The
+one-at-a-time baseline reads and upserts `--baseline` resumes individually,
+as `fetch_resume_from_db()` does, and is extrapolated to the same row count.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fakes.postgrest import FakePostgrest
+from benchmarks.synthetic import make_resume
+from resume_repository import fetch_resume, save_resume_data
+
+ADMIN = {'Authorization': 'Bearer bench-admin-token'}
+
+
+def seed(server, count, docs):
+    rows = [{'id': str(i), 'user_id': str(uuid.UUID(int=i + 1)), 'data': docs[i % len(docs)], 'version': 'v0'}
+            for i in range(count)]
+    server.tables['resumes'] = []
+    server.seed('resumes', rows)
+    return rows
+
+
+def measure(fn):
+    if not tracemalloc.is_tracing():
+        start = time.perf_counter()
+        return fn(), time.perf_counter() - start, None
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    # Leave out what is still held afterwards: the rows the stand-in stored
+    return result, elapsed, peak - max(current, base)
+
+
+def bulk(resume_app, server, count, docs, fmt):
+    client = resume_app.app.test_client()
+    rows = seed(server, count, docs)
+    expected = {row['user_id']: row['data'] for row in rows}
+    del rows
+    path = os.path.join(tempfile.mkdtemp(), 'resumes.ndjson')
+
+    def export():
+        response = client.get(f'/api/admin/resumes/export?format={fmt}', headers=ADMIN, buffered=False)
+        with open(path, 'wb') as f:
+            for chunk in response.response:
+                f.write(chunk)
+        response.close()
+
+    server.reset_counters()
+    _, export_s, export_peak = measure(export)
+    export_trips = server.requests
+
+    server.tables['resumes'] = []
+    server.seed('resumes', [])
+    server.reset_counters()
+
+    def load():
+        with open(path, 'rb') as f:
+            return client.post(f'/api/admin/resumes/import?format={fmt}', data=f,
+                               headers={**ADMIN, 'Content-Type': 'application/x-ndjson'}).get_json()
+
+    summary, import_s, import_peak = measure(load)
+    import_trips = server.requests
+    stored = {row['user_id']: row['data'] for row in server.tables['resumes']}
+    assert summary.get('imported') == count and not summary.get('failed'), summary
+    if fmt == 'ndjson':
+        assert stored == expected
+    else:
+        assert len(stored) == count
+    return {
+        'rows': count,
+        'file_mb': os.path.getsize(path) / 1e6,
+        'export_s': export_s, 'export_trips': export_trips, 'export_peak': export_peak,
+        'import_s': import_s, 'import_trips': import_trips, 'import_peak': import_peak,
+    }
+
+
+def one_at_a_time(resume_app, server, count, docs):
+    db = resume_app.get_admin_supabase()
+    rows = seed(server, count, docs)
+    server.reset_counters()
+    start = time.perf_counter()
+    for row in rows:
+        data = fetch_resume(db, row['user_id'])
+        save_resume_data(db, row['user_id'], data)
+    return (time.perf_counter() - start) / count, server.requests / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--resumes', type=int, nargs='+', default=[5000, 20000])
+    parser.add_argument('--baseline', type=int, default=300, help='resumes moved one at a time')
+    parser.add_argument('--format', choices=('ndjson', 'jsonresume'), default='ndjson')
+    parser.add_argument('--latency', type=float, default=0.002,
+                        help='simulated server latency per request, in seconds')
+    parser.add_argument('--memory', action='store_true', help='trace peak memory (slow)')
+    args = parser.parse_args()
+
+    server = FakePostgrest(latency=args.latency).start()
+    os.environ.update({
+        'SUPABASE_URL': server.url,
+        'SUPABASE_KEY': 'bench-anon-key',
+        'SUPABASE_SERVICE_KEY': 'bench-service-key',
+        'ADMIN_TOKEN': 'bench-admin-token',
+    })
+    import app as resume_app
+    docs = [make_resume(3, seed=i) for i in range(50)]
+    if args.memory:
+        tracemalloc.start()
+    try:
+        results = [bulk(resume_app, server, count, docs, args.format) for count in args.resumes]
+        per_row, trips_per_row = one_at_a_time(resume_app, server, args.baseline, docs)
+    finally:
+        tracemalloc.stop()
+        server.stop()
+
+    print(f"{args.format}, {args.latency * 1000:g} ms per request; page {resume_app.BULK_PAGE_SIZE}, "
+          f"batch {resume_app.BULK_BATCH_SIZE} x {resume_app.BULK_CONCURRENCY} in flight")
+    print(f"{'rows':>8}{'file MB':>9}{'export s':>10}{'trips':>7}{'peak MB':>9}"
+          f"{'import s':>10}{'trips':>7}{'peak MB':>9}{'rows/s':>9}{'one-by-one s':>14}")
+    def mb(peak):
+        return f'{peak / 1e6:>9.1f}' if peak is not None else f"{'-':>9}"
+
+    for r in results:
+        rate = r['rows'] / (r['export_s'] + r['import_s'])
+        print(f"{r['rows']:>8}{r['file_mb']:>9.1f}{r['export_s']:>10.2f}{r['export_trips']:>7}{mb(r['export_peak'])}"
+              f"{r['import_s']:>10.2f}{r['import_trips']:>7}{mb(r['import_peak'])}"
+              f"{rate:>9.0f}{per_row * r['rows']:>14.0f}")
+    print(f"one at a time: {per_row * 1000:.2f} ms and {trips_per_row:.0f} round-trips per resume, "
+          f"measured over {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
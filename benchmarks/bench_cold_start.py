@@ -0,0 +1,119 @@
+"""Cold-start cost of the Vercel entry point, per route, in fresh interpreters.
+
+    python benchmarks/bench_cold_start.py --top 15 --json cold-start.json
+
+Every scenario runs in a new Python process under `-X importtime`. Each one
+imports api/index.py and serves its first request through the Flask test
+client. The report covers wall time, peak RSS and which heavy stacks got loaded,
+followed by the slowest imports of a bare `import api.index`. It exits non-zero
+if /login loads the LLM or PDF stacks. Use `--json` to keep the numbers per
+deploy.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STACKS = {
+    'supabase': ('supabase', 'postgrest', 'httpx'),
+    'llm': ('google.generativeai',),
+    'pdf': ('fpdf', 'PyPDF2'),
+    'numpy': ('numpy',),
+}
+
+# Runs inside the child; SCENARIO is substituted per run
+CHILD = '''
+import json, resource, sys, time
+start = time.perf_counter()
+import api.index
+app = api.index.app
+imported = time.perf_counter() - start
+client = app.test_client()
+with client.session_transaction() as s:
+    s['user'] = 'bench-user'
+SCENARIO
+print(json.dumps({
+    'import_ms': imported * 1000,
+    'total_ms': (time.perf_counter() - start) * 1000,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'modules': sorted(sys.modules),
+}))
+'''
+
+SCENARIOS = {
+    'import only': '',
+    'GET /login': "client.get('/login')",
+    'POST /login': "client.post('/login', data={'email': 'a@example.com', 'password': 'x'})",
+    'POST /api/match-score': "client.post('/api/match-score', json={'jd_text': 'python flask', 'resume': {}})",
+    'POST /generate-pdf': ("from benchmarks.synthetic import make_resume\n"
+                           "client.post('/generate-pdf', json=make_resume(3))"),
+    'first Gemini call': "import app as a; a.gemini_model()",
+}
+
+
+def run(code):
+    env = dict(os.environ)
+    # Unroutable backends: requests fail fast, but the client stacks still load
+    env.setdefault('SUPABASE_URL', 'http://127.0.0.1:9')
+    env.setdefault('SUPABASE_KEY', 'bench-anon-key')
+    env.setdefault('GEMINI_API_KEY', 'bench-key')
+    env['RESUME_FLUSH_INTERVAL'] = '0'
+    env['PDF_WORKERS'] = '0'
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD.replace('SCENARIO', code)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report['importtime'] = [line for line in result.stderr.splitlines() if line.startswith('import time:')]
+    return report
+
+
+def loaded_stacks(modules):
+    return [name for name, roots in STACKS.items() if any(root in modules for root in roots)]
+
+
+def slowest_imports(lines, top):
+    """Imports by cumulative time, like sorting `-X importtime` output."""
+    rows = []
+    for line in lines[1:]:
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative_us), name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--json', help='write the results to this file')
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'scenario':<24}{'import ms':>11}{'total ms':>10}{'RSS MB':>8}  stacks loaded")
+    for label, code in SCENARIOS.items():
+        report = run(code)
+        stacks = loaded_stacks(report['modules'])
+        results[label] = {k: report[k] for k in ('import_ms', 'total_ms', 'max_rss_mb')}
+        results[label]['stacks'] = stacks
+        print(f"{label:<24}{report['import_ms']:>11.1f}{report['total_ms']:>10.1f}"
+              f"{report['max_rss_mb']:>8.1f}  {', '.join(stacks) or '-'}")
+        if label == 'import only':
+            slowest = slowest_imports(report['importtime'], args.top)
+
+    print("\nslowest imports (cumulative ms):")
+    for cumulative_us, name in slowest:
+        print(f"{cumulative_us / 1000:>10.1f}  {name}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'scenarios': results, 'slowest_imports': slowest}, f, indent=2)
+
+    leaked = set(results['GET /login']['stacks'] + results['POST /login']['stacks']) & {'llm', 'pdf'}
+    print(f"\n/login loads LLM/PDF stacks: {', '.join(sorted(leaked)) if leaked else 'no'}")
+    sys.exit(1 if leaked else 0)
+
+
+if __name__ == '__main__':
+    main()
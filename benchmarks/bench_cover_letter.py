@@ -0,0 +1,79 @@
+"""Time to first byte and to the full letter: JSON vs. SSE /generate-cover-letter.
+
+    python benchmarks/bench_cover_letter.py --requests 5 --latency 3
+
+Drives the real route against the fake Gemini model, which streams its answer
+in chunks with the first one after 20% of `--latency`.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fakes.genai as fake_genai
+from fakes.genai import FakeGenerativeModel
+
+REQUEST = {
+    'job_title': 'Software Engineer', 'company_name': 'Example Corp', 'jd_summary': 'Build APIs.',
+    'user_name': 'Alex Example', 'user_email': 'alex@example.com', 'user_phone': '+1 555-0100',
+    'user_skills': 'Python, Flask', 'user_experience': 'Engineer at Company', 'user_summary': 'Engineer.',
+}
+
+
+def timed(client, headers):
+    """`(seconds to first body chunk, seconds to last, body)` for one request."""
+    start = time.perf_counter()
+    response = client.post('/generate-cover-letter', json=REQUEST, headers=headers, buffered=False)
+    first, chunks = None, []
+    for chunk in response.response:
+        if first is None:
+            first = time.perf_counter() - start
+        chunks.append(chunk if isinstance(chunk, bytes) else chunk.encode('utf-8'))
+    response.close()
+    return first, time.perf_counter() - start, b''.join(chunks).decode('utf-8')
+
+
+def letter_from_events(body):
+    text = ''
+    for event in body.split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in event.split('\n') if ': ' in line)
+        if lines.get('event') == 'chunk':
+            text += json.loads(lines['data'])['text']
+    return text.strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=3.0,
+                        help='simulated total generation time, in seconds')
+    args = parser.parse_args()
+
+    os.environ['GEMINI_API_KEY'] = 'bench-key'
+    import app as resume_app
+
+    FakeGenerativeModel.latency = args.latency
+    resume_app.genai = fake_genai
+    client = resume_app.app.test_client()
+    with client.session_transaction() as s:
+        s['user'] = 'bench-user'
+
+    results = {}
+    for label, headers in (('JSON', {}), ('SSE', {'Accept': 'text/event-stream'})):
+        runs = [timed(client, headers) for _ in range(args.requests)]
+        results[label] = runs
+    assert letter_from_events(results['SSE'][0][2]) == json.loads(results['JSON'][0][2])['cover_letter']
+
+    print(f"{'mode':<8}{'TTFB p50 ms':>14}{'total p50 ms':>15}")
+    for label, runs in results.items():
+        print(f"{label:<8}{statistics.median(r[0] for r in runs) * 1000:>14.1f}"
+              f"{statistics.median(r[1] for r in runs) * 1000:>15.1f}")
+    print('letters identical: yes')
+
+
+if __name__ == '__main__':
+    main()
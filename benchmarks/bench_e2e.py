@@ -0,0 +1,274 @@
+"""End-to-end throughput and latency of the main routes at increasing concurrency.
+
+    python benchmarks/bench_e2e.py --concurrency 1,4,16 --requests 40
+    python benchmarks/bench_e2e.py --output new.json --compare old.json
+
+Boots the real Flask app against the in-process PostgREST/auth stand-in and the
+fake Gemini model, signs in one user per client thread through /login, and
+drives /api/save-resume, /generate-pdf, /upload-pdf, /analyze-jd and
+/generate-cover-letter with small, medium and large synthetic resumes and job
+descriptions. Every request uses a different document, so the PDF and JD
+caches do not hide the work (bench_jd_cache.py measures the caches).
+
+Results are written as JSON together with the git commit, so two runs can be
+compared with `--compare`, which exits with status 1 when any p50 or
+throughput regressed by more than `--threshold`.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+import fakes.genai as fake_genai
+from fakes.genai import FakeGenerativeModel
+from fakes.postgrest import FakePostgrest
+from benchmarks.synthetic import WORDS, make_resume
+
+# Entries per resume section and words per job description
+SIZES = {'small': (2, 150), 'medium': (8, 600), 'large': (24, 2000)}
+
+
+def job_description(words, seed):
+    body = ' '.join(WORDS[(seed * 7 + j) % len(WORDS)] for j in range(words))
+    return f'Senior Engineer #{seed}\n\nResponsibilities:\n{body}\n\nContact: jobs{seed}@example.com'
+
+
+def make_pdf(entries, seed):
+    from pdf_layout import render_resume_pdf
+    return render_resume_pdf(make_resume(entries, seed))
+
+
+def save_resume(client, doc):
+    # Made against the version the client saved or loaded last, like the editor
+    response = client.post('/api/save-resume', json=doc['resume'],
+                           headers={'If-Match': f'"{client.resume_version}"'})
+    if response.status_code == 200:
+        client.resume_version = response.get_json()['version']
+    return response
+
+
+def generate_pdf(client, doc):
+    return client.post('/generate-pdf', json=doc['resume'])
+
+
+def upload_pdf(client, doc):
+    return client.post('/upload-pdf', data={'pdf': (io.BytesIO(doc['pdf']), 'resume.pdf')},
+                       content_type='multipart/form-data')
+
+
+def analyze_jd(client, doc):
+    return client.post('/analyze-jd', data={'jd_text': doc['jd']})
+
+
+def cover_letter(client, doc):
+    resume = doc['resume']
+    return client.post('/generate-cover-letter', json={
+        'job_title': 'Software Engineer', 'company_name': 'Example Corp',
+        'jd_summary': doc['jd'][:500], 'user_name': resume['personal']['fullName'],
+        'user_email': resume['personal']['email'], 'user_phone': resume['personal']['phone'],
+        'user_skills': ', '.join(s['items'] for s in resume['skills']),
+        'user_experience': '\n'.join(e['description'] for e in resume['experience']),
+        'user_summary': resume['summary'],
+    })
+
+
+ROUTES = {
+    '/api/save-resume': save_resume,
+    '/generate-pdf': generate_pdf,
+    '/upload-pdf': upload_pdf,
+    '/analyze-jd': analyze_jd,
+    '/generate-cover-letter': cover_letter,
+}
+
+
+def percentile(sorted_values, q):
+    return sorted_values[max(0, int(round(q * len(sorted_values))) - 1)]
+
+
+class Clients:
+    """One signed-in test client per worker thread, each a different user."""
+
+    def __init__(self, app):
+        self.app = app
+        self.local = threading.local()
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def get(self):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            with self.lock:
+                self.count += 1
+                n = self.count
+            client = self.app.test_client()
+            response = client.post('/login', data={'email': f'bench{n}@example.com', 'password': 'bench'})
+            assert response.status_code == 302, response.get_data(as_text=True)
+            # The version the editor would load, which saves are made against
+            client.resume_version = client.get('/api/resume-data').headers['ETag'].strip('"')
+            self.local.client = client
+        return client
+
+
+def run(app, route, fn, docs, concurrency, server):
+    # Fresh threads, and so fresh clients, for every level
+    clients = Clients(app)
+    server.reset_counters()
+    FakeGenerativeModel.reset_counters()
+    errors = 0
+
+    def one(doc):
+        nonlocal errors
+        client = clients.get()
+        start = time.perf_counter()
+        response = fn(client, doc)
+        elapsed = time.perf_counter() - start
+        if response.status_code >= 400:
+            errors += 1
+        response.close()
+        return elapsed
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        # Start every thread and sign it in outside the timed window
+        ready = threading.Barrier(concurrency)
+        list(pool.map(lambda _: (clients.get(), ready.wait()), range(concurrency)))
+        server.reset_counters()
+        start = time.perf_counter()
+        timings = sorted(pool.map(one, docs))
+        wall = time.perf_counter() - start
+    return {
+        'route': route,
+        'requests': len(docs),
+        'concurrency': concurrency,
+        'errors': errors,
+        'throughput_rps': len(docs) / wall,
+        'mean_ms': statistics.mean(timings) * 1000,
+        'p50_ms': statistics.median(timings) * 1000,
+        'p99_ms': percentile(timings, 0.99) * 1000,
+        'db_round_trips': server.requests,
+        'llm_calls': FakeGenerativeModel.calls,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    """Print the change against a previous run; returns True if anything regressed."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    old = {(r['route'], r['size'], r['concurrency']): r for r in baseline['results']}
+    print(f"\nagainst {baseline_path} (commit {baseline['meta'].get('commit')}):")
+    print(f"{'route':<24}{'size':<8}{'conc':>5}{'p50':>10}{'p99':>10}{'req/s':>10}")
+    regressed = False
+    for r in results:
+        before = old.get((r['route'], r['size'], r['concurrency']))
+        if before is None:
+            continue
+        p50 = r['p50_ms'] / before['p50_ms'] - 1
+        p99 = r['p99_ms'] / before['p99_ms'] - 1
+        rps = r['throughput_rps'] / before['throughput_rps'] - 1
+        flag = p50 > threshold or rps < -threshold
+        regressed |= flag
+        print(f"{r['route']:<24}{r['size']:<8}{r['concurrency']:>5}{p50:>+10.1%}{p99:>+10.1%}{rps:>+10.1%}"
+              + ('  REGRESSED' if flag else ''))
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', default='1,4,16', help='comma-separated client thread counts')
+    parser.add_argument('--requests', type=int, default=40, help='requests per route, size and level')
+    parser.add_argument('--sizes', default=','.join(SIZES))
+    parser.add_argument('--routes', default=','.join(ROUTES))
+    parser.add_argument('--db-latency', type=float, default=0.002,
+                        help='simulated Supabase latency per request, in seconds')
+    parser.add_argument('--llm-latency', type=float, default=0.5,
+                        help='simulated Gemini latency per call, in seconds')
+    parser.add_argument('--output', default=None,
+                        help='JSON results file (default: bench-e2e-<commit>.json)')
+    parser.add_argument('--compare', default=None, help='earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='relative p50/throughput change counted as a regression')
+    args = parser.parse_args()
+
+    levels = [int(c) for c in args.concurrency.split(',')]
+    sizes = args.sizes.split(',')
+    routes = args.routes.split(',')
+
+    server = FakePostgrest(latency=args.db_latency).start()
+    os.environ.update({
+        'SUPABASE_URL': server.url,
+        'SUPABASE_KEY': 'bench-anon-key',
+        'GEMINI_API_KEY': 'bench-key',
+        'RESUME_FLUSH_INTERVAL': '0',
+        'JD_CACHE_PATH': '',
+    })
+    import app as resume_app
+    resume_app.genai = fake_genai
+    FakeGenerativeModel.latency = args.llm_latency
+
+    results = []
+    print(f"{'route':<24}{'size':<8}{'conc':>5}{'req/s':>9}{'p50 ms':>10}{'p99 ms':>10}"
+          f"{'errors':>8}{'db trips':>10}{'llm':>6}")
+    try:
+        for size in sizes:
+            entries, words = SIZES[size]
+            n = args.requests * len(levels)
+            # Every request gets its own document, different across levels too
+            docs = [{'resume': make_resume(entries, i), 'jd': job_description(words, i)} for i in range(n)]
+            if '/upload-pdf' in routes:
+                pdfs = [make_pdf(entries, i) for i in range(min(n, 20))]
+                for i, doc in enumerate(docs):
+                    doc['pdf'] = pdfs[i % len(pdfs)]
+            for route in routes:
+                # One untimed request loads the route's lazy imports first
+                warmup = {'resume': make_resume(entries, -1), 'jd': job_description(words, -1), 'pdf': docs[0].get('pdf')}
+                ROUTES[route](Clients(resume_app.app).get(), warmup).close()
+                for level_index, level in enumerate(levels):
+                    batch = docs[level_index * args.requests:(level_index + 1) * args.requests]
+                    result = {'size': size, **run(resume_app.app, route, ROUTES[route], batch, level, server)}
+                    results.append(result)
+                    print(f"{route:<24}{size:<8}{level:>5}{result['throughput_rps']:>9.1f}"
+                          f"{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}{result['errors']:>8}"
+                          f"{result['db_round_trips'] / result['requests']:>10.2f}{result['llm_calls']:>6}")
+    finally:
+        server.stop()
+
+    commit = git_commit()
+    output = args.output or f"bench-e2e-{commit or 'unknown'}.json"
+    with open(output, 'w') as f:
+        json.dump({
+            'meta': {
+                'commit': commit,
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+                'pdf_workers': resume_app.pdf_jobs.workers,
+                'args': vars(args),
+            },
+            'results': results,
+        }, f, indent=2)
+    print(f"\nresults written to {output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
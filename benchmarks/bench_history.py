@@ -0,0 +1,129 @@
+"""Storage and reconstruction cost of the resume version history.
+
+    python benchmarks/bench_history.py --saves 500 --chains 10 50 200 --latency 0.002
+
+Replays `--saves` autosaves of typical edits to a medium resume: typing into a
+description, editing a skill list, adding or removing an entry. Each save is
+recorded with each `--chains` setting. The report covers:
+
+- bytes stored against a full copy per save, and the write amplification over
+  the edits themselves (the sum of the minimal patches);
+- round-trips per recorded save;
+- the latency and round-trips to rebuild random versions with no cached head.
+"""
+import argparse
+import copy
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supabase import create_client
+
+from fakes.postgrest import FakePostgrest
+from benchmarks.synthetic import make_resume, sentence
+from json_patch import diff_json
+from resume_history import ResumeHistory
+
+
+def edit(rng, data):
+    """One autosave's worth of change."""
+    data = copy.deepcopy(data)
+    section = rng.choice(('experience', 'experience', 'projects', 'skills', 'summary', 'add', 'remove'))
+    if section == 'summary':
+        data['summary'] += ' ' + rng.choice(sentence(rng).split())
+    elif section == 'skills':
+        skill = rng.choice(data['skills'])
+        skill['items'] += ', ' + rng.choice(sentence(rng).split()).lower()
+    elif section == 'add':
+        data['experience'].insert(0, {'title': 'New role', 'company': 'Company', 'location': 'Remote',
+                                      'startDate': '2024-01', 'endDate': 'Present', 'description': sentence(rng)})
+    elif section == 'remove' and len(data['experience']) > 2:
+        data['experience'].pop(rng.randrange(len(data['experience'])))
+    else:
+        entry = rng.choice(data[section])
+        entry['description'] += ' ' + rng.choice(sentence(rng).split())
+    return data
+
+
+def size(value):
+    return len(json.dumps(value, separators=(',', ':')))
+
+
+def p99(values):
+    values = sorted(values)
+    return values[max(0, int(round(0.99 * len(values))) - 1)]
+
+
+def run(server, db, docs, max_chain, samples, rng):
+    history = ResumeHistory(max_chain=max_chain)
+    user_id = f'user-{max_chain}'
+    server.reset_counters()
+    for i, doc in enumerate(docs):
+        history.record(db, user_id, doc, f'v{i}')
+    write_round_trips = server.requests / len(docs)
+    stored = sum(r['size'] for r in server.tables['resume_versions'] if r['user_id'] == user_id)
+
+    timings, round_trips, replayed = [], [], []
+    for seq in rng.sample(range(1, len(docs) + 1), min(samples, len(docs))):
+        history = ResumeHistory(max_chain=max_chain)
+        server.reset_counters()
+        start = time.perf_counter()
+        data, _ = history.load(db, user_id, seq)
+        timings.append(time.perf_counter() - start)
+        round_trips.append(server.requests)
+        replayed.append(history.deltas_replayed)
+        assert data == docs[seq - 1]
+    return {
+        'max_chain': max_chain,
+        'stored_bytes': stored,
+        'write_round_trips': write_round_trips,
+        'read_p50_ms': statistics.median(timings) * 1000,
+        'read_p99_ms': p99(timings) * 1000,
+        'read_round_trips': statistics.mean(round_trips),
+        'snapshots': sum(1 for r in server.tables['resume_versions']
+                         if r['user_id'] == user_id and r['kind'] == 'snapshot'),
+        'replayed': statistics.mean(replayed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--saves', type=int, default=500)
+    parser.add_argument('--entries', type=int, default=8)
+    parser.add_argument('--chains', type=int, nargs='+', default=[10, 50, 200])
+    parser.add_argument('--samples', type=int, default=50, help='versions rebuilt per setting')
+    parser.add_argument('--latency', type=float, default=0.002,
+                        help='simulated server latency per request, in seconds')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    docs = [make_resume(args.entries)]
+    for _ in range(args.saves - 1):
+        docs.append(edit(rng, docs[-1]))
+    full_copies = sum(size(d) for d in docs)
+    edits = size(docs[0]) + sum(size(diff_json(a, b)) for a, b in zip(docs, docs[1:]))
+
+    server = FakePostgrest(latency=args.latency).start()
+    try:
+        db = create_client(server.url, 'bench-anon-key')
+        results = [run(server, db, docs, chain, args.samples, rng) for chain in args.chains]
+    finally:
+        server.stop()
+
+    print(f"{args.saves} saves of a {size(docs[-1]):,} B resume; full copies {full_copies:,} B, "
+          f"edits {edits:,} B")
+    print(f"{'max chain':>9}{'stored B':>12}{'vs copies':>11}{'vs edits':>10}{'snapshots':>11}"
+          f"{'write RT':>10}{'read p50 ms':>13}{'read p99 ms':>13}{'read RT':>9}{'replayed':>10}")
+    for r in results:
+        print(f"{r['max_chain']:>9}{r['stored_bytes']:>12,}{r['stored_bytes'] / full_copies:>10.1%}"
+              f"{r['stored_bytes'] / edits:>9.2f}x{r['snapshots']:>11}{r['write_round_trips']:>10.2f}"
+              f"{r['read_p50_ms']:>13.2f}{r['read_p99_ms']:>13.2f}{r['read_round_trips']:>9.1f}{r['replayed']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
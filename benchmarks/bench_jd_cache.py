@@ -0,0 +1,87 @@
+"""JD analysis latency and upstream model calls with the response cache.
+
+    python benchmarks/bench_jd_cache.py --postings 20 --burst 16 --latency 0.5
+
+Drives the real /analyze-jd route against a fake Gemini model that sleeps for
+`--latency` seconds per call. Scenarios: distinct postings (cold), the same
+postings again with re-flowed whitespace (warm), a burst of concurrent identical
+new postings (single flight), and a fresh cache on the same SQLite file
+(restart).
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fakes.genai as fake_genai
+from fakes.genai import FakeGenerativeModel
+from benchmarks.synthetic import WORDS
+
+
+def posting(i):
+    words = ' '.join(WORDS[(i + j) % len(WORDS)] for j in range(200))
+    return f'Senior Engineer #{i}\n\nResponsibilities:\n{words}\n\nContact: jobs{i}@example.com'
+
+
+def run(client, texts, concurrency=1):
+    FakeGenerativeModel.reset_counters()
+
+    def one(text):
+        start = time.perf_counter()
+        response = client().post('/analyze-jd', data={'jd_text': text})
+        assert response.status_code == 200, response.get_data(as_text=True)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        timings = list(pool.map(one, texts))
+    return FakeGenerativeModel.calls, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--postings', type=int, default=20)
+    parser.add_argument('--burst', type=int, default=16)
+    parser.add_argument('--latency', type=float, default=0.5,
+                        help='simulated model latency per call, in seconds')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    os.environ['GEMINI_API_KEY'] = 'bench-key'
+    os.environ['JD_CACHE_PATH'] = os.path.join(directory, 'jd-cache.sqlite3')
+    import app as resume_app
+    from llm_cache import LLMCache
+
+    FakeGenerativeModel.latency = args.latency
+    resume_app.genai = fake_genai
+
+    def client():
+        c = resume_app.app.test_client()
+        with c.session_transaction() as s:
+            s['user'] = 'bench-user'
+        return c
+
+    texts = [posting(i) for i in range(args.postings)]
+    scenarios = [
+        ('cold', texts, 1),
+        ('warm (reflowed text)', ['  ' + t.replace('\n', '\n\n ').upper() for t in texts], 1),
+        (f'burst x{args.burst}', [posting(10 ** 6)] * args.burst, args.burst),
+    ]
+    print(f"{'scenario':<24}{'requests':>9}{'model calls':>13}{'p50 ms':>10}{'max ms':>10}")
+    for label, batch, concurrency in scenarios:
+        calls, timings = run(client, batch, concurrency)
+        print(f"{label:<24}{len(batch):>9}{calls:>13}{statistics.median(timings) * 1000:>10.1f}"
+              f"{max(timings) * 1000:>10.1f}")
+
+    resume_app.jd_cache = LLMCache(path=os.environ['JD_CACHE_PATH'])
+    calls, timings = run(client, texts)
+    print(f"{'restart (SQLite)':<24}{len(texts):>9}{calls:>13}{statistics.median(timings) * 1000:>10.1f}"
+          f"{max(timings) * 1000:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+"""Prompt size, latency and kept content of JD preprocessing vs. a fixed cut.
+
+    python benchmarks/bench_jd_prompt.py --postings 200 --budget 1500 --prompt-latency 0.2
+
+Generates job postings of the kinds seen in practice: PDF exports with running
+headers and page footers, postings that open with a long company pitch, and
+plain paragraphs without headings. Most carry EEO, legal and benefits text.
+Each is turned into an analysis prompt twice: cut at the first 10,000
+characters, as before, and packed by `prepare_jd()`. The report covers:
+
+- estimated prompt tokens, and the share saved;
+- how many of the posting's required skills, job titles, companies and
+  recruiter emails reach the model;
+- preprocessing time, and the model latency with `--prompt-latency` seconds
+  per 1,000 prompt tokens on top of `--latency`.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fakes.genai import FakeGenerativeModel
+from benchmarks.synthetic import WORDS
+from jd_preprocess import estimate_tokens, prepare_jd
+
+SKILLS = (
+    'Python Go Rust Java TypeScript Kotlin Scala Terraform Kubernetes Docker PostgreSQL Redis Kafka '
+    'Spark Airflow GraphQL React Django FastAPI gRPC Snowflake dbt Elasticsearch RabbitMQ Ansible'
+).split()
+TITLES = ('Senior Backend Engineer', 'Data Engineer', 'Platform Engineer', 'Staff Software Engineer',
+          'Machine Learning Engineer', 'Site Reliability Engineer')
+COMPANIES = ('Northwind Labs', 'Acme Analytics', 'Globex Cloud', 'Initech Payments', 'Umbrella Health')
+
+EEO = (
+    '{company} is an equal opportunity employer. All qualified applicants will receive consideration for '
+    'employment without regard to race, color, religion, sex, sexual orientation, gender identity, national '
+    'origin, disability, or protected veteran status. We provide reasonable accommodation to qualified '
+    'individuals with disabilities throughout the application process. {company} participates in E-Verify. '
+    'Pursuant to local fair chance ordinances, we will consider qualified applicants with criminal histories. '
+    'We do not accept unsolicited resumes from recruitment agencies. Read our privacy notice for applicants '
+    'to learn how we process personal data submitted with an application.'
+)
+BENEFITS = [
+    'Comprehensive medical insurance, dental insurance and vision insurance for you and your family',
+    '401(k) matching up to 6% and an employee stock options program',
+    'Unlimited paid time off plus 12 company holidays',
+    '16 weeks of fully paid parental leave',
+    'Monthly wellness stipend and gym membership',
+    'Annual learning budget and tuition reimbursement',
+    'Flexible working hours and a home office allowance',
+    'Free lunch and snacks in every office, plus commuter benefits',
+]
+
+
+def words(rng, n):
+    return ' '.join(rng.choice(WORDS) for _ in range(n))
+
+
+def paragraph(rng, sentences):
+    return ' '.join(words(rng, rng.randint(12, 22)).capitalize() + '.' for _ in range(sentences))
+
+
+def posting(i):
+    """`(text, facts)` for posting `i`; facts are what the analysis must see."""
+    rng = random.Random(i)
+    kind = ('paged', 'pitch', 'plain')[i % 3]
+    title, company = rng.choice(TITLES), rng.choice(COMPANIES)
+    skills = rng.sample(SKILLS, 6)
+    email = f'talent{i}@{company.split()[0].lower()}.example.com'
+    years = f'{rng.randint(2, 8)}+ years'
+    pitch = rng.randint(4, 24) if kind == 'pitch' else rng.randint(1, 3)
+
+    responsibilities = [f'- {words(rng, rng.randint(8, 16)).capitalize()}' for _ in range(rng.randint(5, 9))]
+    requirements = [f'- {years} of professional software engineering experience'] + [
+        f'- Strong experience with {skill} and {words(rng, rng.randint(3, 8))}' for skill in skills]
+    benefits = [f'- {b}' for b in rng.sample(BENEFITS, rng.randint(4, len(BENEFITS)))]
+
+    if kind == 'plain':
+        blocks = [
+            f'{title} at {company}',
+            paragraph(rng, pitch * 3),
+            'In this role you will ' + '; '.join(r[2:].lower() for r in responsibilities) + '.',
+            f'You bring {years} of experience, with ' + ', '.join(skills) + '. ' + paragraph(rng, 2),
+            'We offer ' + '; '.join(b[2:].lower() for b in benefits) + '.',
+            EEO.format(company=company),
+            f'Send your resume to {email}.',
+        ]
+    else:
+        blocks = [
+            f'{title}\n{company} · Remote · Full-time',
+            'About Us\n' + '\n\n'.join(paragraph(rng, 4) for _ in range(pitch)),
+            'What You Will Do:\n' + '\n'.join(responsibilities),
+            'Requirements\n' + '\n'.join(requirements),
+            'Nice to Have\n' + '\n'.join(f'- Exposure to {s}' for s in rng.sample(SKILLS, 3)),
+            'Benefits & Perks\n' + '\n'.join(benefits),
+            'Equal Opportunity Statement\n' + EEO.format(company=company),
+            f'How to Apply\nEmail your resume to {email} with the subject "{title}".',
+        ]
+    text = '\n\n'.join(blocks)
+    if kind == 'paged':
+        lines, paged, page = text.split('\n'), [], 1
+        for n, line in enumerate(lines):
+            if n % 30 == 0:
+                paged.append(f'{company} | Careers | {title}')
+            paged.append(line.replace(' ', '  ') if n % 4 == 0 else line)
+            if n % 30 == 29:
+                paged += ['', f'Page {page} of {len(lines) // 30 + 1}', '']
+                page += 1
+        text = '\n'.join(paged)
+    return text, {'skills': skills, 'title': title, 'company': company, 'email': email, 'years': years}
+
+
+def kept(text, facts):
+    lowered = text.lower()
+    return {
+        'skills': sum(s.lower() in lowered for s in facts['skills']) / len(facts['skills']),
+        'title': facts['title'].lower() in lowered,
+        'company': facts['company'].lower() in lowered,
+        'email': facts['email'] in text,
+        'years': facts['years'] in text,
+    }
+
+
+def model_latency(prompts):
+    model = FakeGenerativeModel()
+    timings = []
+    for prompt in prompts:
+        start = time.perf_counter()
+        model.generate_content(prompt)
+        timings.append(time.perf_counter() - start)
+    return statistics.mean(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--postings', type=int, default=200)
+    parser.add_argument('--budget', type=int, default=1500, help='JD token budget')
+    parser.add_argument('--cut', type=int, default=10000, help='characters kept by the fixed cut')
+    parser.add_argument('--latency', type=float, default=0.5, help='model latency per call, in seconds')
+    parser.add_argument('--prompt-latency', type=float, default=0.2,
+                        help='extra model latency per 1,000 prompt tokens, in seconds')
+    parser.add_argument('--calls', type=int, default=20, help='model calls timed per variant')
+    args = parser.parse_args()
+
+    os.environ['JD_TOKEN_BUDGET'] = str(args.budget)
+    from app import jd_prompt
+
+    postings = [posting(i) for i in range(args.postings)]
+    variants = {'fixed cut': [], 'prepared': []}
+    prep_seconds, dropped = [], []
+    for text, facts in postings:
+        variants['fixed cut'].append((jd_prompt(text[:args.cut]), kept(text[:args.cut], facts)))
+        start = time.perf_counter()
+        prepared = prepare_jd(text, args.budget)
+        prep_seconds.append(time.perf_counter() - start)
+        dropped.append(prepared['dropped'])
+        variants['prepared'].append((jd_prompt(prepared['text']), kept(prepared['text'], facts)))
+
+    FakeGenerativeModel.latency = args.latency
+    FakeGenerativeModel.prompt_latency = args.prompt_latency
+    raw_tokens = statistics.mean(estimate_tokens(jd_prompt(text)) for text, _ in postings)
+    print(f"{args.postings} postings, mean {raw_tokens:,.0f} prompt tokens uncut; budget {args.budget}; "
+          f"preprocessing p50 {statistics.median(prep_seconds) * 1000:.2f} ms, max {max(prep_seconds) * 1000:.2f} ms")
+    print('mean tokens trimmed as ' + ', '.join(
+        f'{reason} {statistics.mean(d[reason] for d in dropped):,.0f}' for reason in dropped[0]))
+    print(f"{'variant':<11}{'tokens':>8}{'max':>7}{'saved':>8}{'skills':>8}{'years':>7}{'title':>7}"
+          f"{'company':>9}{'email':>7}{'model s':>9}")
+    baseline = None
+    for name, results in variants.items():
+        tokens = [estimate_tokens(prompt) for prompt, _ in results]
+        mean_tokens = statistics.mean(tokens)
+        baseline = baseline or mean_tokens
+
+        def share(key):
+            return statistics.mean(float(k[key]) for _, k in results)
+
+        latency = model_latency([prompt for prompt, _ in results[:args.calls]])
+        print(f"{name:<11}{mean_tokens:>8,.0f}{max(tokens):>7,}{1 - mean_tokens / baseline:>8.0%}"
+              f"{share('skills'):>8.0%}{share('years'):>7.0%}{share('title'):>7.0%}{share('company'):>9.0%}"
+              f"{share('email'):>7.0%}{latency:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Local match scoring latency for one resume against batches of job descriptions.
+
+    python benchmarks/bench_match_score.py --batches 1 10 100 1000
+
+Times the NumPy path (when NumPy is installed) and the pure-Python fallback,
+and checks that both give the same scores.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import match_scoring
+from benchmarks.synthetic import WORDS, make_resume
+
+EXTRA = 'java kafka spring aws terraform rust golang sql tableau graphql redis typescript'.split()
+
+
+def postings(count, seed=0):
+    rng = random.Random(seed)
+    vocab = WORDS + EXTRA
+    return [' '.join(rng.choice(vocab) for _ in range(300)) for _ in range(count)]
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--batches', type=int, nargs='+', default=[1, 10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    resume = make_resume(5)
+    numpy = match_scoring.np
+    print(f"{'JDs':>6}{'numpy ms':>11}{'pure ms':>10}{'ms per JD':>11}")
+    for count in args.batches:
+        jds = postings(count)
+        match_scoring.np = None
+        pure, expected = best_of(lambda: match_scoring.score_resume(resume, jds), args.repeat)
+        match_scoring.np = numpy
+        if numpy is not None:
+            vectorized, got = best_of(lambda: match_scoring.score_resume(resume, jds), args.repeat)
+            assert [r['score'] for r in got] == [r['score'] for r in expected]
+            label = f'{vectorized * 1000:>11.2f}'
+        else:
+            vectorized, label = pure, f"{'n/a':>11}"
+        print(f"{count:>6}{label}{pure * 1000:>10.2f}{min(pure, vectorized) / count * 1000:>11.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""Resume parser throughput in pages per second on a corpus of synthetic resumes.
+
+    python benchmarks/bench_parser.py --resumes 50 --entries 6 --repeat 5
+
+Each synthetic resume is rendered with the real PDF layout and its text is
+extracted once up front, so the parse columns time the parsers alone. The
+extract column is PyPDF2 page extraction for reference. Also reports how many
+section entries the new parser recovers from the rendered text.
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_resume
+from pdf_layout import render_resume_pdf
+from resume_parser import iter_pdf_pages, parse_resume_pages
+
+SECTIONS = ('skills', 'experience', 'education', 'projects', 'certifications')
+
+
+def legacy_parse_resume_text(text):
+    data = {'name': '', 'email': '', 'phone': '', 'location': '',
+            'linkedin': '', 'github': '', 'portfolio': '', 'summary': ''}
+    for i, line in enumerate(text.split('\n')):
+        line = line.strip()
+        if '@' in line and ('.' in line or 'gmail' in line.lower() or 'yahoo' in line.lower()):
+            if not data['email']:
+                data['email'] = line.split()[0] if ' ' in line else line
+        if ('+' in line or '-' in line) and any(c.isdigit() for c in line):
+            if len(line) < 20 and any(c.isdigit() for c in line):
+                if not data['phone']:
+                    data['phone'] = line
+        if 'linkedin' in line.lower():
+            if not data['linkedin']:
+                data['linkedin'] = line.strip()
+        if 'github' in line.lower():
+            if not data['github']:
+                data['github'] = line.strip()
+        if 'portfolio' in line.lower() or 'website' in line.lower():
+            if not data['portfolio']:
+                data['portfolio'] = line.strip()
+        if not data['name'] and i < 5 and len(line) > 2 and len(line) < 100:
+            if not any(c.isdigit() for c in line) and '@' not in line and '+' not in line:
+                data['name'] = line
+    return data
+
+
+def corpus(resumes, entries):
+    """`(source data, pdf bytes, page texts)` for every synthetic resume."""
+    docs = []
+    for seed in range(resumes):
+        data = make_resume(entries, seed)
+        pdf = render_resume_pdf(data)
+        docs.append((data, pdf, list(iter_pdf_pages(io.BytesIO(pdf)))))
+    return docs
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--resumes', type=int, default=50)
+    parser.add_argument('--entries', type=int, default=6)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    docs = corpus(args.resumes, args.entries)
+    pages = sum(len(texts) for _, _, texts in docs)
+    texts = ['\n'.join(t) for _, _, t in docs]
+
+    extract = best_of(lambda: [list(iter_pdf_pages(io.BytesIO(pdf))) for _, pdf, _ in docs], 1)
+    legacy = best_of(lambda: [legacy_parse_resume_text(t) for t in texts], args.repeat)
+    new = best_of(lambda: [parse_resume_pages(t) for _, _, t in docs], args.repeat)
+
+    expected = found = 0
+    for data, _, page_texts in docs:
+        parsed = parse_resume_pages(page_texts)
+        for key in SECTIONS:
+            expected += len(data[key])
+            found += sum(1 for a, b in zip(parsed[key], data[key])
+                         if all(a.get(k) == v for k, v in b.items() if k != 'link'))
+
+    print(f"{args.resumes} resumes, {pages} pages")
+    print(f"{'stage':<28}{'pages/s':>12}{'ms/page':>10}")
+    for label, seconds in (('PDF text extraction', extract), ('legacy parse (contacts)', legacy),
+                           ('regex parse (all sections)', new)):
+        print(f"{label:<28}{pages / seconds:>12.0f}{seconds / pages * 1000:>10.3f}")
+    print(f"section entries recovered exactly: {found}/{expected}")
+
+
+if __name__ == '__main__':
+    main()
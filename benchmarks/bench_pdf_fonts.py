@@ -0,0 +1,119 @@
+"""Render time, size and Unicode fidelity of the PDF themes.
+
+    python benchmarks/bench_pdf_fonts.py --resumes 40 --themes sans serif mono
+
+Renders `--resumes` resumes, each with some non-Latin names and places, in
+every theme and in three ways:
+
+- classic: the core Arial font, with everything outside latin-1 sanitized away;
+- per request: the theme's TTF files added to every document with
+  `FPDF.add_font()`, so each render parses the fonts and subsets the full files;
+- shared: the fonts parsed once per process, with cached subsets (pdf_fonts.py).
+
+The fragment cache is cleared before every render so each one lays out the
+whole resume. "first" is the first render after clearing the font caches, as
+in a fresh worker; "p50" is the median of the rest. "kept" is the share of the
+non-ASCII characters in the resumes that reach the PDF.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdf_fonts
+from benchmarks.synthetic import make_resume
+from pdf_layout import fragment_cache, render_resume_pdf
+
+NAMES = [
+    ('Łukasz Wiśniewski', 'Kraków, Polska'),
+    ('Дмитрий Соколов', 'Санкт-Петербург'),
+    ('Νίκος Παπαδόπουλος', 'Αθήνα'),
+    ('Nguyễn Thị Hương', 'Hà Nội, Việt Nam'),
+    ('Çağla Şahin', 'İstanbul'),
+    ('Zoë Brontë–Müller', 'Zürich'),
+    ('王小明', '上海'),
+    ('Alex Example', 'Remote'),
+]
+
+
+class PerRequestTheme(pdf_fonts.Theme):
+    """Adds the fonts to each document the way fpdf does by default."""
+
+    def add_fonts(self, pdf):
+        for style, path in self.files.items():
+            pdf.add_font(self.family, style, path)
+
+
+def resumes(count):
+    docs = []
+    for i in range(count):
+        data = make_resume(3, seed=i)
+        name, place = NAMES[i % len(NAMES)]
+        data['personal'].update(fullName=name, location=place)
+        data['experience'][0]['company'] = f'{name.split()[-1]} – “Consulting”'
+        docs.append(data)
+    return docs
+
+
+def non_ascii(data):
+    text = ''.join(str(v) for v in (data['personal']['fullName'], data['personal']['location'],
+                                     data['experience'][0]['company']))
+    return [char for char in text if not char.isascii()]
+
+
+def run(docs, theme, mode):
+    if mode == 'per request':
+        theme = PerRequestTheme(theme.name, theme.files)
+        pdf_fonts._themes[theme.name] = theme
+    pdf_fonts._fonts.clear()
+    pdf_fonts.subset_cache.clear()
+    seconds, sizes, kept = [], [], []
+    try:
+        for data in docs:
+            fragment_cache.clear()
+            data = dict(data, theme=theme.name)
+            start = time.perf_counter()
+            sizes.append(len(render_resume_pdf(data)))
+            seconds.append(time.perf_counter() - start)
+            chars = non_ascii(data)
+            clean = non_ascii(theme.sanitize(data))
+            kept.append(sum(a == b for a, b in zip(chars, clean)) / len(chars) if chars else 1.0)
+    finally:
+        pdf_fonts._themes.pop(theme.name, None)
+    return {
+        'first': seconds[0],
+        'p50': statistics.median(seconds[1:]),
+        'kb': statistics.mean(sizes) / 1024,
+        'kept': statistics.mean(kept),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--resumes', type=int, default=40)
+    parser.add_argument('--themes', nargs='+', default=['sans', 'serif', 'mono'], choices=list(pdf_fonts.THEMES))
+    args = parser.parse_args()
+
+    docs = resumes(args.resumes)
+    # Warm up imports and the classic fragment of every code path
+    render_resume_pdf(dict(docs[0], theme='classic'))
+    rows = [('classic', '-', run(docs, pdf_fonts.get_theme('classic'), 'classic'))]
+    for name in args.themes:
+        theme = pdf_fonts.get_theme(name)
+        if theme.name != name:
+            print(f"{name}: fonts not installed, skipped")
+            continue
+        for mode in ('per request', 'shared'):
+            rows.append((name, mode, run(docs, theme, mode)))
+
+    print(f"{args.resumes} resumes")
+    print(f"{'theme':<9}{'fonts':<13}{'first ms':>9}{'p50 ms':>8}{'PDF KB':>8}{'kept':>7}")
+    for name, mode, r in rows:
+        print(f"{name:<9}{mode:<13}{r['first'] * 1000:>9.1f}{r['p50'] * 1000:>8.1f}{r['kb']:>8.1f}{r['kept']:>7.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""Where /generate-pdf renders run, and what that does to the other routes.
+
+    python benchmarks/bench_pdf_jobs.py --requests 60 --threads 8
+
+Sends `--requests` /generate-pdf calls per resume size from `--threads` request
+threads, one user each, while another user reads /api/resume-data in a loop,
+and reports the render and read latencies. "inline" renders everything in the
+web worker (PDF_WORKERS=0); "default" uses the job queue with its default
+settings, so the "pooled" column shows how many renders PDF_SYNC_MAX_BYTES
+sends to the pool.
+Every request renders a different resume, so the PDF cache does not answer it.
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_e2e import Clients
+from fakes.postgrest import FakePostgrest
+from benchmarks.synthetic import make_resume
+
+# Entries per resume section
+SIZES = {'small': 2, 'medium': 8, 'large': 24}
+
+
+def run(resume_app, queue, entries, requests, threads, offset):
+    resume_app.pdf_jobs = queue
+    before = queue.stats()
+    clients = Clients(resume_app.app)
+    done = threading.Event()
+
+    def render(i):
+        start = time.perf_counter()
+        status = clients.get().post('/generate-pdf', json=make_resume(entries, offset + i)).status_code
+        return status, time.perf_counter() - start
+
+    def read():
+        client = clients.get()
+        timings = []
+        while not done.is_set():
+            start = time.perf_counter()
+            status = client.get('/api/resume-data').status_code
+            timings.append((status, time.perf_counter() - start))
+            time.sleep(0.005)
+        return timings
+
+    with ThreadPoolExecutor(max_workers=threads + 1) as pool:
+        reader = pool.submit(read)
+        renders = list(pool.map(render, range(requests)))
+        done.set()
+        reads = reader.result()
+    after = queue.stats()
+    return {
+        'errors': sum(1 for status, _ in renders + reads if status != 200),
+        'pdf_p50': statistics.median(t for _, t in renders),
+        'read_p50': statistics.median(t for _, t in reads),
+        'read_p99': p99([t for _, t in reads]),
+        'inline': after['inline'] - before['inline'],
+        'pooled': after['submitted'] - before['submitted'],
+    }
+
+
+def p99(values):
+    values = sorted(values)
+    return values[max(0, int(round(0.99 * len(values))) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=60)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--sizes', default=','.join(SIZES))
+    args = parser.parse_args()
+
+    server = FakePostgrest(latency=0.002).start()
+    os.environ.update({
+        'SUPABASE_URL': server.url,
+        'SUPABASE_KEY': 'bench-anon-key',
+        'GEMINI_API_KEY': 'bench-key',
+        'RESUME_FLUSH_INTERVAL': '0',
+    })
+    import app as resume_app
+    from pdf_jobs import JobQueue
+
+    queues = {'inline': JobQueue(workers=0), 'default': resume_app.pdf_jobs}
+    # Start the pool and load fpdf in both processes before timing anything
+    for queue in queues.values():
+        run(resume_app, queue, 1, 4, 2, -100)
+
+    print(f"{args.requests} /generate-pdf per size, {args.threads} request threads, "
+          f"{resume_app.pdf_jobs.workers} pool workers, inline up to {resume_app.pdf_jobs.sync_max_bytes} bytes")
+    print(f"{'size':<8}{'mode':<9}{'pdf p50 ms':>11}{'read p50 ms':>13}{'read p99 ms':>13}"
+          f"{'inline':>8}{'pooled':>8}{'errors':>8}")
+    try:
+        for n, size in enumerate(args.sizes.split(',')):
+            for label, queue in queues.items():
+                # Distinct resumes per run, so the PDF cache cannot answer the second one
+                offset = (2 * n + (label == 'default')) * args.requests
+                r = run(resume_app, queue, SIZES[size], args.requests, args.threads, offset)
+                print(f"{size:<8}{label:<9}{r['pdf_p50'] * 1000:>11.1f}{r['read_p50'] * 1000:>13.1f}"
+                      f"{r['read_p99'] * 1000:>13.1f}{r['inline']:>8}{r['pooled']:>8}{r['errors']:>8}")
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
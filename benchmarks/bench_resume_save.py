@@ -0,0 +1,71 @@
+"""Round-trips and latency per resume save: select-then-write vs. single upsert.
+
+    python benchmarks/bench_resume_save.py --saves 200 --latency 0.002
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from supabase import create_client
+
+from fakes.postgrest import FakePostgrest
+from benchmarks.synthetic import make_resume
+from resume_repository import save_resume_data
+
+
+def legacy_save(db, user_id, data):
+    """The select-then-update/insert sequence previously inlined in app.py."""
+    existing = db.table('resumes').select('id').eq('user_id', user_id).execute()
+    if existing.data and len(existing.data) > 0:
+        db.table('resumes').update({'data': data, 'updated_at': 'now()'}).eq('user_id', user_id).execute()
+    else:
+        db.table('resumes').insert({'user_id': user_id, 'data': data}).execute()
+
+
+def run(name, save, db, server, saves, data):
+    server.reset_counters()
+    timings = []
+    for i in range(saves):
+        start = time.perf_counter()
+        save(db, f'user-{i % 10}', data)
+        timings.append(time.perf_counter() - start)
+    return {
+        'name': name,
+        'round_trips_per_save': server.requests / saves,
+        'mean_ms': statistics.mean(timings) * 1000,
+        'p50_ms': statistics.median(timings) * 1000,
+        'p99_ms': sorted(timings)[int(len(timings) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--saves', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.002,
+                        help='simulated server latency per request, in seconds')
+    parser.add_argument('--entries', type=int, default=5)
+    args = parser.parse_args()
+
+    server = FakePostgrest(latency=args.latency).start()
+    try:
+        db = create_client(server.url, 'bench-anon-key')
+        data = make_resume(args.entries)
+        results = [
+            run('select+update', legacy_save, db, server, args.saves, data),
+            run('upsert', save_resume_data, db, server, args.saves, data),
+        ]
+    finally:
+        server.stop()
+
+    print(f"{'strategy':<15}{'trips/save':>12}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for r in results:
+        print(f"{r['name']:<15}{r['round_trips_per_save']:>12.2f}{r['mean_ms']:>10.2f}"
+              f"{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
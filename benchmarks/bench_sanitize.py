@@ -0,0 +1,129 @@
+"""Sanitization speed on large multilingual resumes, old vs. new implementation.
+
+    python benchmarks/bench_sanitize.py --entries 50 --repeat 20
+
+Also checks that both implementations produce identical output.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_resume
+from sanitize import recursive_sanitize, sanitize_text
+
+SAMPLES = [
+    'Led the “Platform” team – shipped 3× faster…',
+    'Diseñé la arquitectura de microservicios • Señor ingeniero',
+    'Ведущий инженер — высоконагруженные системы',
+    '負責後端服務的設計與實作，提升效能 40%',
+    'Überarbeitung der Zahlungs‑API; Kundenzufriedenheit ↑',
+    'مهندس برمجيات أول',
+    'Launched 🚀 new onboarding flow — 12% uplift',
+    'Plain ASCII line with nothing to replace at all.',
+]
+
+
+def legacy_sanitize_text(text):
+    if not text:
+        return ""
+    replacements = {
+        '\u2013': '-',
+        '\u2014': '--',
+        '\u2018': "'",
+        '\u2019': "'",
+        '\u201c': '"',
+        '\u201d': '"',
+        '\u2022': '*',
+        '\u2026': '...',
+        '\u00a0': ' '
+    }
+    for char, replacement in replacements.items():
+        text = text.replace(char, replacement)
+    return text.encode('latin-1', 'replace').decode('latin-1')
+
+
+def legacy_recursive_sanitize(obj):
+    if isinstance(obj, dict):
+        return {k: legacy_recursive_sanitize(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [legacy_recursive_sanitize(i) for i in obj]
+    elif isinstance(obj, str):
+        return legacy_sanitize_text(obj)
+    else:
+        return obj
+
+
+def sanitize_in_place(obj):
+    """Mutating variant for documents the caller owns, for comparison with the copy-on-write one."""
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            if isinstance(v, str):
+                if not v.isascii():
+                    obj[k] = sanitize_text(v)
+            else:
+                sanitize_in_place(v)
+    elif isinstance(obj, list):
+        for i, v in enumerate(obj):
+            if isinstance(v, str):
+                if not v.isascii():
+                    obj[i] = sanitize_text(v)
+            else:
+                sanitize_in_place(v)
+    return obj
+
+
+def multilingual_resume(entries, ascii_ratio, seed=0):
+    rng = random.Random(seed)
+    data = make_resume(entries, seed)
+
+    def sprinkle(text):
+        if rng.random() < ascii_ratio:
+            return text
+        return f'{text} {rng.choice(SAMPLES)}'
+
+    data['summary'] = sprinkle(data['summary'])
+    for section in ('experience', 'projects'):
+        for item in data[section]:
+            item['description'] = '\n'.join(sprinkle(line) for line in item['description'].split('\n'))
+            item['title'] = sprinkle(item['title'])
+    return data
+
+
+def bench(fn, make_input, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        doc = make_input()
+        start = time.perf_counter()
+        fn(doc)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--entries', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    for sample in SAMPLES:
+        assert sanitize_text(sample) == legacy_sanitize_text(sample), sample
+
+    print(f"{'document':<22}{'legacy ms':>11}{'new ms':>9}{'in-place ms':>13}{'speedup':>9}")
+    for label, ascii_ratio in (('pure ASCII', 1.0), ('mostly ASCII', 0.8), ('multilingual', 0.0)):
+        doc = multilingual_resume(args.entries, ascii_ratio)
+        assert recursive_sanitize(doc) == legacy_recursive_sanitize(doc), label
+        assert sanitize_in_place(multilingual_resume(args.entries, ascii_ratio)) == legacy_recursive_sanitize(doc), label
+
+        legacy = bench(legacy_recursive_sanitize, lambda: doc, args.repeat)
+        new = bench(recursive_sanitize, lambda: doc, args.repeat)
+        in_place = bench(sanitize_in_place, lambda: multilingual_resume(args.entries, ascii_ratio), args.repeat)
+        print(f"{label:<22}{legacy * 1000:>11.3f}{new * 1000:>9.3f}{in_place * 1000:>13.3f}{legacy / new:>8.1f}x")
+    print('outputs identical: yes')
+
+
+if __name__ == '__main__':
+    main()
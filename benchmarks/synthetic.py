@@ -0,0 +1,60 @@
+"""Synthetic resume payloads in the shape collected by static/js/script.js."""
+import random
+
+WORDS = (
+    'built designed led migrated optimized python flask postgres api latency '
+    'service pipeline team customers revenue scalable cloud kubernetes docker '
+    'react dashboards analytics reduced improved automated testing deployment'
+).split()
+
+
+def sentence(rng, words=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def make_resume(entries=3, seed=0):
+    """Build a resume with `entries` items in each repeating section."""
+    rng = random.Random(seed)
+    return {
+        'personal': {
+            'fullName': 'Alex Example',
+            'email': 'alex@example.com',
+            'phone': '+1 555-0100',
+            'location': 'Remote',
+            'linkedin': 'linkedin.com/in/alex',
+            'github': 'github.com/alex',
+            'portfolio': 'alex.dev',
+        },
+        'summary': ' '.join(sentence(rng) for _ in range(4)),
+        'skills': [
+            {'category': f'Category {i}', 'items': ', '.join(rng.sample(WORDS, 6))}
+            for i in range(entries)
+        ],
+        'experience': [
+            {
+                'title': f'Engineer {i}',
+                'company': f'Company {i}',
+                'location': 'Remote',
+                'startDate': '2020-01',
+                'endDate': 'Present',
+                'description': '\n'.join(sentence(rng) for _ in range(4)),
+            }
+            for i in range(entries)
+        ],
+        'education': [
+            {'degree': f'Degree {i}', 'university': f'University {i}', 'year': '2019', 'cgpa': '3.8'}
+            for i in range(entries)
+        ],
+        'projects': [
+            {
+                'title': f'Project {i}',
+                'techStack': ', '.join(rng.sample(WORDS, 4)),
+                'description': '\n'.join(sentence(rng) for _ in range(3)),
+            }
+            for i in range(entries)
+        ],
+        'certifications': [
+            {'name': f'Certification {i}', 'organization': 'Org', 'date': '2023', 'link': 'https://example.com'}
+            for i in range(entries)
+        ],
+    }
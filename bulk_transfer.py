@@ -0,0 +1,290 @@
+"""Streaming bulk export and import of resumes.
+
+Export reads the `resumes` table in keyset-paginated pages and writes one JSON
+object per line (NDJSON). The next page is fetched while the current one is
+being sent.
+
+Import parses NDJSON input line by line as it arrives and writes batched
+multi-row upserts, with a few batches in flight at once. Both directions hold
+at most a few pages or batches in memory, whatever the size of the dataset.
+
+Two formats are supported:
+
+- `ndjson`: `{"user_id": ..., "data": {...}, "version": ..., "updated_at": ...}`,
+  the stored document as is. Import needs only `user_id` and `data`.
+- `jsonresume`: `{"user_id": ..., "resume": {...}}`, with the document mapped
+  to the JSON Resume schema (https://jsonresume.org/schema).
+"""
+import json
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+FORMATS = ('ndjson', 'jsonresume')
+# A resume is a few tens of KB; anything far beyond that is not one
+MAX_LINE_BYTES = 1024 * 1024
+
+
+def _split(text):
+    return [part.strip() for part in str(text or '').split(',') if part.strip()]
+
+
+def to_json_resume(data):
+    """Map a stored resume to the JSON Resume schema."""
+    data = data or {}
+    personal = data.get('personal') or {}
+    profiles = [
+        {'network': network, 'url': personal[key]}
+        for network, key in (('LinkedIn', 'linkedin'), ('GitHub', 'github'))
+        if personal.get(key)
+    ]
+    return {
+        'basics': {
+            'name': personal.get('fullName', ''),
+            'email': personal.get('email', ''),
+            'phone': personal.get('phone', ''),
+            'url': personal.get('portfolio', ''),
+            'summary': data.get('summary', ''),
+            'location': {'address': personal.get('location', '')},
+            'profiles': profiles,
+        },
+        'work': [
+            {
+                'name': exp.get('company', ''),
+                'position': exp.get('title', ''),
+                'location': exp.get('location', ''),
+                'startDate': exp.get('startDate', ''),
+                'endDate': exp.get('endDate', ''),
+                'summary': exp.get('description', ''),
+            }
+            for exp in data.get('experience') or []
+        ],
+        'education': [
+            {
+                'institution': edu.get('university', ''),
+                'studyType': edu.get('degree', ''),
+                'endDate': edu.get('year', ''),
+                'score': edu.get('cgpa', ''),
+            }
+            for edu in data.get('education') or []
+        ],
+        'skills': [
+            {'name': skill.get('category', ''), 'keywords': _split(skill.get('items'))}
+            for skill in data.get('skills') or []
+        ],
+        'projects': [
+            {
+                'name': proj.get('title', ''),
+                'description': proj.get('description', ''),
+                'keywords': _split(proj.get('techStack')),
+            }
+            for proj in data.get('projects') or []
+        ],
+        'certificates': [
+            {
+                'name': cert.get('name', ''),
+                'issuer': cert.get('organization', ''),
+                'date': cert.get('date', ''),
+                'url': cert.get('link', ''),
+            }
+            for cert in data.get('certifications') or []
+        ],
+    }
+
+
+def from_json_resume(resume):
+    """Map a JSON Resume document back to the stored shape."""
+    basics = resume.get('basics') or {}
+    location = basics.get('location') or {}
+    if isinstance(location, dict):
+        location = location.get('address') or ', '.join(
+            location[key] for key in ('city', 'region', 'countryCode') if location.get(key))
+    profiles = {(p.get('network') or '').lower(): p.get('url') or p.get('username') or ''
+                for p in basics.get('profiles') or []}
+    return {
+        'personal': {
+            'fullName': basics.get('name', ''),
+            'email': basics.get('email', ''),
+            'phone': basics.get('phone', ''),
+            'location': location or '',
+            'linkedin': profiles.get('linkedin', ''),
+            'github': profiles.get('github', ''),
+            'portfolio': basics.get('url', ''),
+        },
+        'summary': basics.get('summary', ''),
+        'skills': [
+            {'category': skill.get('name', ''), 'items': ', '.join(skill.get('keywords') or [])}
+            for skill in resume.get('skills') or []
+        ],
+        'experience': [
+            {
+                'company': work.get('name', ''),
+                'title': work.get('position', ''),
+                'location': work.get('location', ''),
+                'startDate': work.get('startDate', ''),
+                'endDate': work.get('endDate', ''),
+                'description': work.get('summary') or '\n'.join(work.get('highlights') or []),
+            }
+            for work in resume.get('work') or []
+        ],
+        'education': [
+            {
+                'degree': edu.get('studyType', ''),
+                'university': edu.get('institution', ''),
+                'year': edu.get('endDate', ''),
+                'cgpa': edu.get('score', ''),
+            }
+            for edu in resume.get('education') or []
+        ],
+        'projects': [
+            {
+                'title': proj.get('name', ''),
+                'description': proj.get('description') or '\n'.join(proj.get('highlights') or []),
+                'techStack': ', '.join(proj.get('keywords') or []),
+            }
+            for proj in resume.get('projects') or []
+        ],
+        'certifications': [
+            {
+                'name': cert.get('name', ''),
+                'organization': cert.get('issuer', ''),
+                'date': cert.get('date', ''),
+                'link': cert.get('url', ''),
+            }
+            for cert in resume.get('certificates') or []
+        ],
+    }
+
+
+def _export_record(row, fmt):
+    if fmt == 'jsonresume':
+        return {'user_id': row['user_id'], 'resume': to_json_resume(row['data'])}
+    return row
+
+
+def export_lines(fetch_page, fmt='ndjson', page_size=1000):
+    """Yield the whole table as NDJSON, one chunk of bytes per page.
+
+    `fetch_page(after, limit)` returns up to `limit` rows ordered by `user_id`
+    that come after `after`.
+    """
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix='resume-export') as pool:
+        page = pool.submit(fetch_page, None, page_size)
+        while page is not None:
+            rows = page.result()
+            # Prefetch the next page while this one goes out
+            page = pool.submit(fetch_page, rows[-1]['user_id'], page_size) if len(rows) == page_size else None
+            if rows:
+                yield ''.join(json.dumps(_export_record(row, fmt), separators=(',', ':')) + '\n'
+                              for row in rows).encode('utf-8')
+
+
+def iter_lines(stream, chunk_size=64 * 1024):
+    """Yield `(line_number, bytes)` from a binary stream, reading it in chunks.
+
+    A line longer than MAX_LINE_BYTES is yielded as None and skipped, so one bad
+    line cannot make the reader buffer the rest of the input.
+    """
+    pending, number, overflow = b'', 0, False
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        lines = (pending + chunk).split(b'\n')
+        pending = lines.pop()
+        for line in lines:
+            number += 1
+            yield number, None if overflow else line
+            overflow = False
+        if len(pending) > MAX_LINE_BYTES:
+            overflow, pending = True, b''
+    if pending or overflow:
+        yield number + 1, None if overflow else pending
+
+
+def parse_record(line, fmt):
+    """`{'user_id', 'data'}` from one input line; raises ValueError if invalid."""
+    if line is None:
+        raise ValueError(f'line longer than {MAX_LINE_BYTES} bytes')
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise ValueError('expected a JSON object')
+    user_id = record.get('user_id')
+    try:
+        user_id = str(uuid.UUID(str(user_id)))
+    except ValueError:
+        raise ValueError(f'invalid user_id: {user_id!r}') from None
+    if fmt == 'jsonresume':
+        if not isinstance(record.get('resume'), dict):
+            raise ValueError("'resume' must be an object")
+        data = from_json_resume(record['resume'])
+    else:
+        data = record.get('data')
+        if not isinstance(data, dict):
+            raise ValueError("'data' must be an object")
+    return {'user_id': user_id, 'data': data}
+
+
+def import_lines(lines, write_batch, fmt='ndjson', batch_size=500, concurrency=4, max_errors=100):
+    """Parse `(line_number, bytes)` pairs and upsert them in batches.
+
+    `write_batch(rows)` writes one batch. Up to `concurrency` batches are in
+    flight while the input is still being parsed. Lines that fail to parse,
+    and batches that fail to write, are counted and reported (up to
+    `max_errors` of them); the rest of the import carries on.
+
+    A user_id repeated in the input keeps its last document: within a batch the
+    later line replaces the earlier one, and a batch holding a user_id that is
+    still being written by an earlier batch waits for that write first.
+    """
+    summary = {'received': 0, 'imported': 0, 'superseded': 0, 'failed': 0, 'batches': 0, 'errors': []}
+
+    def error(message):
+        if len(summary['errors']) < max_errors:
+            summary['errors'].append(message)
+
+    def settle(job):
+        future, first, last, size, _ = job
+        try:
+            future.result()
+            summary['imported'] += size
+        except Exception as e:
+            summary['failed'] += size
+            error(f'lines {first}-{last}: {e}')
+
+    in_flight = deque()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='resume-import') as pool:
+        def submit(batch, first, last):
+            keys = set(batch)
+            # Finish earlier writes of the same users, so the later line wins
+            while in_flight and any(not keys.isdisjoint(job[4]) for job in in_flight):
+                settle(in_flight.popleft())
+            if len(in_flight) >= concurrency:
+                settle(in_flight.popleft())
+            rows = list(batch.values())
+            summary['batches'] += 1
+            in_flight.append((pool.submit(write_batch, rows), first, last, len(rows), keys))
+
+        batch, first = {}, None
+        for number, line in lines:
+            if line is not None and not line.strip():
+                continue
+            summary['received'] += 1
+            try:
+                row = parse_record(line, fmt)
+            except ValueError as e:
+                summary['failed'] += 1
+                error(f'line {number}: {e}')
+                continue
+            if row['user_id'] in batch:
+                summary['superseded'] += 1
+            batch[row['user_id']] = row
+            first = first or number
+            if len(batch) >= batch_size:
+                submit(batch, first, number)
+                batch, first = {}, None
+        if batch:
+            submit(batch, first, number)
+        while in_flight:
+            settle(in_flight.popleft())
+    return summary
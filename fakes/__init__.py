@@ -0,0 +1 @@
+"""Offline stand-ins for Gemini and Supabase, shared by the tests and benchmarks."""
@@ -0,0 +1,126 @@
+"""In-process stand-in for `google.generativeai.GenerativeModel`.
+
+Sleeps for a configurable latency and answers deterministically, so routes that
+call Gemini can be exercised offline. With `stream=True` the answer arrives in
+chunks, the first after `first_chunk` of the latency. `generate_content_async`
+does the same without holding a thread. `failure_rate` makes that share of
+calls fail, and a `request_options` timeout shorter than the latency raises
+`DeadlineExceeded` like the SDK does, so brownouts can be simulated.
+`prompt_latency` adds that many seconds per 1,000 prompt tokens, as the model
+reads its input before answering:
+
+    import fakes.genai as fake_genai
+    app.genai = fake_genai  # the module mirrors the parts of the SDK the app uses
+"""
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+
+
+class DeadlineExceeded(Exception):
+    """Named like `google.api_core.exceptions.DeadlineExceeded`."""
+
+
+class ServiceUnavailable(Exception):
+    """Like `google.api_core.exceptions.ServiceUnavailable`, a 503 from the model."""
+    code = 503
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    latency = 0.5
+    first_chunk = 0.2
+    chunks = 8
+    failure_rate = 0.0
+    prompt_latency = 0.0
+    calls = 0
+    _lock = threading.Lock()
+
+    def __init__(self, model_name='fake-model', **kwargs):
+        self.model_name = model_name
+
+    @classmethod
+    def reset_counters(cls):
+        with cls._lock:
+            cls.calls = 0
+
+    def _call(self, prompt, request_options):
+        """Count the call; returns `(seconds to wait, error to raise after it)`."""
+        with FakeGenerativeModel._lock:
+            FakeGenerativeModel.calls += 1
+        # About four characters per token
+        latency = self.latency + self.prompt_latency * len(prompt) / 4000
+        timeout = (request_options or {}).get('timeout')
+        if timeout is not None and timeout < latency:
+            return timeout, DeadlineExceeded(f'504 Deadline of {timeout}s exceeded')
+        if self.failure_rate and random.random() < self.failure_rate:
+            return latency, ServiceUnavailable('503 The model is overloaded')
+        return latency, None
+
+    def generate_content(self, prompt, stream=False, request_options=None, **kwargs):
+        wait, error = self._call(prompt, request_options)
+        text = self._answer(prompt)
+        if stream and error is None:
+            return self._stream(text, wait)
+        time.sleep(wait)
+        if error is not None:
+            raise error
+        return FakeResponse(text)
+
+    async def generate_content_async(self, prompt, stream=False, request_options=None, **kwargs):
+        wait, error = self._call(prompt, request_options)
+        text = self._answer(prompt)
+        if stream and error is None:
+            return self._astream(text, wait)
+        await asyncio.sleep(wait)
+        if error is not None:
+            raise error
+        return FakeResponse(text)
+
+    def _stream(self, text, latency):
+        # Reading the prompt delays the first chunk only
+        time.sleep(latency - self.latency * (1 - self.first_chunk))
+        step = -(-len(text) // self.chunks)
+        for i in range(0, len(text), step):
+            if i:
+                time.sleep(self.latency * (1 - self.first_chunk) / (self.chunks - 1))
+            yield FakeResponse(text[i:i + step])
+
+    async def _astream(self, text, latency):
+        await asyncio.sleep(latency - self.latency * (1 - self.first_chunk))
+        step = -(-len(text) // self.chunks)
+        for i in range(0, len(text), step):
+            if i:
+                await asyncio.sleep(self.latency * (1 - self.first_chunk) / (self.chunks - 1))
+            yield FakeResponse(text[i:i + step])
+
+    @staticmethod
+    def _answer(prompt):
+        digest = hashlib.sha256(prompt.encode('utf-8')).hexdigest()[:8]
+        if 'Job Description' in prompt:
+            # Fenced like the real model often answers, to exercise the cleanup
+            return '```json\n' + json.dumps({
+                'summary': f'Engineer with a track record matching posting {digest}.',
+                'skills': ['Python', 'Flask', 'PostgreSQL', 'Docker'],
+                'experience': '3+ years',
+                'recruiter_email': None,
+                'company_name': 'Example Corp',
+                'job_title': 'Software Engineer',
+            }) + '\n```'
+        body = ' '.join(f'Paragraph {i} about why the candidate fits role {digest}.' for i in range(12))
+        return f'Dear Hiring Manager,\n\n{body}\n\nSincerely,\nAlex Example'
+
+
+# Module-level surface of `google.generativeai`
+GenerativeModel = FakeGenerativeModel
+
+
+def configure(**kwargs):
+    pass
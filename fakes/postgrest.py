@@ -0,0 +1,202 @@
+"""In-process PostgREST-style stand-in for offline tests and benchmarks.
+
+Implements just enough of the PostgREST wire protocol for the `resumes` and
+`resume_versions` tables (eq and range filters, order, limit, insert with
+unique-key conflicts, update, upsert with `on_conflict`, exact counts) and counts every
+HTTP round-trip so benchmarks can report how many requests an operation costs.
+Password sign-in and sign-out on `/auth/v1` accept any credentials, so the real
+/login route can be driven too.
+"""
+import base64
+import json
+import operator
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+COMPARISONS = {'eq': operator.eq, 'gt': operator.gt, 'gte': operator.ge, 'lt': operator.lt, 'lte': operator.le}
+# Unique keys per table, as in SUPABASE_SETUP.md
+UNIQUE = {'resumes': ('user_id',), 'resume_versions': ('user_id', 'seq')}
+
+
+def _compare(op, value, literal):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return COMPARISONS[op](value, float(literal))
+    return COMPARISONS[op](str(value), literal)
+
+
+class FakePostgrest:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.tables = {'resumes': []}
+        # (table, columns) -> {key values: row}; built on first use, dropped on PATCH/DELETE
+        self._indexes = {}
+        self.users = {}
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                with fake._lock:
+                    fake.requests += 1
+                if fake.latency:
+                    time.sleep(fake.latency)
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                status, payload, count = fake.dispatch(self.command, self.path, self.headers, body)
+                raw = json.dumps(payload).encode() if payload is not None else b''
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                if 'count=' in self.headers.get('Prefer', ''):
+                    self.send_header('Content-Range', f'*/{count}')
+                self.send_header('Content-Length', str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            do_GET = do_POST = do_PATCH = do_DELETE = _handle
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def seed(self, table, rows):
+        """Load rows directly, without HTTP; for preparing large benchmarks."""
+        with self._lock:
+            self.tables.setdefault(table, []).extend(rows)
+            self._drop_indexes(table)
+
+    def _drop_indexes(self, table):
+        for key in [k for k in self._indexes if k[0] == table]:
+            del self._indexes[key]
+
+    def _find(self, table, columns, row):
+        index = self._indexes.get((table, columns))
+        if index is None:
+            index = self._indexes[(table, columns)] = {
+                tuple(r.get(c) for c in columns): r for r in self.tables[table]}
+        return index.get(tuple(row.get(c) for c in columns))
+
+    def _insert(self, table, row):
+        new = {'id': str(uuid.uuid4()), **row}
+        self.tables[table].append(new)
+        for (name, columns), index in self._indexes.items():
+            if name == table:
+                index[tuple(new.get(c) for c in columns)] = new
+        return new
+
+    def reset_counters(self):
+        with self._lock:
+            self.requests = 0
+
+    def auth(self, path, body):
+        if path == '/auth/v1/token' and body and body.get('email'):
+            email = body['email']
+            with self._lock:
+                user_id = self.users.setdefault(email, str(uuid.uuid4()))
+            now = int(time.time())
+            claims = base64.urlsafe_b64encode(json.dumps(
+                {'sub': user_id, 'email': email, 'exp': now + 3600, 'role': 'authenticated'}
+            ).encode()).decode().rstrip('=')
+            return 200, {
+                'access_token': f'eyJhbGciOiJIUzI1NiJ9.{claims}.fake',
+                'token_type': 'bearer',
+                'expires_in': 3600,
+                'expires_at': now + 3600,
+                'refresh_token': uuid.uuid4().hex,
+                'user': {
+                    'id': user_id, 'aud': 'authenticated', 'role': 'authenticated', 'email': email,
+                    'app_metadata': {}, 'user_metadata': {}, 'created_at': '2024-01-01T00:00:00Z',
+                },
+            }, 1
+        if path == '/auth/v1/logout':
+            return 204, None, 0
+        return 400, {'error': 'unsupported_grant_type'}, 0
+
+    def dispatch(self, method, path, headers, body):
+        parsed = urlparse(path)
+        if parsed.path.startswith('/auth/v1/'):
+            return self.auth(parsed.path, body)
+        if not parsed.path.startswith('/rest/v1/'):
+            return 404, {'message': 'not found'}, 0
+        table_name = parsed.path[len('/rest/v1/'):]
+        table = self.tables.setdefault(table_name, [])
+        params = parse_qsl(parsed.query)
+        filters = [(k, *v.split('.', 1)) for k, v in params if v.split('.', 1)[0] in COMPARISONS]
+        opts = dict(params)
+        prefer = headers.get('Prefer', '')
+        unique = UNIQUE.get(table_name)
+
+        def matches(row):
+            return all(row.get(k) is not None and _compare(op, row.get(k), v) for k, op, v in filters)
+
+        with self._lock:
+            if method == 'GET':
+                rows = [r for r in table if matches(r)]
+                if 'order' in opts:
+                    column, _, direction = opts['order'].partition('.')
+                    rows.sort(key=lambda r: r.get(column), reverse=direction.startswith('desc'))
+                if 'limit' in opts:
+                    rows = rows[:int(opts['limit'])]
+                columns = opts.get('select', '*')
+                if columns != '*':
+                    names = columns.split(',')
+                    rows = [{c: r.get(c) for c in names} for r in rows]
+                return 200, rows, len(rows)
+
+            if method == 'POST':
+                rows = body if isinstance(body, list) else [body]
+                conflict = opts.get('on_conflict')
+                merge = 'resolution=merge-duplicates' in prefer
+                written = []
+                for row in rows:
+                    existing = None
+                    if conflict and merge:
+                        existing = self._find(table_name, tuple(conflict.split(',')), row)
+                    if existing is not None:
+                        existing.update(row)
+                        written.append(existing)
+                    elif unique and self._find(table_name, unique, row) is not None:
+                        return 409, {'code': '23505', 'message': 'duplicate key value violates unique constraint',
+                                     'details': None, 'hint': None}, 0
+                    else:
+                        written.append(self._insert(table_name, row))
+                return 201, written if 'return=representation' in prefer else None, len(written)
+
+            if method == 'PATCH':
+                written = [r for r in table if matches(r)]
+                for row in written:
+                    row.update(body)
+                self._drop_indexes(table_name)
+                return 200, written if 'return=representation' in prefer else None, len(written)
+
+            if method == 'DELETE':
+                removed = len(table)
+                table[:] = [r for r in table if not matches(r)]
+                self._drop_indexes(table_name)
+                return 204, None, removed - len(table)
+
+        return 405, {'message': 'method not allowed'}, 0
@@ -0,0 +1,196 @@
+"""Per-request phase timing, Prometheus metrics and sampled profiling.
+
+Code marks its expensive phases with `with phase('db-read'):` or reports an
+already measured duration with `record()`. Inside a request, every phase ends
+up in the response's `Server-Timing` header. Phase and request durations are
+also aggregated into latency histograms, which `/metrics` serves in the
+Prometheus text format. Metrics are per process.
+
+With `PROFILE_SAMPLE_RATE` above 0, that fraction of requests runs under
+cProfile, and each profile is written to `PROFILE_DIR` as a `.prof` file for
+pstats or snakeviz.
+"""
+import cProfile
+import hmac
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from flask import Response, g, has_request_context, request
+
+# Seconds; chosen to separate cache hits, database round-trips and LLM calls
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class Histogram:
+    def __init__(self, name, help_text, labels, buckets=BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * len(self.buckets), 0.0, 0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = sorted((k, ([*v[0]], v[1], v[2])) for k, v in self._series.items())
+        for label_values, (counts, total, count) in items:
+            labels = ','.join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, label_values))
+            for bound, n in zip(self.buckets, counts):
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {n}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {count}')
+            lines.append(f'{self.name}_sum{{{labels}}} {total}')
+            lines.append(f'{self.name}_count{{{labels}}} {count}')
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, labels):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            labels = ','.join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, label_values))
+            lines.append(f'{self.name}{{{labels}}} {value}')
+        return lines
+
+
+class Gauge:
+    """A metric read at scrape time; `collect()` returns `{label_values: value}`."""
+
+    def __init__(self, name, help_text, labels, collect, kind='gauge'):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.collect = collect
+        self.kind = kind
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} {self.kind}']
+        for label_values, value in sorted(self.collect().items()):
+            labels = ','.join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, label_values))
+            lines.append(f'{self.name}{{{labels}}} {value}')
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+request_seconds = Histogram(
+    'resume_http_request_duration_seconds', 'Request latency by route.', ('route', 'method', 'status'))
+requests_total = Counter('resume_http_requests_total', 'Requests served by route.', ('route', 'method', 'status'))
+phase_seconds = Histogram('resume_phase_duration_seconds', 'Latency of instrumented phases.', ('phase',))
+profiles_total = Counter('resume_profiles_total', 'Requests profiled with cProfile.', ('route',))
+
+METRICS = [request_seconds, requests_total, phase_seconds, profiles_total]
+
+
+def register(metric):
+    """Publish another metric (anything with `render()`) at /metrics."""
+    METRICS.append(metric)
+
+
+def record(name, seconds, desc=None):
+    """Report a measured phase: into the histogram and, in a request, Server-Timing."""
+    phase_seconds.observe(seconds, name)
+    if has_request_context() and hasattr(g, 'phases'):
+        g.phases.append((name, seconds, desc))
+
+
+@contextmanager
+def phase(name, desc=None):
+    """Time the enclosed block as the phase `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start, desc)
+
+
+def render_metrics():
+    return '\n'.join(line for metric in METRICS for line in metric.render()) + '\n'
+
+
+def server_timing(phases):
+    return ', '.join(
+        f'{name};dur={seconds * 1000:.2f}' + (f';desc="{desc}"' if desc else '')
+        for name, seconds, desc in phases
+    )
+
+
+def init_app(app, sample_rate=0.0, profile_dir=None, metrics_token=None):
+    """Install the timing hooks and the `/metrics` endpoint on a Flask app."""
+    profile_dir = profile_dir or os.path.join(tempfile.gettempdir(), 'resume-builder-profiles')
+
+    @app.before_request
+    def start_timing():
+        g.phases = []
+        g.request_start = time.perf_counter()
+        g.profiler = None
+        if sample_rate > 0 and random.random() < sample_rate:
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+
+    @app.after_request
+    def finish_timing(response):
+        if not hasattr(g, 'request_start'):
+            return response
+        elapsed = time.perf_counter() - g.request_start
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        status = str(response.status_code)
+        request_seconds.observe(elapsed, route, request.method, status)
+        requests_total.inc(route, request.method, status)
+
+        timing = server_timing(g.phases + [('total', elapsed, None)])
+        existing = response.headers.get('Server-Timing')
+        response.headers['Server-Timing'] = f'{existing}, {timing}' if existing else timing
+
+        if g.profiler is not None:
+            g.profiler.disable()
+            profiles_total.inc(route)
+            # Several requests to one endpoint can finish within the same second
+            name = (f"{time.strftime('%Y%m%d-%H%M%S')}-{request.endpoint or 'unmatched'}-{os.getpid()}"
+                    f"-{uuid.uuid4().hex[:8]}.prof")
+            try:
+                os.makedirs(profile_dir, exist_ok=True)
+                g.profiler.dump_stats(os.path.join(profile_dir, name))
+                response.headers['X-Profile'] = name
+            except OSError as e:
+                print(f"Error writing profile: {e}")
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        if metrics_token and not hmac.compare_digest(request.headers.get('Authorization', '').encode(),
+                                                     f'Bearer {metrics_token}'.encode()):
+            return Response('Unauthorized\n', 401, mimetype='text/plain')
+        return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,266 @@
+"""Trim job descriptions and prompt fields to a token budget before they reach Gemini.
+
+A pasted or extracted JD is mostly text the analysis does not need: PDF page
+headers and footers, equal-opportunity and legal notices, benefits lists. It
+is also often long enough that cutting it at a fixed length loses the
+requirements, which tend to come last. `prepare_jd()`:
+
+1. normalizes Unicode and whitespace;
+2. drops page numbers, and every repeat of a line already seen (running
+   headers and footers);
+3. splits the text into sections at their headings, and removes EEO, legal
+   and benefits sections and paragraphs wherever they appear;
+4. keeps the remaining sections in order of relevance (the opening lines with
+   the title and company, requirements, responsibilities, then the rest) until
+   the budget is spent, and puts them back in their original order.
+
+Email addresses from dropped text are appended, so the recruiter contact
+survives. Tokens are estimated from the length of the text, which is close
+enough for budgeting and needs no call to the model.
+"""
+import re
+import unicodedata
+
+# Gemini averages about four characters of English text per token
+CHARS_PER_TOKEN = 4
+
+_SPACE_RE = re.compile(r'[^\S\n]+')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+_INVISIBLE_RE = re.compile('[\u200b-\u200f\u2060\ufeff\u00ad]')
+_BULLET_RE = re.compile(r'^[\u2022\u25aa\u25cf\u25e6\u2023\u2043\u2013\u2014\u00b7*>-]\s*')
+_RULE_RE = re.compile(r'^[\W_]{3,}$')
+_MARKDOWN_RE = re.compile(r'^#{1,6}\s+|\*\*|__')
+_PAGE_RE = re.compile(r'^(?:.{0,60}?\s)?page\s+\d+(?:\s*(?:/|of)\s*\d+)?(?:\s.{0,60})?$|^\d+\s*(?:/|of)\s*\d+$|^\d{1,3}$', re.I)
+EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+MAX_EMAILS = 5
+
+# Heading text -> section kind; the first pattern that matches wins
+SECTION_PATTERNS = (
+    ('eeo', re.compile(
+        r'equal (?:employment )?opportunit|\beeo\b|divers|inclusi|accommodation|privacy|disclaimer|'
+        r'legal|e-verify|fraud|notice to|recruit(?:ing|ment)? agenc', re.I)),
+    ('benefits', re.compile(
+        r'benefit|perks|what we offer|we offer|compensation|salary|pay (?:range|transparency)|'
+        r'total rewards|why (?:join|work)', re.I)),
+    ('requirements', re.compile(
+        r'requirement|qualification|must.have|nice.to.have|preferred|bonus points|skills|'
+        r'what you(?:\'ll)? (?:need|bring)|who you are|about you|you have|you bring|competenc|'
+        r'experience|ideal candidate|looking for', re.I)),
+    ('responsibilities', re.compile(
+        r'responsibilit|what you(?:\'ll| will) do|duties|the role|about the (?:role|job|position)|'
+        r'your (?:role|impact|mission)|day.to.day|you will|key tasks|job description|'
+        r'position (?:summary|overview)|role overview|overview', re.I)),
+    ('company', re.compile(
+        r'about (?:us|the company|the team|[a-z]+$)|who we are|our (?:mission|story|culture|values|team)|'
+        r'company|life at', re.I)),
+    ('apply', re.compile(r'how to apply|application|to apply|contact|next steps|interview process', re.I)),
+)
+
+# Matched against lowercased text, which is much faster than re.I.
+# A paragraph with any of these is an EEO or legal notice whatever its heading
+EEO_RE = re.compile(
+    r'equal (?:employment )?opportunity|without regard to|regardless of (?:race|gender|age)|'
+    r'race,? colou?r|sexual orientation|gender identity|protected (?:veteran|class|status)|'
+    r'reasonable accommodation|e-verify|criminal histor|fair chance|'
+    r'unsolicited (?:resumes|applications)|privacy (?:notice|policy)')
+# ...and one with two or more of these, outside the requirements, a benefits list
+BENEFIT_RE = re.compile(
+    r'\b(?:health|dental|vision|medical) (?:insurance|coverage|plans?|benefits)|401\(?k\)?|pension|'
+    r'paid time off|\bpto\b|parental leave|vacation|wellness|gym|stock options|\bequity\b|'
+    r'life insurance|tuition|learning budget|commuter|free (?:lunch|snacks|meals)|'
+    r'flexible (?:hours|working)|holidays')
+
+# Lower keeps first; sections of a dropped kind are never sent
+PRIORITY = {'header': 0, 'requirements': 1, 'responsibilities': 2, 'other': 3, 'company': 4, 'apply': 5}
+DROPPED = ('eeo', 'benefits')
+
+
+def estimate_tokens(text):
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def normalize_jd(text):
+    """NFKC, no Markdown emphasis, bullets as "- ", single spaces, at most one blank line in a row."""
+    text = unicodedata.normalize('NFKC', text or '').replace('\r\n', '\n').replace('\r', '\n')
+    text = _INVISIBLE_RE.sub('', text)
+    lines = []
+    for line in text.split('\n'):
+        line = _SPACE_RE.sub(' ', _MARKDOWN_RE.sub('', line)).strip()
+        if _RULE_RE.match(line):
+            continue
+        if _BULLET_RE.match(line):
+            line = '- ' + _BULLET_RE.sub('', line)
+        lines.append(line)
+    return _BLANK_LINES_RE.sub('\n\n', '\n'.join(lines)).strip()
+
+
+def drop_repeated_lines(lines):
+    """Drop page numbers and every occurrence of a line after its first."""
+    seen = set()
+    kept = []
+    for line in lines:
+        if not line:
+            kept.append(line)
+            continue
+        key = line.casefold()
+        if key in seen or (len(line) <= 80 and _PAGE_RE.match(line)):
+            continue
+        seen.add(key)
+        kept.append(line)
+    return kept
+
+
+def _heading_kind(line):
+    """The section kind if `line` looks like a heading, else None."""
+    if len(line) > 60 or line.startswith('- ') or line.endswith(('.', ',', ';')):
+        return None
+    text = line.rstrip(':').strip()
+    # "Label: value" is content
+    if not text or ':' in text or len(text.split()) > 7:
+        return None
+    for kind, pattern in SECTION_PATTERNS:
+        if pattern.search(text):
+            return kind
+    # An unknown heading still starts a section if it is styled like one
+    if line.endswith(':') or (text.isupper() and len(text) > 3):
+        return 'other'
+    return None
+
+
+def _paragraph_kind(lines, kind):
+    text = ' '.join(lines).lower()
+    if EEO_RE.search(text):
+        return 'eeo'
+    if kind not in ('requirements', 'responsibilities') and len(BENEFIT_RE.findall(text)) >= 2:
+        return 'benefits'
+    return kind
+
+
+def split_sections(lines):
+    """`[(kind, lines)]` in document order; boilerplate paragraphs become sections of their own."""
+    sections = []
+    kind, current, paragraph = 'header', [], []
+
+    def flush():
+        nonlocal current
+        paragraph_kind = _paragraph_kind(paragraph, kind)
+        if paragraph_kind == kind:
+            current.extend(paragraph + [''])
+            return
+        if current:
+            sections.append((kind, current))
+            current = []
+        sections.append((paragraph_kind, list(paragraph)))
+
+    for line in lines + ['']:
+        heading = _heading_kind(line) if line else None
+        # A styled first line is the job title
+        if heading == 'other' and not sections and not current and not paragraph:
+            heading = None
+        if heading is not None:
+            if paragraph:
+                flush()
+            if current:
+                sections.append((kind, current))
+            kind, current, paragraph = heading, [line], []
+        elif line:
+            paragraph.append(line)
+        elif paragraph:
+            flush()
+            paragraph = []
+    if current:
+        sections.append((kind, current))
+    return [(kind, _trim_blank(lines)) for kind, lines in sections if any(lines)]
+
+
+def _trim_blank(lines):
+    while lines and not lines[-1]:
+        lines = lines[:-1]
+    return lines
+
+
+def fit_text(text, tokens):
+    """`text` cut to about `tokens` tokens, at a sentence, list item or word boundary."""
+    text = text or ''
+    limit = tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    for separator in ('\n', '. ', '; ', ', ', ' '):
+        at = cut.rfind(separator)
+        if at >= limit // 2:
+            return cut[:at + (1 if separator == '. ' else 0)].rstrip()
+    return cut
+
+
+def _pack(sections, budget):
+    """`{index: lines}` of the sections to send, filled in order of priority."""
+    order = sorted(
+        (i for i, (kind, _) in enumerate(sections) if kind not in DROPPED),
+        key=lambda i: (PRIORITY[sections[i][0]], i),
+    )
+    keep = {}
+    left = budget * CHARS_PER_TOKEN
+    for i in order:
+        lines = sections[i][1]
+        taken, cost = [], 0
+        for line in lines:
+            if cost + len(line) + 1 <= left:
+                taken.append(line)
+                cost += len(line) + 1
+                continue
+            # Room for a useful part of a long paragraph
+            if left - cost >= 32 * CHARS_PER_TOKEN:
+                part = fit_text(line, (left - cost - 1) // CHARS_PER_TOKEN)
+                taken.append(part)
+                cost += len(part) + 1
+            break
+        # A heading on its own is no use
+        if len(taken) > (1 if sections[i][0] != 'header' and _heading_kind(lines[0]) else 0):
+            keep[i] = taken
+            left -= cost + 1
+        if left <= 0:
+            break
+    return keep
+
+
+def prepare_jd(text, budget=1500):
+    """Clean up a job description and pack it into about `budget` tokens.
+
+    Returns `{'text', 'tokens_in', 'tokens_out', 'dropped'}`, where `dropped`
+    is the estimated tokens removed as whitespace, repeated lines, boilerplate
+    and to meet the budget.
+    """
+    tokens_in = estimate_tokens(text or '')
+    normalized = normalize_jd(text)
+    lines = normalized.split('\n')
+    unique = drop_repeated_lines(lines)
+    sections = split_sections(unique)
+    boilerplate = sum(estimate_tokens('\n'.join(section)) for kind, section in sections if kind in DROPPED)
+
+    emails = list(dict.fromkeys(EMAIL_RE.findall(normalized)))[:MAX_EMAILS]
+    contact = f"Contact: {', '.join(emails)}" if emails else ''
+    keep = _pack(sections, budget - estimate_tokens(contact))
+    kept = ['\n'.join(keep[i]) for i in sorted(keep)]
+    result = '\n\n'.join(kept)
+    missing = [email for email in emails if email not in result]
+    if missing:
+        result += f"\n\nContact: {', '.join(missing)}"
+    # Only a budget smaller than the contact line itself gets here
+    if estimate_tokens(result) > budget:
+        result = fit_text(result, budget)
+
+    tokens_out = estimate_tokens(result)
+    whitespace = tokens_in - estimate_tokens(normalized)
+    repeated = estimate_tokens(normalized) - estimate_tokens('\n'.join(unique))
+    return {
+        'text': result,
+        'tokens_in': tokens_in,
+        'tokens_out': tokens_out,
+        'dropped': {
+            'whitespace': max(whitespace, 0),
+            'repeated': max(repeated, 0),
+            'boilerplate': boilerplate,
+            'budget': max(tokens_in - tokens_out - max(whitespace, 0) - max(repeated, 0) - boilerplate, 0),
+        },
+    }
@@ -0,0 +1,199 @@
+"""Minimal JSON Patch (RFC 6902) and JSON Merge Patch (RFC 7396) support."""
+import copy
+
+
+class JSONPatchError(ValueError):
+    pass
+
+
+def _parse_pointer(pointer):
+    if pointer == '':
+        return []
+    if not pointer.startswith('/'):
+        raise JSONPatchError(f"Invalid JSON pointer: {pointer!r}")
+    return [p.replace('~1', '/').replace('~0', '~') for p in pointer[1:].split('/')]
+
+
+def _index(container, token, allow_end=False):
+    if token == '-' and allow_end:
+        return len(container)
+    if not token.isdigit() or (token != '0' and token.startswith('0')):
+        raise JSONPatchError(f"Invalid array index: {token!r}")
+    i = int(token)
+    if i > len(container) or (i == len(container) and not allow_end):
+        raise JSONPatchError(f"Array index out of range: {token}")
+    return i
+
+
+def _resolve(doc, tokens):
+    for token in tokens:
+        if isinstance(doc, dict):
+            if token not in doc:
+                raise JSONPatchError(f"Path not found: /{'/'.join(tokens)}")
+            doc = doc[token]
+        elif isinstance(doc, list):
+            doc = doc[_index(doc, token)]
+        else:
+            raise JSONPatchError(f"Path not found: /{'/'.join(tokens)}")
+    return doc
+
+
+def _get(doc, pointer):
+    return _resolve(doc, _parse_pointer(pointer))
+
+
+def _add(doc, pointer, value):
+    tokens = _parse_pointer(pointer)
+    if not tokens:
+        return value
+    parent = _resolve(doc, tokens[:-1])
+    key = tokens[-1]
+    if isinstance(parent, dict):
+        parent[key] = value
+    elif isinstance(parent, list):
+        parent.insert(_index(parent, key, allow_end=True), value)
+    else:
+        raise JSONPatchError(f"Cannot add to {pointer!r}")
+    return doc
+
+
+def _remove(doc, pointer):
+    tokens = _parse_pointer(pointer)
+    if not tokens:
+        raise JSONPatchError("Cannot remove the document root")
+    parent = _resolve(doc, tokens[:-1])
+    key = tokens[-1]
+    if isinstance(parent, dict):
+        if key not in parent:
+            raise JSONPatchError(f"Path not found: {pointer}")
+        return parent.pop(key)
+    if isinstance(parent, list):
+        return parent.pop(_index(parent, key))
+    raise JSONPatchError(f"Cannot remove {pointer!r}")
+
+
+def apply_json_patch(doc, operations):
+    """Apply an RFC 6902 patch and return the new document.
+
+    The input document is not modified; a failing operation leaves it untouched.
+    """
+    if not isinstance(operations, list):
+        raise JSONPatchError("A JSON Patch must be a list of operations")
+    doc = copy.deepcopy(doc)
+    for operation in operations:
+        if not isinstance(operation, dict) or 'op' not in operation or 'path' not in operation:
+            raise JSONPatchError(f"Invalid operation: {operation!r}")
+        op, path = operation['op'], operation['path']
+        if op in ('add', 'replace', 'test') and 'value' not in operation:
+            raise JSONPatchError(f"'{op}' requires a value")
+        if op == 'add':
+            doc = _add(doc, path, copy.deepcopy(operation['value']))
+        elif op == 'remove':
+            _remove(doc, path)
+        elif op == 'replace':
+            if not _parse_pointer(path):
+                doc = copy.deepcopy(operation['value'])
+                continue
+            _remove(doc, path)
+            doc = _add(doc, path, copy.deepcopy(operation['value']))
+        elif op == 'move':
+            source = operation.get('from', '')
+            if path.startswith(source + '/'):
+                raise JSONPatchError("Cannot move a value into one of its children")
+            value = _remove(doc, source)
+            doc = _add(doc, path, value)
+        elif op == 'copy':
+            value = copy.deepcopy(_get(doc, operation.get('from', '')))
+            doc = _add(doc, path, value)
+        elif op == 'test':
+            if not json_equal(_get(doc, path), operation['value']):
+                raise JSONPatchError(f"Test failed at {path}")
+        else:
+            raise JSONPatchError(f"Unknown operation: {op!r}")
+    return doc
+
+
+def apply_merge_patch(doc, patch):
+    """Apply an RFC 7396 merge patch and return the new document."""
+    if not isinstance(patch, dict):
+        return copy.deepcopy(patch)
+    result = dict(doc) if isinstance(doc, dict) else {}
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = apply_merge_patch(result.get(key), value)
+    return result
+
+
+def _escape_pointer(key):
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+
+def _json_type(value):
+    # int and float are both JSON numbers; bool is a subclass of int but is not
+    return 'number' if type(value) in (int, float) else type(value)
+
+
+def json_equal(a, b, type_of=_json_type):
+    """Equality as RFC 6902 `test` defines it: unlike `==`, `true` is not `1`.
+
+    Numbers are compared by value, so `1` equals `1.0`; every other pair must
+    also be of the same JSON type.
+    """
+    if type_of(a) != type_of(b):
+        return False
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(json_equal(a[k], b[k], type_of) for k in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(json_equal(x, y, type_of) for x, y in zip(a, b))
+    return a == b
+
+
+def _identical(a, b):
+    # Also tells `1` from `1.0`, so a diff reproduces the document exactly
+    return json_equal(a, b, type)
+
+
+def diff_json(before, after, path=''):
+    """Build an RFC 6902 patch that turns `before` into `after`.
+
+    Mirrors `diffJSON` in static/js/script.js, except that arrays are first
+    trimmed of their common head and tail: inserting one entry at the top of a
+    section is a single `add` rather than a `replace` of every entry below it.
+    """
+    ops = []
+    _diff(before, after, path, ops)
+    return ops
+
+
+def _diff(before, after, path, ops):
+    if _identical(before, after):
+        return
+    if isinstance(before, list) and isinstance(after, list):
+        start = 0
+        while start < min(len(before), len(after)) and _identical(before[start], after[start]):
+            start += 1
+        end_before, end_after = len(before), len(after)
+        while end_before > start and end_after > start and _identical(before[end_before - 1], after[end_after - 1]):
+            end_before -= 1
+            end_after -= 1
+        common = min(end_before, end_after)
+        for i in range(start, common):
+            _diff(before[i], after[i], f'{path}/{i}', ops)
+        for i in range(common, end_after):
+            ops.append({'op': 'add', 'path': f'{path}/{i}', 'value': after[i]})
+        for i in range(end_before - 1, common - 1, -1):
+            ops.append({'op': 'remove', 'path': f'{path}/{i}'})
+    elif isinstance(before, dict) and isinstance(after, dict):
+        for key in before:
+            if key not in after:
+                ops.append({'op': 'remove', 'path': f'{path}/{_escape_pointer(key)}'})
+        for key, value in after.items():
+            child = f'{path}/{_escape_pointer(key)}'
+            if key in before:
+                _diff(before[key], value, child, ops)
+            else:
+                ops.append({'op': 'add', 'path': child, 'value': value})
+    else:
+        ops.append({'op': 'replace', 'path': path, 'value': after})
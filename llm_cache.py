@@ -0,0 +1,178 @@
+"""Cache for LLM responses that are a pure function of their input text.
+
+A bounded in-memory LRU sits in front of an optional SQLite file that survives
+restarts and is shared between workers on the same machine. Concurrent misses
+for the same key are collapsed into one upstream call (single flight), whether
+the callers are threads or asyncio tasks.
+"""
+import asyncio
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from concurrent.futures import Future
+
+from cache import TTLCache
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    """Canonical form of pasted text: NFKC, case-folded, whitespace collapsed."""
+    return _WHITESPACE_RE.sub(' ', unicodedata.normalize('NFKC', text or '')).strip().casefold()
+
+
+class LLMCache:
+    def __init__(self, maxsize=512, ttl=7 * 24 * 3600, path=None):
+        self.ttl = ttl
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.path = path
+        self._db = None
+        self._db_opened = False
+        self._db_lock = threading.Lock()
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self.disk_hits = 0
+        self.shared = 0
+        self.upstream_calls = 0
+
+    def _connect(self):
+        """Open the SQLite file on first use; call with `_db_lock` held."""
+        if self._db_opened:
+            return self._db
+        self._db_opened = True
+        if not self.path:
+            return None
+        try:
+            self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS responses '
+                '(key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)'
+            )
+            self._db.execute('DELETE FROM responses WHERE created < ?', (time.time() - self.ttl,))
+        except sqlite3.Error as e:
+            print(f"Error opening LLM cache {self.path}: {e}")
+            self._db = None
+        return self._db
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None or not self.path:
+            return value
+        try:
+            with self._db_lock:
+                db = self._connect()
+                if db is None:
+                    return None
+                row = db.execute(
+                    'SELECT value FROM responses WHERE key = ? AND created >= ?',
+                    (key, time.time() - self.ttl),
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Error reading LLM cache: {e}")
+            return None
+        if row is None:
+            return None
+        value = json.loads(row[0])
+        self.disk_hits += 1
+        self.memory.set(key, value)
+        return value
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if not self.path:
+            return
+        try:
+            with self._db_lock:
+                db = self._connect()
+                if db is None:
+                    return
+                db.execute(
+                    'INSERT OR REPLACE INTO responses (key, value, created) VALUES (?, ?, ?)',
+                    (key, json.dumps(value), time.time()),
+                )
+        except sqlite3.Error as e:
+            print(f"Error writing LLM cache: {e}")
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for `key`, calling `compute()` at most once per miss.
+
+        Callers that miss while another thread is already computing the same key
+        wait for that result instead of making their own upstream call. Errors
+        are shared with the waiters but never cached.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            self.shared += 1
+            return future.result()
+
+        try:
+            # A leader that finished between our miss and registering may have filled it
+            value = self.memory.get(key)
+            if value is None:
+                self.upstream_calls += 1
+                value = compute()
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    async def aget_or_compute(self, key, compute):
+        """`get_or_compute` for asyncio callers; `compute()` returns an awaitable.
+
+        Shares the in-flight table with `get_or_compute`, so a thread and a task
+        missing on the same key still make only one upstream call.
+        """
+        # A memory hit or one indexed read of a local file; not worth a thread hop
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            self.shared += 1
+            return await asyncio.wrap_future(future)
+
+        try:
+            value = self.memory.get(key)
+            if value is None:
+                self.upstream_calls += 1
+                value = await compute()
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def stats(self):
+        return {
+            **self.memory.stats(),
+            'disk_hits': self.disk_hits,
+            'shared': self.shared,
+            'upstream_calls': self.upstream_calls,
+            'path': self.path if self._db is not None or not self._db_opened else None,
+        }
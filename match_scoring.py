@@ -0,0 +1,115 @@
+"""Local resume-vs-job-description keyword match scoring.
+
+Scores how well a resume covers the important terms of one or more job
+descriptions without calling the LLM. JD terms are weighted by TF-IDF, with the
+IDF taken over the batch of JDs, so terms that every posting in the batch uses
+count for little. The resume side uses BM25 term-frequency saturation, so
+repeating a keyword ten times is worth little more than mentioning it twice.
+
+The batch is scored as one matrix-vector product when NumPy is installed; a
+pure-Python path gives the same numbers without it.
+"""
+import math
+import re
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Keeps tech tokens such as c++, c#, node.js and ci/cd intact
+TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]')
+
+# Common English plus job-posting boilerplate that says nothing about skills
+STOPWORDS = frozenset('''
+a about above across after all also an and any are as at be been being both but by can
+could did do does each etc for from had has have having he her how i if in into is it its
+just may more most must no not of on or our out over own per plus she should so some such
+than that the their them then there these they this those through to too under until up
+us very was we were what when where which while who whom why will with within would you
+your ability able apply applicant applicants benefits candidate candidates company
+culture environment equal excellent experience experienced familiarity good great highly
+ideal including join job looking members new opportunity plus preferred required
+requirements responsibilities responsible role skills strong team teams understanding
+using work working year years need needs want seeking hire hiring position welcome nice
+bonus
+'''.split())
+
+RESUME_KEYS = ('summary', 'skills', 'experience', 'projects', 'certifications', 'education')
+
+# Low saturation constant: one mention already covers most of a term
+BM25_K1 = 0.5
+
+
+def tokenize(text):
+    """Lower-cased terms without stopwords or bare numbers."""
+    words = [w.strip('./-') for w in TOKEN_RE.findall((text or '').lower())]
+    return [w for w in words if w and w not in STOPWORDS and not w.isdigit()]
+
+
+def _strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for v in value.values():
+            yield from _strings(v)
+    elif isinstance(value, list):
+        for v in value:
+            yield from _strings(v)
+
+
+def resume_text(data):
+    """The scoreable text of a resume: skills, experience, projects and the like."""
+    return '\n'.join(s for key in RESUME_KEYS for s in _strings((data or {}).get(key)))
+
+
+def score_resume(data, jd_texts, limit=10):
+    """Score one resume against a batch of job descriptions.
+
+    Returns one `{'score', 'matched', 'missing'}` dict per JD, in order. `score`
+    is the weighted share of the JD's terms the resume covers (0-100);
+    `matched` and `missing` list up to `limit` of the highest-weighted JD terms
+    the resume does and does not mention.
+    """
+    resume_terms = Counter(tokenize(resume_text(data)))
+    jd_terms = [Counter(tokenize(text)) for text in jd_texts]
+
+    # IDF over the JDs only; the resume must not make its own terms look common
+    n_docs = len(jd_terms)
+    df = Counter()
+    for terms in jd_terms:
+        df.update(terms.keys())
+    vocab = sorted(df)
+    idf = {t: math.log(1 + (n_docs - df[t] + 0.5) / (df[t] + 0.5)) for t in vocab}
+
+    # BM25 saturation of the resume's term frequencies, scaled to 0..1
+    coverage = {t: resume_terms[t] / (resume_terms[t] + BM25_K1) for t in vocab if resume_terms[t]}
+
+    if np is not None and vocab:
+        index = {t: i for i, t in enumerate(vocab)}
+        weights = np.zeros((len(jd_terms), len(vocab)))
+        for row, terms in enumerate(jd_terms):
+            for t, tf in terms.items():
+                weights[row, index[t]] = (1 + math.log(tf)) * idf[t]
+        resume_vec = np.zeros(len(vocab))
+        for t, c in coverage.items():
+            resume_vec[index[t]] = c
+        totals = weights.sum(axis=1)
+        scores = (weights @ resume_vec) / np.where(totals > 0, totals, 1)
+    else:
+        scores = []
+        for terms in jd_terms:
+            weighted = {t: (1 + math.log(tf)) * idf[t] for t, tf in terms.items()}
+            total = sum(weighted.values())
+            scores.append(sum(w * coverage.get(t, 0) for t, w in weighted.items()) / total if total else 0)
+
+    results = []
+    for terms, score in zip(jd_terms, scores):
+        ranked = sorted(terms, key=lambda t: (-(1 + math.log(terms[t])) * idf[t], t))
+        results.append({
+            'score': round(float(score) * 100, 1),
+            'matched': [t for t in ranked if t in coverage][:limit],
+            'missing': [t for t in ranked if t not in coverage][:limit],
+        })
+    return results
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from cache import TTLCache
+
+# Part of every rendered-PDF cache key and ETag. Bump whenever the layout in
+# pdf_layout.py changes so cached fragments, PDFs and ETags are invalidated.
+# It lives here so cache lookups never have to import the layout engine.
+PDF_RENDER_VERSION = 3
+
+
+def content_key(data, *parts):
+    """Stable hash of a JSON-serialisable payload plus any extra key parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\0')
+    digest.update(json.dumps(data, sort_keys=True, separators=(',', ':')).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class PDFCache:
+    """Content-addressed cache of rendered PDFs.
+
+    A bounded in-memory LRU sits in front of an optional directory of
+    `v<render version>/<key>.pdf` files that survives restarts and is shared
+    between workers. The directory is kept under `disk_maxbytes` by deleting
+    the least recently used files (a disk hit refreshes a file's mtime), and
+    files unused for `disk_ttl` seconds are deleted too. Layouts of older
+    render versions are removed at startup.
+    """
+
+    # How often the directory is scanned for expired files when it is not full
+    PRUNE_INTERVAL = 600
+    # A full directory is pruned down to this share of `disk_maxbytes`
+    PRUNE_TO = 0.9
+    # Disk errors tend to repeat on every write, so they are printed at most this often
+    ERROR_INTERVAL = 300
+
+    def __init__(self, maxsize=256, maxbytes=64 * 1024 * 1024, directory=None,
+                 disk_maxbytes=1024 * 1024 * 1024, disk_ttl=30 * 86400, version=PDF_RENDER_VERSION):
+        self.memory = TTLCache(maxsize=maxsize, maxbytes=maxbytes)
+        self.root = directory
+        self.directory = os.path.join(directory, f'v{version}') if directory else None
+        self.version = version
+        self.disk_maxbytes = disk_maxbytes
+        self.disk_ttl = disk_ttl
+        self.disk_hits = 0
+        self.disk_evictions = 0
+        self.disk_bytes = 0
+        self.disk_errors = 0
+        self._errors_shown = 0
+        self._next_error = 0
+        self._prune_lock = threading.Lock()
+        self._next_prune = 0
+        if directory:
+            os.makedirs(self.directory, exist_ok=True)
+            self._remove_old_versions()
+            self.prune()
+
+    def _error(self, action, e):
+        self.disk_errors += 1
+        now = time.monotonic()
+        if now < self._next_error:
+            return
+        self._next_error = now + self.ERROR_INTERVAL
+        hidden = self.disk_errors - self._errors_shown - 1
+        self._errors_shown = self.disk_errors
+        more = f" ({hidden} more since the last report)" if hidden else ""
+        print(f"Error {action} PDF cache: {e}{more}")
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.pdf')
+
+    def _remove_old_versions(self):
+        for entry in os.scandir(self.root):
+            if entry.is_dir() and entry.name[:1] == 'v' and entry.name[1:].isdigit():
+                if int(entry.name[1:]) < self.version:
+                    shutil.rmtree(entry.path, ignore_errors=True)
+            elif entry.is_file() and entry.name.endswith(('.pdf', '.tmp')):
+                # Files from before the layout was versioned
+                try:
+                    os.unlink(entry.path)
+                except OSError:
+                    pass
+
+    def prune(self):
+        """Delete expired files, then the least recently used ones over the byte cap."""
+        if not self.directory or not self._prune_lock.acquire(blocking=False):
+            return
+        try:
+            files = []
+            for entry in os.scandir(self.directory):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue  # deleted by another worker meanwhile
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+            files.sort()
+            total = sum(size for _, size, _ in files)
+            expired_before = time.time() - self.disk_ttl if self.disk_ttl else None
+            target = self.disk_maxbytes * self.PRUNE_TO if total > self.disk_maxbytes else total
+            for mtime, size, path in files:
+                expired = expired_before is not None and mtime < expired_before
+                if not expired and total <= target:
+                    break
+                try:
+                    os.unlink(path)
+                except OSError:
+                    continue
+                total -= size
+                self.disk_evictions += 1
+            self.disk_bytes = total
+            self._next_prune = time.monotonic() + self.PRUNE_INTERVAL
+        except OSError as e:
+            self._error('pruning', e)
+        finally:
+            self._prune_lock.release()
+
+    def get(self, key):
+        content = self.memory.get(key)
+        if content is not None or not self.directory:
+            return content
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+            os.utime(path)  # keeps it out of the next LRU prune
+        except OSError:
+            return None
+        self.disk_hits += 1
+        self.memory.set(key, content)
+        return content
+
+    def set(self, key, content):
+        self.memory.set(key, content)
+        if not self.directory:
+            return
+        try:
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(tmp, self._path(key))
+        except OSError as e:
+            self._error('writing', e)
+            return
+        # Other workers write here too; prune() recounts from the directory
+        self.disk_bytes += len(content)
+        if self.disk_bytes > self.disk_maxbytes or time.monotonic() >= self._next_prune:
+            self.prune()
+
+    def stats(self):
+        return {
+            **self.memory.stats(),
+            'disk_hits': self.disk_hits,
+            'disk_bytes': self.disk_bytes,
+            'disk_maxbytes': self.disk_maxbytes if self.directory else None,
+            'disk_evictions': self.disk_evictions,
+            'disk_errors': self.disk_errors,
+            'directory': self.directory,
+        }
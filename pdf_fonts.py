@@ -0,0 +1,269 @@
+"""Selectable PDF themes and a process-wide cache of parsed TrueType fonts.
+
+The core PDF fonts only cover latin-1, so the 'classic' theme turns every
+other character into '?'. The other themes embed TrueType fonts with full
+Unicode coverage. fpdf parses a font file for every document that adds it,
+which takes tens of milliseconds, and subsets the whole font again at output.
+Here instead:
+
+- each font file is parsed once per process, and its metrics (widths, glyph
+  ids, cmap, descriptor) are shared by every document;
+- a document gets a light copy of each font with a glyph subset map of its own;
+- at output, fpdf cuts the document's glyphs from a cached subset of the font
+  holding latin-1 plus the characters used, not from the full font. Most
+  resumes only use latin-1 and share one cached subset per font.
+
+'classic' stays the default, so the Unicode themes are opt-in per resume or
+through PDF_THEME. A theme whose fonts are not installed falls back to
+'classic'. This relies on fpdf internals, so fpdf2 is pinned to the versions
+it was tested with. Nothing here imports fpdf until a font is actually loaded,
+so resolving a theme for a cache key stays cheap.
+"""
+import copy
+import io
+import os
+import threading
+import time
+
+from cache import TTLCache
+from sanitize import REPLACEMENTS, font_sanitizer, recursive_sanitize
+
+# Searched in order for the font files; PDF_FONT_DIRS is a os.pathsep-separated list
+FONT_DIRS = [d for d in os.environ.get('PDF_FONT_DIRS', '').split(os.pathsep) if d] + [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'fonts'),
+    '/usr/share/fonts/truetype/dejavu',
+    '/usr/share/fonts/truetype/noto',
+    '/usr/share/fonts/truetype/liberation',
+    '/usr/share/fonts/dejavu',
+    '/usr/share/fonts/TTF',
+    '/Library/Fonts',
+]
+
+# theme -> font families to try, each {style: file name}; the first family whose
+# regular face is installed wins. Text in a style whose face is missing is set
+# in the regular face. 'classic' uses the core Arial font.
+THEMES = {
+    'sans': (
+        {'': 'DejaVuSans.ttf', 'B': 'DejaVuSans-Bold.ttf', 'I': 'DejaVuSans-Oblique.ttf'},
+        {'': 'NotoSans-Regular.ttf', 'B': 'NotoSans-Bold.ttf', 'I': 'NotoSans-Italic.ttf'},
+        {'': 'LiberationSans-Regular.ttf', 'B': 'LiberationSans-Bold.ttf', 'I': 'LiberationSans-Italic.ttf'},
+    ),
+    'serif': (
+        {'': 'DejaVuSerif.ttf', 'B': 'DejaVuSerif-Bold.ttf', 'I': 'DejaVuSerif-Italic.ttf'},
+        {'': 'NotoSerif-Regular.ttf', 'B': 'NotoSerif-Bold.ttf', 'I': 'NotoSerif-Italic.ttf'},
+        {'': 'LiberationSerif-Regular.ttf', 'B': 'LiberationSerif-Bold.ttf', 'I': 'LiberationSerif-Italic.ttf'},
+    ),
+    'mono': (
+        {'': 'DejaVuSansMono.ttf', 'B': 'DejaVuSansMono-Bold.ttf', 'I': 'DejaVuSansMono-Oblique.ttf'},
+        {'': 'NotoSansMono-Regular.ttf', 'B': 'NotoSansMono-Bold.ttf'},
+        {'': 'LiberationMono-Regular.ttf', 'B': 'LiberationMono-Bold.ttf', 'I': 'LiberationMono-Italic.ttf'},
+    ),
+    'classic': (),
+}
+DEFAULT_THEME = os.environ.get('PDF_THEME', 'classic')
+
+# Characters every cached subset holds, whether a document uses them or not
+BASE_CHARS = [*range(0x20, 0x7f), *range(0xa0, 0x100), *map(ord, REPLACEMENTS)]
+
+# Tables fpdf drops from embedded fonts anyway
+DROP_TABLES = ['FFTM', 'GDEF', 'GPOS', 'GSUB', 'MATH', 'hdmx', 'meta']
+
+# (font path, glyph names) -> subset font file
+subset_cache = TTLCache(
+    maxsize=int(os.environ.get('PDF_FONT_SUBSET_CACHE_SIZE', 64)),
+    maxbytes=int(os.environ.get('PDF_FONT_SUBSET_CACHE_MAX_BYTES', 16 * 1024 * 1024)),
+)
+
+_lock = threading.Lock()
+_fonts = {}  # path -> (parsed TTFFont, glyph names of BASE_CHARS)
+_themes = {}
+_parse_seconds = 0.0
+
+
+def find_font(file_name):
+    for directory in FONT_DIRS:
+        path = os.path.join(directory, file_name)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+class Theme:
+    """A theme resolved against the installed fonts."""
+
+    def __init__(self, name, files):
+        self.name = name
+        self.files = files  # {style: path}; empty for the core font
+        self.family = name if files else 'Arial'
+        self._sanitize = None
+
+    def font_style(self, style):
+        """`style` if the theme has a face for it, else regular."""
+        return style if not self.files or style in self.files else ''
+
+    def sanitize(self, value):
+        """Strings in `value` with every character the fonts cannot draw replaced."""
+        if not self.files:
+            return recursive_sanitize(value)
+        if self._sanitize is None:
+            # Only what every style can draw, so bold and italic text never loses glyphs
+            covered = set.intersection(*(set(load_font(path)[0].cmap) for path in self.files.values()))
+            self._sanitize = font_sanitizer(frozenset(covered))
+        return recursive_sanitize(value, self._sanitize)
+
+    def add_fonts(self, pdf):
+        """Register the theme's fonts with a new document, sharing the parsed metrics."""
+        for style, path in self.files.items():
+            font = _document_font(load_font(path)[0], len(pdf.fonts) + 1, f'{self.family}{style}', style)
+            pdf.fonts[font.fontkey] = font
+
+
+def get_theme(name=None):
+    """The `Theme` to render with; `name` defaults to PDF_THEME. Raises ValueError for unknown names."""
+    name = name or DEFAULT_THEME
+    if not isinstance(name, str) or name not in THEMES:
+        raise ValueError(f"Unknown theme '{name}'; use one of {', '.join(THEMES)}")
+    theme = _themes.get(name)
+    if theme is None:
+        files = {}
+        for family in THEMES[name]:
+            regular = find_font(family[''])
+            if regular:
+                files = {style: find_font(family[style]) for style in family}
+                files = {style: path for style, path in files.items() if path}
+                break
+        theme = _themes[name] = Theme(name if files or name == 'classic' else 'classic', files)
+    return theme
+
+
+def resolve_theme(name=None):
+    """Name of the theme a render with `name` will actually use, for cache keys."""
+    return get_theme(name).name
+
+
+def available_themes():
+    """Themes whose fonts are installed, the default first."""
+    names = [name for name in THEMES if get_theme(name).name == name]
+    default = resolve_theme()
+    return [default] + [name for name in names if name != default]
+
+
+def load_font(path):
+    """`(font, base glyph names)` for the TrueType file at `path`, parsed once per process."""
+    entry = _fonts.get(path)
+    if entry is None:
+        with _lock:
+            entry = _fonts.get(path)
+            if entry is None:
+                entry = _fonts[path] = _parse(path)
+    return entry
+
+
+def _parse(path):
+    global _parse_seconds
+    # Imported here so processes that never render do not load fpdf
+    from fpdf import FPDF
+    from fpdf.fonts import TTFFont
+
+    start = time.perf_counter()
+    scratch = FPDF()
+    scratch.render_color_fonts = False
+    font = TTFFont(scratch, path, 'shared', '')
+    # Only the metrics are kept; each output reads a cached subset instead
+    font.ttfont.close()
+    font.ttfont = None
+    base = frozenset(font.cmap[char] for char in BASE_CHARS if char in font.cmap)
+    _parse_seconds += time.perf_counter() - start
+    return font, base
+
+
+def _document_font(shared, i, fontkey, style):
+    """A copy of a parsed font for one document: shared metrics, its own glyph subset."""
+    from fpdf.enums import TextEmphasis
+    from fpdf.fonts import SubsetMap, TTFFont
+
+    font = TTFFont.__new__(TTFFont)
+    for slot in TTFFont.__slots__:
+        if hasattr(shared, slot):
+            setattr(font, slot, getattr(shared, slot))
+    font.i = i
+    font.fontkey = fontkey
+    # The descriptor becomes a PDF object with an id of its own at output
+    font.desc = copy.copy(shared.desc)
+    font.emphasis = TextEmphasis.coerce(style)
+    font.subset = SubsetMap(font)
+    font.missing_glyphs = []
+    font.biggest_size_pt = 0
+    return font
+
+
+def subset_font(path, glyph_names):
+    """Font file bytes of `path` cut down to `glyph_names`, which keep their names."""
+    key = (path, glyph_names)
+    data = subset_cache.get(key)
+    if data is None:
+        from fontTools import subset
+        from fontTools.ttLib import TTFont
+
+        # Hinting only helps rasterizers at small pixel sizes, and is most of the glyph data
+        options = subset.Options(notdef_outline=True, recommended_glyphs=True, glyph_names=True, hinting=False)
+        options.drop_tables += DROP_TABLES
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(glyphs=glyph_names)
+        with TTFont(path, recalcTimestamp=False) as font:
+            subsetter.subset(font)
+            output = io.BytesIO()
+            font.save(output)
+        data = output.getvalue()
+        subset_cache.set(key, data)
+    return data
+
+
+def attach_subsets(pdf):
+    """Point each shared font of a finished document at a cached subset to embed."""
+    from fontTools.ttLib import TTFont
+
+    for font in pdf.fonts.values():
+        entry = _fonts.get(getattr(font, 'ttffile', None))
+        if entry is None or font.ttfont is not None:
+            continue
+        used = frozenset(font.subset.get_all_glyph_names())
+        base = entry[1]
+        # Reusing the base set keeps the key (and its cached hash) the same object
+        names = base if used <= base else base | used
+        ttfont = TTFont(io.BytesIO(subset_font(font.ttffile, names)), recalcTimestamp=False)
+        # Fonts without glyph names in 'post' get new ones when subset
+        if not used <= set(ttfont.getGlyphOrder()):
+            ttfont = TTFont(font.ttffile, recalcTimestamp=False, lazy=True)
+        font.ttfont = ttfont
+
+
+def release_subsets(pdf):
+    from fpdf.fonts import SubsetMap
+
+    for font in pdf.fonts.values():
+        if getattr(font, 'ttffile', None) in _fonts:
+            font.ttfont = None
+    # fpdf memoizes glyph lookups per SubsetMap for the life of the process,
+    # which would keep every document's fonts alive
+    for method in (SubsetMap.pick, SubsetMap.get_glyph):
+        if hasattr(method, 'cache_clear'):
+            method.cache_clear()
+
+
+def preload(name=None):
+    """Parse a theme's fonts and build their base subsets ahead of the first render."""
+    theme = get_theme(name)
+    for path in theme.files.values():
+        subset_font(path, load_font(path)[1])
+    theme.sanitize('')
+    return theme
+
+
+def stats():
+    return {
+        'fonts_parsed': len(_fonts),
+        'parse_seconds': round(_parse_seconds, 4),
+        'themes': {name: sorted(set(theme.files.values())) for name, theme in _themes.items()},
+        'subsets': subset_cache.stats(),
+    }
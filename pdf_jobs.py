@@ -0,0 +1,177 @@
+"""Background jobs for CPU-bound PDF work (rendering and text extraction).
+
+Jobs run in a bounded process pool so a burst of large resumes does not hold
+the GIL inside the web worker and stall every other route. Small inputs are
+handled inline, where the round-trip to a child process would cost more than
+the work itself.
+"""
+import io
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as JobTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from cache import TTLCache
+from resume_parser import iter_pdf_pages, parse_resume_pages
+
+
+class QueueFull(Exception):
+    pass
+
+
+def render_job(data, order=None):
+    """Render a resume; returns `(pdf_bytes, section_timings)`."""
+    # Imported here so processes that never render do not load fpdf
+    from pdf_layout import render_resume_pdf
+    timings = []
+    content = render_resume_pdf(data, timings, order)
+    return content, timings
+
+
+def warm_worker():
+    """Load the default PDF theme's fonts as a pool process starts, not on its first render."""
+    try:
+        from pdf_fonts import preload
+        preload()
+    except Exception as e:
+        print(f"Error preloading PDF fonts: {e}")
+
+
+def extract_job(pdf_bytes, max_pages=None):
+    """Extract and parse an uploaded resume PDF, reading at most `max_pages` pages."""
+    return parse_resume_pages(iter_pdf_pages(io.BytesIO(pdf_bytes), max_pages))
+
+
+class JobQueue:
+    def __init__(self, workers=2, max_pending=32, timeout=30, sync_max_bytes=1024,
+                 result_ttl=600, start_method='spawn'):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.sync_max_bytes = sync_max_bytes
+        self.start_method = start_method
+        self.jobs = TTLCache(maxsize=4096, ttl=result_ttl)
+        self._pool = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.rejected = 0
+        self.inline = 0
+
+    def _get_pool(self):
+        # Started lazily so importing the app (and cold starts) never fork workers
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method),
+                    initializer=warm_worker,
+                )
+            return self._pool
+
+    def _done(self, future):
+        with self._lock:
+            self._pending -= 1
+
+    def start(self, fn, *args, size=0):
+        """Start `fn(*args)` and return a Future, inline when the input is small."""
+        return self.start_all([(fn, args)], size=size)[0]
+
+    def start_all(self, calls, size=0):
+        """Start every `(fn, args)` in `calls` and return their Futures in order.
+
+        Queue slots are reserved for all of them up front, so a batch either
+        starts whole or raises QueueFull without starting anything.
+        """
+        if not self.workers or size <= self.sync_max_bytes:
+            futures = []
+            for fn, args in calls:
+                self.inline += 1
+                future = Future()
+                try:
+                    future.set_result(fn(*args))
+                except Exception as e:
+                    future.set_exception(e)
+                futures.append(future)
+            return futures
+
+        with self._lock:
+            if self._pending + len(calls) > self.max_pending:
+                self.rejected += 1
+                raise QueueFull(f"{self._pending} PDF jobs already queued")
+            self._pending += len(calls)
+        futures = []
+        try:
+            for fn, args in calls:
+                try:
+                    future = self._get_pool().submit(fn, *args)
+                except BrokenProcessPool:
+                    # A worker died (e.g. out of memory); replace the pool once
+                    with self._lock:
+                        self._pool = None
+                    future = self._get_pool().submit(fn, *args)
+                future.add_done_callback(self._done)
+                futures.append(future)
+                self.submitted += 1
+        except Exception:
+            # Give back the slots of calls never submitted and drop the queued ones
+            with self._lock:
+                self._pending -= len(calls) - len(futures)
+            for future in futures:
+                future.cancel()
+            raise
+        return futures
+
+    def run(self, fn, *args, size=0):
+        """Run a job and wait for its result, raising JobTimeout after `timeout`."""
+        return self.start(fn, *args, size=size).result(timeout=self.timeout)
+
+    def submit(self, owner, kind, fn, *args, size=0):
+        """Queue a job on behalf of `owner` and return its id."""
+        job_id = uuid.uuid4().hex
+        future = self.start(fn, *args, size=size)
+        self.jobs.set(job_id, {
+            'id': job_id,
+            'kind': kind,
+            'owner': owner,
+            'future': future,
+            'deadline': time.monotonic() + self.timeout,
+        })
+        return job_id
+
+    def get(self, job_id, owner):
+        job = self.jobs.get(job_id)
+        if job is None or job['owner'] != owner:
+            return None
+        return job
+
+    def status(self, job):
+        future = job['future']
+        if future.done():
+            if future.cancelled():
+                return {'id': job['id'], 'kind': job['kind'], 'status': 'timed_out'}
+            error = future.exception()
+            if error is not None:
+                return {'id': job['id'], 'kind': job['kind'], 'status': 'failed', 'error': str(error)}
+            return {'id': job['id'], 'kind': job['kind'], 'status': 'done'}
+        if time.monotonic() > job['deadline']:
+            # Queued jobs past their deadline are dropped; running ones cannot be interrupted
+            if future.cancel():
+                return {'id': job['id'], 'kind': job['kind'], 'status': 'timed_out'}
+        return {'id': job['id'], 'kind': job['kind'], 'status': 'running' if future.running() else 'queued'}
+
+    def stats(self):
+        with self._lock:
+            pending = self._pending
+        return {
+            'workers': self.workers,
+            'pending': pending,
+            'max_pending': self.max_pending,
+            'submitted': self.submitted,
+            'inline': self.inline,
+            'rejected': self.rejected,
+            'jobs_held': len(self.jobs),
+        }
@@ -0,0 +1,367 @@
+"""Section-based PDF layout for resumes.
+
+Every section is built into a small display list of drawing operations. Building
+a display list is the expensive part: it measures and line-breaks every
+paragraph. The display lists are cached per section content and theme, so
+editing one project only re-lays-out the Projects section; the other sections
+are replayed from cache. Fonts come from the theme (see pdf_fonts.py).
+"""
+import os
+import time
+
+from fpdf import FPDF
+from fpdf.enums import MethodReturnValue, XPos, YPos
+from fpdf.output import OutputProducer
+
+from cache import TTLCache
+from pdf_cache import PDF_RENDER_VERSION, content_key
+from pdf_fonts import attach_subsets, get_theme, release_subsets
+
+PRIMARY = (27, 60, 83)
+SECONDARY = (35, 76, 106)
+ACCENT = (69, 104, 130)
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+BODY = (50, 50, 50)
+MUTED = (100, 100, 100)
+FOOTER = (128, 128, 128)
+
+# name -> (font style, size, text colour), resolved once instead of per entry
+STYLES = {
+    'name': ('B', 24, WHITE),
+    'contact': ('', 10, WHITE),
+    'links': ('', 9, WHITE),
+    'section': ('B', 14, SECONDARY),
+    'body': ('', 10, BODY),
+    'text': ('', 10, BLACK),
+    'label': ('B', 10, SECONDARY),
+    'item_title': ('B', 11, PRIMARY),
+    'date': ('I', 10, MUTED),
+    'subtitle': ('B', 10, SECONDARY),
+    'org': ('', 10, SECONDARY),
+    'gpa': ('I', 9, SECONDARY),
+    'tech': ('I', 9, ACCENT),
+    'cert_name': ('B', 10, PRIMARY),
+    'cert_date': ('I', 9, MUTED),
+    'cert_org': ('', 9, SECONDARY),
+    'footer': ('I', 8, FOOTER),
+    'chapter': ('', 10, BLACK),
+}
+
+fragment_cache = TTLCache(maxsize=int(os.environ.get('PDF_FRAGMENT_CACHE_SIZE', 2048)))
+
+
+class SubsetOutputProducer(OutputProducer):
+    """Embeds the theme's fonts from cached subsets rather than the font files."""
+
+    def _add_fonts(self, *args, **kwargs):
+        # Runs after the last footer is drawn, so every glyph used is known
+        attach_subsets(self.fpdf)
+        return super()._add_fonts(*args, **kwargs)
+
+
+class PDF(FPDF):
+    def __init__(self, *args, theme=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._style = None
+        self.theme = theme or get_theme()
+        self.theme.add_fonts(self)
+
+    def apply_style(self, name):
+        """Switch to a named style, skipping the calls if it is already active."""
+        if self._style == name:
+            return
+        font_style, size, color = STYLES[name]
+        self.set_font(self.theme.family, self.theme.font_style(font_style), size)
+        self.set_text_color(*color)
+        self._style = name
+
+    def output(self, *args, **kwargs):
+        try:
+            return super().output(*args, output_producer_class=SubsetOutputProducer, **kwargs)
+        finally:
+            release_subsets(self)
+
+    def header(self):
+        pass  # We'll handle the header manually in the body to control data
+
+    def footer(self):
+        self.set_y(-15)
+        self.apply_style('footer')
+        self.cell(0, 10, 'Page ' + str(self.page_no()) + '/{nb}', align='C')
+        # FPDF restores the body font after the footer, so forget what we set
+        self._style = None
+
+    def section_title(self, title):
+        self.ln(5)
+        self.apply_style('section')
+        self.cell(0, 10, title, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        self.set_draw_color(*ACCENT)
+        self.line(10, self.get_y(), 200, self.get_y())
+        self.ln(2)
+
+    def chapter_body(self, body):
+        self.apply_style('chapter')
+        replay(self, [('justified', 0, 5, measure_justified(self, 'chapter', 0, 5, [body])[0])])
+        self.ln()
+
+
+def measure(pdf, style, w, h, texts):
+    """Line-break a batch of texts that share one style and width."""
+    pdf.apply_style(style)
+    width = w or pdf.epw
+    return [
+        pdf.multi_cell(width, h, text, dry_run=True, output=MethodReturnValue.LINES)
+        for text in texts
+    ]
+
+
+def measure_justified(pdf, style, w, h, texts):
+    """`measure()` for justified text, as `multi_cell()` sets it by default.
+
+    Every wrapped line but the last of a paragraph is spread to the full width.
+    Such a line comes back as `(offset, width, word)` triples with the word
+    positions worked out here, so replaying it needs no measuring; other
+    lines come back as plain strings.
+    """
+    pdf.apply_style(style)
+    width = w or pdf.epw
+    room = width - 2 * pdf.c_margin
+    space = pdf.get_string_width(' ')
+    result = []
+    for text in texts:
+        lines = []
+        for paragraph in text.split('\n'):
+            wrapped = pdf.multi_cell(width, h, paragraph, dry_run=True, output=MethodReturnValue.LINES)
+            for line in wrapped[:-1]:
+                words = line.split(' ')
+                if len(words) < 2:
+                    # A word broken mid-way has no spaces to stretch
+                    lines.append(line)
+                    continue
+                gap = space + (room - pdf.get_string_width(line)) / (len(words) - 1)
+                spaced, offset = [], 0.0
+                for i, word in enumerate(words):
+                    word_width = pdf.get_string_width(word)
+                    if word:
+                        # The space keeps words apart when the text is copied or parsed
+                        text = word if i == len(words) - 1 else word + ' '
+                        spaced.append((offset, word_width + space + 2 * pdf.c_margin, text))
+                    offset += word_width + gap
+                lines.append(tuple(spaced))
+            lines += wrapped[-1:]
+        result.append(lines)
+    return result
+
+
+def replay(pdf, ops):
+    """Draw a display list built by one of the section builders."""
+    for op, *args in ops:
+        if op == 'style':
+            pdf.apply_style(args[0])
+        elif op == 'cell':
+            w, h, text, newline, align, link = args
+            pdf.cell(
+                w, h, text, align=align, link=link,
+                new_x=XPos.LMARGIN if newline else XPos.RIGHT,
+                new_y=YPos.NEXT if newline else YPos.TOP,
+            )
+        elif op == 'lines':
+            w, h, lines, align = args
+            w = w or pdf.epw
+            for line in lines:
+                pdf.cell(w, h, line, align=align, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        elif op == 'justified':
+            w, h, lines = args
+            w = w or pdf.epw
+            for line in lines:
+                if isinstance(line, str):
+                    pdf.cell(w, h, line, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+                    continue
+                x = pdf.get_x()
+                for offset, word_width, word in line:
+                    pdf.set_x(x + offset)
+                    pdf.cell(word_width, h, word, new_x=XPos.RIGHT, new_y=YPos.TOP)
+                pdf.set_xy(pdf.l_margin, pdf.get_y() + h)
+        elif op == 'write':
+            pdf.write(*args)
+        elif op == 'ln':
+            pdf.ln(*args)
+        elif op == 'section_title':
+            pdf.section_title(args[0])
+        elif op == 'banner':
+            pdf.set_fill_color(*args[0])
+            pdf.rect(*args[1:], style='F')
+        elif op == 'set_x':
+            pdf.set_x(args[0])
+        elif op == 'set_y':
+            pdf.set_y(args[0])
+        else:
+            raise ValueError(f"Unknown layout operation: {op}")
+
+
+def cell(w, h, text, newline=False, align='L', link=''):
+    return ('cell', w, h, text, newline, align, link)
+
+
+def build_header(pdf, p):
+    ops = [('banner', PRIMARY, 0, 0, 210, 50), ('set_y', 10)]
+    ops += [('style', 'name'), cell(0, 10, p.get('fullName', 'Your Name'), True, 'C')]
+
+    contact_info = [p[k] for k in ('email', 'phone', 'location') if p.get(k)]
+    links = []
+    if p.get('linkedin'): links.append(f"LinkedIn: {p['linkedin']}")
+    if p.get('github'): links.append(f"GitHub: {p['github']}")
+    if p.get('portfolio'): links.append(f"Portfolio: {p['portfolio']}")
+
+    # Wrapping instead of single cells prevents long contact lines being truncated
+    contact_lines, = measure(pdf, 'contact', 190, 6, [' | '.join(contact_info)])
+    ops += [('style', 'contact'), ('set_x', 10), ('lines', 190, 6, contact_lines, 'C')]
+    if links:
+        link_lines, = measure(pdf, 'links', 190, 6, [' | '.join(links)])
+        ops += [('style', 'links'), ('set_x', 10), ('lines', 190, 6, link_lines, 'C')]
+
+    # Content starts below the header background
+    ops.append(('set_y', 55))
+    return ops
+
+
+def build_summary(pdf, summary):
+    lines, = measure_justified(pdf, 'body', 0, 5, [summary])
+    return [('section_title', 'Professional Summary'), ('style', 'body'), ('justified', 0, 5, lines)]
+
+
+def build_skills(pdf, skills):
+    ops = [('section_title', 'Skills')]
+    for skill in skills:
+        if skill.get('category') and skill.get('items'):
+            ops += [
+                ('style', 'label'), ('write', 5, f"{skill['category']}: "),
+                ('style', 'text'), ('write', 5, skill['items']),
+                ('ln', 6),
+            ]
+    return ops
+
+
+def build_experience(pdf, entries):
+    descriptions = iter(measure_justified(pdf, 'body', 0, 5, [e['description'] for e in entries if e.get('description')]))
+    ops = [('section_title', 'Experience')]
+    for exp in entries:
+        ops += [
+            ('style', 'item_title'), cell(130, 6, exp.get('title', '')),
+            ('style', 'date'), cell(0, 6, f"{exp.get('startDate', '')} - {exp.get('endDate', '')}", True, 'R'),
+            ('style', 'subtitle'), cell(0, 5, f"{exp.get('company', '')} | {exp.get('location', '')}", True),
+        ]
+        if exp.get('description'):
+            ops += [('style', 'body'), ('justified', 0, 5, next(descriptions))]
+        ops.append(('ln', 3))
+    return ops
+
+
+def build_education(pdf, entries):
+    ops = [('section_title', 'Education')]
+    for edu in entries:
+        ops += [
+            ('style', 'item_title'), cell(140, 6, edu.get('degree', '')),
+            ('style', 'date'), cell(0, 6, edu.get('year', ''), True, 'R'),
+            ('style', 'org'), cell(0, 5, edu.get('university', ''), True),
+        ]
+        if edu.get('cgpa'):
+            ops += [('style', 'gpa'), cell(0, 5, f"CGPA/GPA: {edu['cgpa']}", True)]
+        ops.append(('ln', 2))
+    return ops
+
+
+def build_projects(pdf, entries):
+    descriptions = iter(measure_justified(pdf, 'body', 0, 5, [p['description'] for p in entries if p.get('description')]))
+    ops = [('section_title', 'Projects')]
+    for proj in entries:
+        ops += [('style', 'item_title'), cell(0, 6, proj.get('title', ''), True)]
+        if proj.get('techStack'):
+            ops += [('style', 'tech'), cell(0, 5, f"Tech Stack: {proj['techStack']}", True)]
+        if proj.get('description'):
+            ops += [('style', 'body'), ('justified', 0, 5, next(descriptions))]
+        ops.append(('ln', 3))
+    return ops
+
+
+def build_certifications(pdf, entries):
+    ops = [('section_title', 'Certifications')]
+    for cert in entries:
+        cert_link = cert.get('link', '').strip()
+        # Only real URLs become clickable links
+        link = cert_link if cert_link.startswith(('http://', 'https://')) else ''
+        ops += [
+            ('style', 'cert_name'), cell(140, 5, cert.get('name', ''), link=link),
+            ('style', 'cert_date'), cell(0, 5, cert.get('date', ''), True, 'R'),
+            ('style', 'cert_org'), cell(0, 5, cert.get('organization', ''), True),
+            ('ln', 2),
+        ]
+    return ops
+
+
+# (section name, data key, builder) in page order; the header is always drawn
+SECTIONS = (
+    ('header', 'personal', build_header),
+    ('summary', 'summary', build_summary),
+    ('skills', 'skills', build_skills),
+    ('experience', 'experience', build_experience),
+    ('education', 'education', build_education),
+    ('projects', 'projects', build_projects),
+    ('certifications', 'certifications', build_certifications),
+)
+
+
+def section_sequence(order=None):
+    """Sections in drawing order; `order` lists section names to move to the front."""
+    if not order:
+        return SECTIONS
+    rank = {name: i for i, name in enumerate(order)}
+    header, body = SECTIONS[0], SECTIONS[1:]
+    return (header,) + tuple(sorted(body, key=lambda s: rank.get(s[0], len(rank))))
+
+
+def render_resume_pdf(data, timings=None, order=None):
+    """Lay out a resume and return the PDF bytes.
+
+    `data['theme']` picks the fonts (see pdf_fonts.THEMES). Text is sanitized
+    for them lazily, only for sections that are not already in the fragment
+    cache. If `timings` is a list, `(section, seconds, cached)` is appended for every
+    section drawn, plus a `sanitize` entry for the text cleanup (not counted in
+    the sections) and an `output` entry for serialising the document.
+    """
+    theme = get_theme(data.get('theme'))
+    pdf = PDF(theme=theme)
+    pdf.alias_nb_pages()
+    pdf.add_page()
+
+    sanitizing = 0.0
+    for name, key, build in section_sequence(order):
+        value = data.get(key)
+        if name == 'header':
+            value = value or {}
+        elif not value:
+            continue
+        start = time.perf_counter()
+        fragment_key = content_key(value, name, theme.name, PDF_RENDER_VERSION)
+        ops = fragment_cache.get(fragment_key)
+        cached = ops is not None
+        sanitize_seconds = 0.0
+        if not cached:
+            sanitize_start = time.perf_counter()
+            clean = theme.sanitize(value)
+            sanitize_seconds = time.perf_counter() - sanitize_start
+            ops = build(pdf, clean)
+            fragment_cache.set(fragment_key, ops)
+        replay(pdf, ops)
+        sanitizing += sanitize_seconds
+        if timings is not None:
+            timings.append((name, time.perf_counter() - start - sanitize_seconds, cached))
+
+    if timings is not None:
+        timings.append(('sanitize', sanitizing, False))
+    start = time.perf_counter()
+    pdf_content = bytes(pdf.output())
+    if timings is not None:
+        timings.append(('output', time.perf_counter() - start, False))
+    return pdf_content
@@ -0,0 +1,331 @@
+"""Admission control and circuit breaking for outbound dependencies.
+
+Each upstream (Gemini, Supabase) gets a `Dependency` guard with three parts:
+
+- A concurrency limit with a bounded FIFO wait queue. Callers over the limit
+  wait at most `wait_timeout` seconds. When the queue is full they are turned
+  away at once with `Overloaded` (429).
+- A per-call deadline. Async calls are cancelled when it passes; sync callers
+  pass `deadline` to the client's own timeout. A timeout raises
+  `DeadlineExceeded` (504).
+- A circuit breaker. Once at least `min_calls` calls in the last `window`
+  seconds fail at `failure_rate` or more, it opens and calls fail fast with
+  `CircuitOpen` (503) for `open_seconds`. After that one trial call is let
+  through (half-open). Its result decides whether the breaker closes again.
+  Only errors that `is_failure` says come from an unhealthy upstream count
+  (by default timeouts, connection errors and 5xx answers). A unique-key
+  conflict or a blocked prompt is the caller's problem and leaves the breaker
+  alone.
+
+During an upstream brownout only the requests that need that upstream wait, and
+only briefly. Threads of the rest of the app are never tied up behind it.
+
+Guards work for threads and asyncio tasks alike, and both share one limit:
+
+    with gemini.slot():
+        model.generate_content(prompt, request_options={'timeout': gemini.deadline})
+
+    async with gemini.aslot():
+        await gemini.run(model.generate_content_async(prompt))
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+# Timeout errors of the Gemini SDK and httpx, matched by name so neither has to
+# be imported here
+TIMEOUT_ERROR_NAMES = ('DeadlineExceeded', 'TimeoutException', 'ReadTimeout', 'ConnectTimeout',
+                       'WriteTimeout', 'PoolTimeout')
+# Base classes of connection-level errors (httpx) and 5xx answers (google.api_core)
+UPSTREAM_ERROR_NAMES = ('TransportError', 'ServerError')
+
+
+class Rejected(Exception):
+    """A call that was not made, or given up on, to protect the app."""
+    status = 503
+
+    def __init__(self, message, retry_after=1):
+        super().__init__(message)
+        self.retry_after = max(1, int(round(retry_after)))
+
+
+class Overloaded(Rejected):
+    status = 429
+
+
+class CircuitOpen(Rejected):
+    status = 503
+
+
+class DeadlineExceeded(Rejected):
+    status = 504
+
+
+def _is_timeout(error):
+    return isinstance(error, TimeoutError) or type(error).__name__ in TIMEOUT_ERROR_NAMES
+
+
+def _http_status(error):
+    """The HTTP status an error carries, if any."""
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status is None:
+        status = getattr(error, 'code', None)
+    try:
+        status = int(status)
+    except (TypeError, ValueError):
+        return None
+    # PostgREST puts SQLSTATE codes such as '23505' in `code` too
+    return status if 100 <= status < 600 else None
+
+
+def upstream_failure(error):
+    """True if `error` means the upstream is unhealthy: a timeout, a lost connection or a 5xx."""
+    if _is_timeout(error) or isinstance(error, ConnectionError):
+        return True
+    if any(cls.__name__ in UPSTREAM_ERROR_NAMES for cls in type(error).__mro__):
+        return True
+    status = _http_status(error)
+    return status is not None and status >= 500
+
+
+class Dependency:
+    def __init__(self, name, max_concurrent=16, max_waiting=32, wait_timeout=2.0, deadline=30.0,
+                 failure_rate=0.5, min_calls=10, window=30.0, open_seconds=15.0, is_failure=upstream_failure):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.deadline = deadline
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.open_seconds = open_seconds
+        self.is_failure = is_failure
+
+        self._lock = threading.Lock()
+        self._active = 0
+        # FIFO of threading.Event (threads) or (loop, asyncio.Future) (tasks)
+        self._waiters = deque()
+        self._outcomes = deque()  # (monotonic time, ok)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trial_running = False
+
+        self.calls = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.rejected_overloaded = 0
+        self.rejected_open = 0
+        self.times_opened = 0
+
+    # Circuit breaker
+
+    def _check_circuit(self):
+        """Raise CircuitOpen unless a call may go out; call with `_lock` held."""
+        if self._state == CLOSED:
+            return False
+        remaining = self._opened_at + self.open_seconds - time.monotonic()
+        if self._state == OPEN and remaining <= 0:
+            self._state = HALF_OPEN
+        if self._state == HALF_OPEN and not self._trial_running:
+            self._trial_running = True
+            return True
+        self.rejected_open += 1
+        raise CircuitOpen(f"{self.name} is unavailable; failing fast", retry_after=max(remaining, 1))
+
+    def _record(self, ok, trial):
+        now = time.monotonic()
+        with self._lock:
+            self.calls += 1
+            if not ok:
+                self.failures += 1
+            if trial:
+                self._trial_running = False
+                if ok:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._open(now)
+                return
+            self._outcomes.append((now, ok))
+            while self._outcomes and self._outcomes[0][0] < now - self.window:
+                self._outcomes.popleft()
+            if self._state == CLOSED and len(self._outcomes) >= self.min_calls:
+                failed = sum(1 for _, o in self._outcomes if not o)
+                if failed / len(self._outcomes) >= self.failure_rate:
+                    self._open(now)
+
+    def _open(self, now):
+        self._state = OPEN
+        self._opened_at = now
+        self._outcomes.clear()
+        self.times_opened += 1
+
+    # Concurrency limit
+
+    def _admit(self, waiter):
+        """Take a slot now (returns True) or queue `waiter`; call with `_lock` held."""
+        if self._active < self.max_concurrent and not self._waiters:
+            self._active += 1
+            return True
+        if len(self._waiters) >= self.max_waiting:
+            self.rejected_overloaded += 1
+            raise Overloaded(f"too many pending {self.name} calls", retry_after=self.wait_timeout)
+        self._waiters.append(waiter)
+        return False
+
+    def _release(self):
+        with self._lock:
+            # Hand the slot straight to the oldest waiter, if any
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if isinstance(waiter, threading.Event):
+                    waiter.set()
+                    return
+                loop, future = waiter
+                if not future.done():
+                    loop.call_soon_threadsafe(self._grant, future)
+                    return
+            self._active -= 1
+
+    def _grant(self, future):
+        if future.cancelled():
+            self._release()
+        else:
+            future.set_result(True)
+
+    def _remove_waiter(self, waiter):
+        """True if `waiter` was still queued; call with `_lock` held."""
+        try:
+            self._waiters.remove(waiter)
+            return True
+        except ValueError:
+            return False  # handed a slot concurrently, so it owns one now
+
+    def _acquire(self, waiter):
+        """Check the breaker and take or queue for a slot; returns `(admitted, trial)`."""
+        with self._lock:
+            trial = self._check_circuit()
+            try:
+                return self._admit(waiter), trial
+            except Overloaded:
+                if trial:
+                    self._trial_running = False
+                raise
+
+    def _wait_timed_out(self, trial):
+        with self._lock:
+            self.rejected_overloaded += 1
+            if trial:
+                self._trial_running = False
+        return Overloaded(f"timed out waiting for a {self.name} slot", retry_after=self.wait_timeout)
+
+    def _finish(self, trial, error):
+        """Record how a call ended, free its slot, and return the error to raise."""
+        try:
+            if error is None:
+                self._record(True, trial)
+            elif isinstance(error, Exception) and not isinstance(error, Rejected):
+                # An error the upstream answered with on purpose shows it is up
+                self._record(not self.is_failure(error), trial)
+                if _is_timeout(error):
+                    with self._lock:
+                        self.timeouts += 1
+                    exc = DeadlineExceeded(f"{self.name} did not answer within {self.deadline:g}s")
+                    exc.__cause__ = error
+                    return exc
+            elif trial:
+                # Rejected downstream, cancelled or closed: no verdict on the upstream
+                with self._lock:
+                    self._trial_running = False
+            return error
+        finally:
+            self._release()
+
+    @contextmanager
+    def slot(self):
+        """Hold one of the dependency's call slots for the enclosed (sync) call."""
+        event = threading.Event()
+        admitted, trial = self._acquire(event)
+        if not admitted and not event.wait(self.wait_timeout):
+            with self._lock:
+                gave_up = self._remove_waiter(event)
+            if gave_up:
+                raise self._wait_timed_out(trial)
+        try:
+            yield
+        except BaseException as e:
+            error = self._finish(trial, e)
+            if error is e:
+                raise
+            raise error
+        else:
+            self._finish(trial, None)
+
+    @asynccontextmanager
+    async def aslot(self):
+        """`slot()` for asyncio tasks; waiting does not block the event loop."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        waiter = (loop, future)
+        admitted, trial = self._acquire(waiter)
+        if not admitted:
+            try:
+                await asyncio.wait_for(asyncio.shield(future), self.wait_timeout)
+            except BaseException as e:
+                with self._lock:
+                    gave_up = self._remove_waiter(waiter)
+                if not gave_up and not future.cancel():
+                    # The slot arrived as we gave up; pass it on (a pending
+                    # grant sees the cancelled future and passes it on itself)
+                    self._release()
+                if isinstance(e, asyncio.TimeoutError):
+                    raise self._wait_timed_out(trial) from None
+                if trial:
+                    with self._lock:
+                        self._trial_running = False
+                raise
+        try:
+            yield
+        except BaseException as e:
+            error = self._finish(trial, e)
+            if error is e:
+                raise
+            raise error
+        else:
+            self._finish(trial, None)
+
+    async def run(self, awaitable):
+        """Await `awaitable`, cancelling it at the deadline."""
+        return await asyncio.wait_for(awaitable, self.deadline)
+
+    def stats(self):
+        with self._lock:
+            state = self._state
+            if state == OPEN and time.monotonic() >= self._opened_at + self.open_seconds:
+                state = HALF_OPEN
+            recent = len(self._outcomes)
+            recent_failed = sum(1 for _, ok in self._outcomes if not ok)
+            return {
+                'state': state,
+                'active': self._active,
+                'waiting': len(self._waiters),
+                'max_concurrent': self.max_concurrent,
+                'max_waiting': self.max_waiting,
+                'wait_timeout': self.wait_timeout,
+                'deadline': self.deadline,
+                'recent_calls': recent,
+                'recent_error_rate': round(recent_failed / recent, 3) if recent else 0.0,
+                'retry_after': max(0.0, round(self._opened_at + self.open_seconds - time.monotonic(), 1))
+                if state == OPEN else 0.0,
+                'calls': self.calls,
+                'failures': self.failures,
+                'timeouts': self.timeouts,
+                'rejected_overloaded': self.rejected_overloaded,
+                'rejected_open': self.rejected_open,
+                'times_opened': self.times_opened,
+            }
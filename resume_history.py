@@ -0,0 +1,218 @@
+"""Resume version history as periodic snapshots plus JSON Patch deltas.
+
+Every stored save appends one row to `resume_versions`. The row is either a
+full snapshot of the document or the RFC 6902 patch from the previous version.
+It also records the `snapshot_seq` its chain starts from. A new snapshot is
+taken when the chain would exceed `max_chain` deltas, or when its deltas would
+add up to more than `snapshot_ratio` times the last snapshot's size. So:
+
+- storage grows with the size of the edits, plus one document per chain's
+  worth of edits, not with the number of saves times the document size;
+- any version is rebuilt from one snapshot and at most `max_chain` deltas,
+  whose combined size is bounded by the snapshot's. That takes two queries:
+  the row's `snapshot_seq`, then the chain.
+
+Saves that change nothing add no row. The newest version of each user is kept
+in memory, so appending normally costs one insert and no reads. A writer that
+lost a race for the next `seq` (another tab or worker) reloads and retries.
+"""
+import json
+
+from cache import TTLCache
+from json_patch import apply_json_patch, diff_json
+
+HISTORY_TABLE = 'resume_versions'
+LIST_COLUMNS = 'seq,version,kind,size,created_at'
+
+
+def _size(value):
+    return len(json.dumps(value, separators=(',', ':')))
+
+
+def _is_conflict(error):
+    # postgrest's APIError for a duplicate (user_id, seq)
+    return getattr(error, 'code', None) == '23505'
+
+
+class Head:
+    """The newest version of a user and the shape of the chain it ends."""
+
+    def __init__(self, seq, data, version, snapshot_seq, chain_len, chain_bytes, snapshot_bytes):
+        self.seq = seq
+        self.data = data
+        self.version = version
+        self.snapshot_seq = snapshot_seq
+        self.chain_len = chain_len
+        self.chain_bytes = chain_bytes
+        self.snapshot_bytes = snapshot_bytes
+
+
+class ResumeHistory:
+    def __init__(self, max_chain=50, snapshot_ratio=1.0, maxsize=1024, ttl=300):
+        self.max_chain = max_chain
+        self.snapshot_ratio = snapshot_ratio
+        self._heads = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.snapshots = 0
+        self.deltas = 0
+        self.unchanged = 0
+        self.conflicts = 0
+        self.bytes_written = 0
+        self.reconstructions = 0
+        self.deltas_replayed = 0
+
+    # Reading
+
+    def _chain(self, db, user_id, seq):
+        """Rows from the snapshot `seq` is based on up to `seq`, oldest first."""
+        response = (
+            db.table(HISTORY_TABLE)
+            .select('snapshot_seq')
+            .eq('user_id', user_id)
+            .eq('seq', seq)
+            .limit(1)
+            .execute()
+        )
+        if not response.data:
+            return []
+        response = (
+            db.table(HISTORY_TABLE)
+            .select('seq,version,kind,data,size')
+            .eq('user_id', user_id)
+            .gte('seq', response.data[0]['snapshot_seq'])
+            .lte('seq', seq)
+            .order('seq')
+            .execute()
+        )
+        return response.data
+
+    def _replay(self, rows):
+        data = rows[0]['data']
+        for row in rows[1:]:
+            data = apply_json_patch(data, row['data'])
+        self.reconstructions += 1
+        self.deltas_replayed += len(rows) - 1
+        return data
+
+    def _latest_seq(self, db, user_id):
+        response = (
+            db.table(HISTORY_TABLE)
+            .select('seq')
+            .eq('user_id', user_id)
+            .order('seq', desc=True)
+            .limit(1)
+            .execute()
+        )
+        return response.data[0]['seq'] if response.data else None
+
+    def _load_head(self, db, user_id):
+        seq = self._latest_seq(db, user_id)
+        if seq is None:
+            return None
+        rows = self._chain(db, user_id, seq)
+        head = Head(seq, self._replay(rows), rows[-1]['version'], rows[0]['seq'], len(rows) - 1,
+                    sum(row['size'] for row in rows[1:]), rows[0]['size'])
+        self._heads.set(user_id, head)
+        return head
+
+    def load(self, db, user_id, seq):
+        """Return `(data, version)` as of history entry `seq`, or `(None, None)`."""
+        head = self._heads.get(user_id)
+        if head is not None and head.seq == seq:
+            return head.data, head.version
+        rows = self._chain(db, user_id, seq)
+        if not rows:
+            return None, None
+        return self._replay(rows), rows[-1]['version']
+
+    def versions(self, db, user_id, before=None, limit=50):
+        """History entries newest first, without their documents.
+
+        Pass the smallest `seq` of a page as `before` to get the next one.
+        """
+        query = db.table(HISTORY_TABLE).select(LIST_COLUMNS).eq('user_id', user_id)
+        if before is not None:
+            query = query.lt('seq', before)
+        return query.order('seq', desc=True).limit(limit).execute().data
+
+    def diff(self, db, user_id, from_seq, to_seq):
+        """The JSON Patch from entry `from_seq` to `to_seq`, or None if either is missing."""
+        before, _ = self.load(db, user_id, from_seq)
+        after, _ = self.load(db, user_id, to_seq)
+        if before is None or after is None:
+            return None
+        return diff_json(before, after)
+
+    # Writing
+
+    def _next_row(self, head, user_id, data, version):
+        """The row that appends `data` after `head`, and the head it leads to."""
+        if head is not None:
+            ops = diff_json(head.data, data)
+            if not ops:
+                return None, head
+            size = _size(ops)
+            seq = head.seq + 1
+            if (head.chain_len < self.max_chain
+                    and head.chain_bytes + size <= head.snapshot_bytes * self.snapshot_ratio):
+                row = {'user_id': user_id, 'seq': seq, 'version': version, 'kind': 'delta',
+                       'snapshot_seq': head.snapshot_seq, 'data': ops, 'size': size}
+                return row, Head(seq, data, version, head.snapshot_seq, head.chain_len + 1, head.chain_bytes + size,
+                                 head.snapshot_bytes)
+        seq = head.seq + 1 if head is not None else 1
+        size = _size(data)
+        row = {'user_id': user_id, 'seq': seq, 'version': version, 'kind': 'snapshot',
+               'snapshot_seq': seq, 'data': data, 'size': size}
+        return row, Head(seq, data, version, seq, 0, 0, size)
+
+    def record(self, db, user_id, data, version):
+        """Append a stored document to the user's history; returns its `seq`.
+
+        Returns None when `data` equals the newest version. `data` is kept as
+        the user's head and must not be modified afterwards.
+        """
+        from postgrest.types import ReturnMethod
+
+        for attempt in range(2):
+            head = self._heads.get(user_id)
+            cached = head is not None
+            if not cached:
+                head = self._load_head(db, user_id)
+            row, new_head = self._next_row(head, user_id, data, version)
+            if row is None:
+                # Another worker may have saved since this head was cached
+                if cached and self._latest_seq(db, user_id) != head.seq:
+                    self._heads.pop(user_id)
+                    continue
+                self.unchanged += 1
+                return None
+            try:
+                db.table(HISTORY_TABLE).insert(row, returning=ReturnMethod.minimal).execute()
+            except Exception as e:
+                # Whatever happened, the cached head may be behind the table now
+                self._heads.pop(user_id)
+                if not _is_conflict(e) or attempt:
+                    raise
+                self.conflicts += 1
+                continue
+            self._heads.set(user_id, new_head)
+            if row['kind'] == 'snapshot':
+                self.snapshots += 1
+            else:
+                self.deltas += 1
+            self.bytes_written += row['size']
+            return row['seq']
+
+    def stats(self):
+        return {
+            'max_chain': self.max_chain,
+            'snapshot_ratio': self.snapshot_ratio,
+            'heads': len(self._heads),
+            'snapshots': self.snapshots,
+            'deltas': self.deltas,
+            'unchanged': self.unchanged,
+            'conflicts': self.conflicts,
+            'bytes_written': self.bytes_written,
+            'reconstructions': self.reconstructions,
+            'avg_deltas_replayed': round(self.deltas_replayed / self.reconstructions, 2)
+            if self.reconstructions else 0.0,
+        }
@@ -0,0 +1,346 @@
+import importlib.util
+import re
+
+# PyPDF2 is only imported when a PDF is actually read
+PDF_SUPPORT = importlib.util.find_spec('PyPDF2') is not None
+
+
+# Section heading (matched case-insensitively, optional trailing colon) -> data key
+HEADINGS = {
+    'summary': ('summary', 'professional summary', 'profile', 'professional profile',
+                'objective', 'career objective', 'about me'),
+    'skills': ('skills', 'technical skills', 'key skills', 'core competencies',
+               'competencies', 'technologies'),
+    'experience': ('experience', 'work experience', 'professional experience',
+                   'employment', 'employment history', 'work history', 'career history'),
+    'education': ('education', 'academic background', 'qualifications'),
+    'projects': ('projects', 'personal projects', 'academic projects', 'key projects',
+                 'selected projects'),
+    'certifications': ('certifications', 'certificates', 'certification',
+                       'licenses & certifications', 'licenses and certifications', 'courses'),
+    'contact': ('contact', 'contact information', 'contact details'),
+}
+_HEADING_KEYS = {name: key for key, names in HEADINGS.items() for name in names}
+
+_MONTH = r'(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?'
+_YEAR = r'(?:19|20)\d{2}'
+_DATE = rf'(?:{_MONTH}\s+{_YEAR}|\d{{1,2}}/{_YEAR}|{_YEAR}-\d{{2}}|{_YEAR})'
+
+HEADING_RE = re.compile(
+    r'^(' + '|'.join(re.escape(h) for h in sorted(_HEADING_KEYS, key=len, reverse=True)) + r')\s*:?$',
+    re.I,
+)
+PAGE_FOOTER_RE = re.compile(r'^page\s+\d+(?:\s*(?:/|of)\s*\d+)?$', re.I)
+SEPARATOR_RE = re.compile(r'\s+[|\u2022\u00b7]\s+|\s{2,}')
+BULLET_RE = re.compile(r'^[\u2022\u25aa\u25cf\u2023\u2043*>-]\s*')
+EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+PHONE_RE = re.compile(r'\+?\(?\d[\d\s().-]{6,}\d')
+LINKEDIN_RE = re.compile(r'(?:https?://)?(?:[\w-]+\.)?linkedin\.com/[^\s|,]+', re.I)
+GITHUB_RE = re.compile(r'(?:https?://)?(?:www\.)?github\.com/[^\s|,]+', re.I)
+URL_RE = re.compile(r'(?:https?://)?(?:www\.)?[a-z0-9-]+(?:\.[a-z0-9-]+)*\.[a-z]{2,}(?:/[^\s|,]*)?', re.I)
+LABEL_RE = re.compile(r'\b(linkedin|github|portfolio|website)\s*:\s*([^\s|,]+)', re.I)
+LOCATION_RE = re.compile(r"^(?:(?i:remote)|[A-Z][A-Za-z .'-]+,\s*[A-Z][A-Za-z .]+)$")
+DATE_RANGE_RE = re.compile(
+    rf'\(?\b({_DATE})\s*(?:-|\u2013|\u2014|to|until)\s*({_DATE}|present|current|now|ongoing)\b\)?\s*$',
+    re.I,
+)
+TRAILING_DATE_RE = re.compile(rf'\(?\b({_DATE})\)?\s*$', re.I)
+YEAR_RE = re.compile(rf'\b{_YEAR}\b')
+GPA_RE = re.compile(r'\b(?:c?gpa(?:/c?gpa)?|grade)\s*[:\-]?\s*(\d+(?:\.\d+)?(?:\s*/\s*\d+(?:\.\d+)?)?)', re.I)
+DEGREE_RE = re.compile(
+    r'\b(?:bachelor|master|doctor|ph\.?\s?d|mba|b\.?\s?(?:s|sc|a|e|tech)|m\.?\s?(?:s|sc|a|e|tech)|'
+    r'associate|diploma|degree|high school)\b\.?',
+    re.I,
+)
+SCHOOL_RE = re.compile(r'\b(?:university|college|institute|school|academy|polytechnic)\b', re.I)
+TECH_STACK_RE = re.compile(r'^(?:tech(?:nologies|nology)?(?:\s+stack)?|stack|tools|built with)\s*:\s*(.+)$', re.I)
+SKILL_RE = re.compile(r'^([^:]{1,40}):\s*(.+)$')
+ORG_SPLIT_RE = re.compile(r'\s+(?:\||\u2013|\u2014|-|@|at)\s+')
+
+
+def iter_pdf_pages(stream, max_pages=None):
+    """Yield the text of each page of a PDF file object, one page at a time.
+
+    Pages are only extracted when the consumer asks for them, so stopping the
+    iteration early skips the remaining pages entirely.
+    """
+    from PyPDF2 import PdfReader
+    pdf_reader = PdfReader(stream)
+    for i, page in enumerate(pdf_reader.pages):
+        if max_pages is not None and i >= max_pages:
+            break
+        yield page.extract_text() or ''
+
+
+def extract_pdf_text(stream, max_pages=None, max_chars=None):
+    """Extract PDF text, stopping at `max_pages` pages or `max_chars` characters."""
+    parts = []
+    total = 0
+    for text in iter_pdf_pages(stream, max_pages):
+        parts.append(text + '\n')
+        total += len(text) + 1
+        if max_chars is not None and total >= max_chars:
+            break
+    text = ''.join(parts)
+    return text[:max_chars] if max_chars is not None else text
+
+
+# Flat contact key -> key in `personal`
+_PERSONAL_KEYS = {
+    'name': 'fullName',
+    'email': 'email',
+    'phone': 'phone',
+    'linkedin': 'linkedin',
+    'github': 'github',
+    'portfolio': 'portfolio',
+}
+
+
+def parse_resume_pages(pages):
+    """Parse resume text page by page into the structure the editor and PDF use.
+
+    Each line is stripped once and classified by the precompiled patterns above:
+    a heading switches the current section, and every other line is handed to
+    that section's parser. Lines before the first heading are the contact
+    header. The flat contact keys (`name`, `email`, ...) are kept alongside
+    `personal` for older clients.
+    """
+    parser = _ResumeParser()
+    for page in pages:
+        for line in page.split('\n'):
+            parser.feed(line)
+    return parser.result()
+
+
+def _strip_bullet(line):
+    return BULLET_RE.sub('', line, count=1)
+
+
+def _split_org(line):
+    """Split "Company | Location" (or "Company - Location", "Company at ...")."""
+    parts = ORG_SPLIT_RE.split(line, maxsplit=1)
+    return parts[0].strip(), (parts[1].strip() if len(parts) > 1 else '')
+
+
+def _split_school(line):
+    """Split "B.S. Computer Science, Stanford University" into degree and school."""
+    parts = ORG_SPLIT_RE.split(line) if ORG_SPLIT_RE.search(line) else line.split(', ')
+    for i, part in enumerate(parts[1:], 1):
+        if SCHOOL_RE.search(part):
+            return ', '.join(parts[:i]).strip(), ', '.join(parts[i:]).strip()
+    return line, ''
+
+
+def _append_line(lines, line):
+    """Add a description line, re-joining lines the PDF wrapped mid-sentence."""
+    bullet = BULLET_RE.match(line) is not None
+    text = _strip_bullet(line)
+    if lines and not bullet and (text[:1].islower() or lines[-1][-1:] not in '.!?:;'):
+        lines[-1] = f'{lines[-1]} {text}'
+    elif text:
+        lines.append(text)
+
+
+class _ResumeParser:
+    def __init__(self):
+        self.personal = {
+            'fullName': '', 'email': '', 'phone': '', 'location': '',
+            'linkedin': '', 'github': '', 'portfolio': '',
+        }
+        self.summary = []
+        self.skills = []
+        self.experience = []
+        self.education = []
+        self.projects = []
+        self.certifications = []
+        self.section = 'header'
+        self.header_lines = 0
+        # Entry being filled and its description lines, joined when it is closed
+        self._entry = None
+        self._lines = None
+        self._handlers = {
+            'header': self._header,
+            'contact': self._header,
+            'summary': self._summary,
+            'skills': self._skill,
+            'experience': self._experience,
+            'education': self._education,
+            'projects': self._project,
+            'certifications': self._certification,
+        }
+
+    def feed(self, line):
+        line = line.strip()
+        if not line or PAGE_FOOTER_RE.match(line):
+            return
+        if len(line) <= 40:
+            heading = HEADING_RE.match(line)
+            if heading:
+                self._close()
+                self.section = _HEADING_KEYS[heading.group(1).lower()]
+                return
+        self._handlers[self.section](line)
+
+    def _open(self, entries, entry):
+        self._close()
+        entries.append(entry)
+        self._entry = entry
+        self._lines = []
+        return entry
+
+    def _close(self):
+        if self._lines is not None:
+            self._entry['description'] = '\n'.join(self._lines)
+        self._lines = None
+        self._entry = None
+
+    # Contact header
+
+    def _header(self, line):
+        p = self.personal
+        self.header_lines += 1
+        for label, value in LABEL_RE.findall(line):
+            key = 'portfolio' if label.lower() == 'website' else label.lower()
+            p[key] = p[key] or value
+        for key, pattern in (('email', EMAIL_RE), ('linkedin', LINKEDIN_RE), ('github', GITHUB_RE)):
+            if not p[key]:
+                match = pattern.search(line)
+                if match:
+                    p[key] = match.group()
+        for segment in SEPARATOR_RE.split(line):
+            self._contact_segment(segment.strip())
+        if (not p['fullName'] and self.section == 'header' and self.header_lines <= 5
+                and 2 < len(line) < 100 and not any(c.isdigit() or c in '@+:/|' for c in line)):
+            p['fullName'] = line
+
+    def _contact_segment(self, segment):
+        """Fill phone, location or portfolio from one `|`-separated header segment."""
+        p = self.personal
+        if '@' in segment or LABEL_RE.match(segment) or LINKEDIN_RE.search(segment) or GITHUB_RE.search(segment):
+            return
+        phone = PHONE_RE.search(segment)
+        if phone and sum(c.isdigit() for c in phone.group()) >= 7 and not DATE_RANGE_RE.search(segment):
+            p['phone'] = p['phone'] or phone.group().strip()
+        elif LOCATION_RE.match(segment):
+            p['location'] = p['location'] or segment
+        elif URL_RE.fullmatch(segment):
+            p['portfolio'] = p['portfolio'] or segment
+
+    # Sections
+
+    def _summary(self, line):
+        self.summary.append(_strip_bullet(line))
+
+    def _skill(self, line):
+        text = _strip_bullet(line)
+        match = SKILL_RE.match(text)
+        if match:
+            self.skills.append({'category': match.group(1).strip(), 'items': match.group(2).strip()})
+        elif self.skills:
+            # Either a wrapped line of the previous category or an uncategorised list
+            last = self.skills[-1]
+            joiner = ' ' if last['items'].endswith(',') or BULLET_RE.match(line) is None else ', '
+            last['items'] = f"{last['items']}{joiner}{text}"
+        else:
+            self.skills.append({'category': 'Skills', 'items': text})
+
+    def _experience(self, line):
+        # Sentences never end in a date range, so most description lines skip the search
+        dates = DATE_RANGE_RE.search(line) if line[-1] not in '.,;:!?' else None
+        entry = self._entry
+        if dates:
+            text = line[:dates.start()].strip(' |,-\u2013\u2014(')
+            if entry is not None and not entry['startDate'] and not self._lines:
+                # Dates below a "Title" line, possibly after the company
+                entry['startDate'], entry['endDate'] = dates.group(1), dates.group(2)
+                if text and not entry['company']:
+                    entry['company'], entry['location'] = _split_org(text)
+                return
+            if not text and self._lines:
+                # "Title" on its own line above the dates ended up in the last description
+                text = self._lines.pop()
+            # "Title | Company  Jan 2020 - Present" carries the company on the same line
+            title, company = _split_org(text)
+            self._open(self.experience, {
+                'title': title, 'company': company, 'location': '',
+                'startDate': dates.group(1), 'endDate': dates.group(2), 'description': '',
+            })
+        elif entry is None:
+            self._open(self.experience, {
+                'title': _strip_bullet(line), 'company': '', 'location': '',
+                'startDate': '', 'endDate': '', 'description': '',
+            })
+        elif not entry['company'] and not self._lines and BULLET_RE.match(line) is None:
+            entry['company'], entry['location'] = _split_org(line)
+        else:
+            _append_line(self._lines, line)
+
+    def _education(self, line):
+        gpa = GPA_RE.search(line)
+        if gpa and self._entry is not None:
+            self._entry['cgpa'] = self._entry['cgpa'] or gpa.group(1)
+            return
+        year = YEAR_RE.findall(line)
+        text = TRAILING_DATE_RE.sub('', DATE_RANGE_RE.sub('', line)).strip(' |,-\u2013\u2014(')
+        entry = self._entry
+        if entry is None or (entry['degree'] and entry['university']) or (DEGREE_RE.search(line) and entry['degree']):
+            degree, university = _split_school(text)
+            entry = self._open(self.education, {'degree': degree, 'university': university, 'year': '', 'cgpa': ''})
+            # Education has no free text; keep the entry open without description lines
+            self._lines = None
+        elif not entry['university']:
+            entry['university'] = text
+        if year and not entry['year']:
+            entry['year'] = year[-1]
+
+    def _project(self, line):
+        tech = TECH_STACK_RE.match(line)
+        if tech and self._entry is not None:
+            self._entry['techStack'] = tech.group(1).strip()
+            return
+        entry = self._entry
+        looks_like_title = (BULLET_RE.match(line) is None and len(line) <= 80
+                            and line[-1] not in '.!?,;' and not line[0].islower())
+        wrapped = self._lines and self._lines[-1][-1:] not in '.!?'
+        if entry is None or (looks_like_title and (self._lines or entry['techStack']) and not wrapped):
+            self._open(self.projects, {'title': _strip_bullet(line), 'techStack': '', 'description': ''})
+        else:
+            _append_line(self._lines, line)
+
+    def _certification(self, line):
+        text = _strip_bullet(line)
+        link = None
+        if '.' in text:
+            link = next((m for m in URL_RE.finditer(text) if m.group().startswith(('http', 'www'))), None)
+            if link:
+                text = (text[:link.start()] + text[link.end():]).strip(' |,-')
+        date = TRAILING_DATE_RE.search(text)
+        if date:
+            text = text[:date.start()].strip(' |,-\u2013\u2014(')
+        entry = self._entry
+        if entry is None or date or entry['organization']:
+            if text or date:
+                entry = self._open(self.certifications, {
+                    'name': text, 'organization': '', 'date': date.group(1) if date else '', 'link': '',
+                })
+                self._lines = None
+        elif text:
+            entry['organization'] = text
+        if link and entry is not None:
+            entry['link'] = entry['link'] or link.group()
+
+    def result(self):
+        self._close()
+        p = self.personal
+        data = {flat: p[key] for flat, key in _PERSONAL_KEYS.items()}
+        data['location'] = p['location']
+        data['summary'] = ' '.join(self.summary)
+        data.update({
+            'personal': p,
+            'skills': self.skills,
+            'experience': self.experience,
+            'education': self.education,
+            'projects': self.projects,
+            'certifications': self.certifications,
+        })
+        return data
@@ -0,0 +1,158 @@
+import uuid
+from datetime import datetime, timezone
+
+RESUMES_TABLE = 'resumes'
+
+
+def new_version():
+    """Return an opaque version token; every write stores a fresh one."""
+    return uuid.uuid4().hex
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def fetch_resume(db, user_id):
+    """Return the stored resume data for a user, or None if there is none."""
+    response = (
+        db.table(RESUMES_TABLE)
+        .select('data')
+        .eq('user_id', user_id)
+        .limit(1)
+        .execute()
+    )
+    return response.data[0]['data'] if response.data else None
+
+
+# The queries are built once for both the sync and the async Supabase client;
+# only `execute()` differs (it is a coroutine on the async client).
+
+def _version_query(db, user_id):
+    return (
+        db.table(RESUMES_TABLE)
+        .select('data,version')
+        .eq('user_id', user_id)
+        .limit(1)
+    )
+
+
+def _version_row(response):
+    if not response.data:
+        return None, None
+    row = response.data[0]
+    return row['data'], row.get('version')
+
+
+def fetch_resume_version(db, user_id):
+    """Return `(data, version)` for a user, or `(None, None)` if there is no row."""
+    return _version_row(_version_query(db, user_id).execute())
+
+
+async def afetch_resume_version(db, user_id):
+    """`fetch_resume_version` for an async Supabase client."""
+    return _version_row(await _version_query(db, user_id).execute())
+
+
+def _upsert_query(db, user_id, data, version):
+    # postgrest is only needed once there is a database to talk to; importing it
+    # here keeps it off the cold-start path of requests that never write
+    from postgrest.types import ReturnMethod
+
+    row = {
+        'user_id': user_id,
+        'data': data,
+        'version': version,
+        'updated_at': _now(),
+    }
+    return db.table(RESUMES_TABLE).upsert(
+        row,
+        on_conflict='user_id',
+        returning=ReturnMethod.minimal,
+        default_to_null=False,
+    )
+
+
+def save_resume_data(db, user_id, data, version=None):
+    """Insert or update a user's resume in a single round-trip.
+
+    `resumes.user_id` is unique, so PostgREST resolves the conflict server-side
+    and concurrent saves from several tabs can no longer race between a
+    select and the following insert. Returns the stored version token.
+    """
+    version = version or new_version()
+    _upsert_query(db, user_id, data, version).execute()
+    return version
+
+
+async def asave_resume_data(db, user_id, data, version=None):
+    """`save_resume_data` for an async Supabase client."""
+    version = version or new_version()
+    await _upsert_query(db, user_id, data, version).execute()
+    return version
+
+
+def _update_if_version_query(db, user_id, data, expected_version, version):
+    from postgrest.types import CountMethod, ReturnMethod
+
+    return (
+        db.table(RESUMES_TABLE)
+        .update(
+            {'data': data, 'version': version, 'updated_at': _now()},
+            count=CountMethod.exact,
+            returning=ReturnMethod.minimal,
+        )
+        .eq('user_id', user_id)
+        .eq('version', expected_version)
+    )
+
+
+def update_resume_if_version(db, user_id, data, expected_version, version=None):
+    """Overwrite a resume only if it is still at `expected_version`.
+
+    The version check happens inside the single UPDATE, so two writers starting
+    from the same version cannot both succeed. Returns the new version token,
+    or None if the stored version has moved on.
+    """
+    version = version or new_version()
+    response = _update_if_version_query(db, user_id, data, expected_version, version).execute()
+    return version if response.count else None
+
+
+async def aupdate_resume_if_version(db, user_id, data, expected_version, version=None):
+    """`update_resume_if_version` for an async Supabase client."""
+    version = version or new_version()
+    response = await _update_if_version_query(db, user_id, data, expected_version, version).execute()
+    return version if response.count else None
+
+
+def fetch_resume_page(db, after=None, limit=1000):
+    """One page of all resumes ordered by `user_id`, starting after `after`.
+
+    Keyset pagination: every page is an index range scan, however deep into
+    the table it is, where an OFFSET would rescan all the rows before it.
+    """
+    query = db.table(RESUMES_TABLE).select('user_id,data,version,updated_at')
+    if after is not None:
+        query = query.gt('user_id', after)
+    return query.order('user_id').limit(limit).execute().data
+
+
+def save_resumes_batch(db, rows):
+    """Upsert many `{'user_id', 'data'}` rows in one request; returns their versions.
+
+    Each row gets a fresh version token, so editors holding an older one fall
+    back to a full reload instead of patching over the imported document.
+    """
+    from postgrest.types import ReturnMethod
+
+    now = _now()
+    rows = [{'user_id': row['user_id'], 'data': row['data'], 'version': new_version(), 'updated_at': now}
+            for row in rows]
+    db.table(RESUMES_TABLE).upsert(
+        rows,
+        on_conflict='user_id',
+        returning=ReturnMethod.minimal,
+        default_to_null=False,
+    ).execute()
+    return [row['version'] for row in rows]
@@ -0,0 +1,85 @@
+"""Text sanitization for the PDF fonts: the latin-1 core fonts or an embedded font."""
+
+# Typographic characters with readable ASCII stand-ins; anything else outside
+# latin-1 becomes '?'
+REPLACEMENTS = {
+    '\u2013': '-',
+    '\u2014': '--',
+    '\u2018': "'",
+    '\u2019': "'",
+    '\u201c': '"',
+    '\u201d': '"',
+    '\u2022': '*',
+    '\u2026': '...',
+    '\u00a0': ' ',
+}
+
+
+def sanitize_text(text):
+    if not text:
+        return ""
+    # Most resume text is plain ASCII and needs no work at all
+    if text.isascii():
+        return text
+    # Chained str.replace runs in C and returns the same object when the
+    # character is absent; it beats str.translate and regex substitution here
+    for char, replacement in REPLACEMENTS.items():
+        text = text.replace(char, replacement)
+    try:
+        text.encode('latin-1')
+        return text
+    except UnicodeEncodeError:
+        # Final safety net: encode to latin-1, replacing errors with '?'
+        return text.encode('latin-1', 'replace').decode('latin-1')
+
+
+def font_sanitizer(covered):
+    """A `sanitize_text` for an embedded font that has glyphs for the code points in `covered`.
+
+    Only characters the font cannot draw are replaced, so names in any script
+    the font covers come through unchanged.
+    """
+    def sanitize(text):
+        if not text:
+            return ""
+        if text.isascii() or all(ord(char) in covered for char in set(text)):
+            return text
+        return ''.join(char if ord(char) in covered else _stand_in(char, covered) for char in text)
+    return sanitize
+
+
+def _stand_in(char, covered):
+    replacement = REPLACEMENTS.get(char)
+    if replacement is not None and all(ord(c) in covered for c in replacement):
+        return replacement
+    return '?'
+
+
+def recursive_sanitize(obj, sanitize=sanitize_text):
+    """Sanitize every string in a JSON document with `sanitize`.
+
+    Copy-on-write: containers are only rebuilt along paths where a string
+    actually changed, so an already-clean document is returned as is.
+    """
+    if isinstance(obj, str):
+        return sanitize(obj)
+    if isinstance(obj, dict):
+        changed = None
+        for k, v in obj.items():
+            clean = recursive_sanitize(v, sanitize)
+            if clean is not v and (not isinstance(v, str) or clean != v):
+                if changed is None:
+                    changed = dict(obj)
+                changed[k] = clean
+        return obj if changed is None else changed
+    if isinstance(obj, list):
+        changed = None
+        for i, v in enumerate(obj):
+            clean = recursive_sanitize(v, sanitize)
+            if clean is not v and (not isinstance(v, str) or clean != v):
+                if changed is None:
+                    changed = list(obj)
+                changed[i] = clean
+        return obj if changed is None else changed
+    return obj
+
@@ -138,6 +138,16 @@ async function handlePDFUpload(event) {
         if (data.portfolio) document.getElementById('portfolio').value = data.portfolio;
         if (data.summary) document.getElementById('summary').value = data.summary;
 
+        // Fill the repeating sections the parser recognised, keeping the rest of the form
+        const sections = ['skills', 'experience', 'education', 'projects', 'certifications'];
+        if (sections.some(key => Array.isArray(data[key]) && data[key].length)) {
+            const formData = collectFormData();
+            sections.forEach(key => {
+                if (Array.isArray(data[key]) && data[key].length) formData[key] = data[key];
+            });
+            populateFormData(formData);
+        }
+
         showToast('✅ PDF extracted successfully! Form fields populated.', 'success');
         
         // Reset the file input so same file can be selected again
@@ -422,6 +432,7 @@ function collectFormData() {
             portfolio: document.getElementById('portfolio').value
         },
         summary: document.getElementById('summary').value,
+        theme: document.getElementById('pdfTheme')?.value || undefined,
         skills: [],
         experience: [],
         education: [],
@@ -681,6 +692,9 @@ window.onclick = function(event) {
 // PDF Export (using Python FPDF backend)
 // ============================================
 
+// Last rendered PDF, reused when the server answers 304 Not Modified
+let lastPdf = null;
+
 function downloadPDF() {
     const data = collectFormData();
     const btn = document.getElementById('downloadBtn');
@@ -688,20 +702,29 @@ function downloadPDF() {
     btn.innerHTML = '⏳ Generating PDF...';
     btn.disabled = true;
 
+    const headers = {
+        'Content-Type': 'application/json',
+    };
+    if (lastPdf) headers['If-None-Match'] = lastPdf.etag;
+
     fetch('/generate-pdf', {
         method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
-        },
+        headers,
         body: JSON.stringify(data)
     })
     .then(async response => {
+        if (response.status === 304 && lastPdf) {
+            return lastPdf.blob;
+        }
         if (response.headers.get('content-type')?.includes('application/json')) {
             const err = await response.json();
             throw new Error(err.error || 'Server error');
         }
         if (!response.ok) throw new Error('Network response was not ok');
-        return response.blob();
+        const blob = await response.blob();
+        const etag = response.headers.get('ETag');
+        lastPdf = etag ? { etag, blob } : null;
+        return blob;
     })
     .then(blob => {
         if (blob.size === 0) {
@@ -744,23 +767,137 @@ function saveFormData() {
 }
 
 let saveTimeout;
+// Seeded from the document the page was rendered with, so even the first save
+// is made against a version and cannot overwrite a newer one
+let lastSavedData = window.serverResumeVersion ? JSON.parse(JSON.stringify(window.serverResumeData)) : null;   // Last document the server acknowledged
+let resumeVersion = window.serverResumeVersion || null;   // Server version token for lastSavedData
+
+// Build a JSON Patch (RFC 6902) that turns `before` into `after`
+function diffJSON(before, after, path = '', ops = []) {
+    if (before === after) return ops;
+    const bothArrays = Array.isArray(before) && Array.isArray(after);
+    const bothObjects = before && after && typeof before === 'object' && typeof after === 'object'
+        && !Array.isArray(before) && !Array.isArray(after);
+
+    if (bothArrays) {
+        const common = Math.min(before.length, after.length);
+        for (let i = 0; i < common; i++) {
+            diffJSON(before[i], after[i], `${path}/${i}`, ops);
+        }
+        for (let i = common; i < after.length; i++) {
+            ops.push({ op: 'add', path: `${path}/${i}`, value: after[i] });
+        }
+        for (let i = before.length - 1; i >= common; i--) {
+            ops.push({ op: 'remove', path: `${path}/${i}` });
+        }
+    } else if (bothObjects) {
+        for (const key of Object.keys(before)) {
+            if (!(key in after)) ops.push({ op: 'remove', path: `${path}/${escapePointer(key)}` });
+        }
+        for (const key of Object.keys(after)) {
+            const childPath = `${path}/${escapePointer(key)}`;
+            if (!(key in before)) {
+                ops.push({ op: 'add', path: childPath, value: after[key] });
+            } else {
+                diffJSON(before[key], after[key], childPath, ops);
+            }
+        }
+    } else {
+        ops.push({ op: 'replace', path, value: after });
+    }
+    return ops;
+}
+
+function escapePointer(key) {
+    return String(key).replace(/~/g, '~0').replace(/\//g, '~1');
+}
+
 function saveToCloud(data) {
     clearTimeout(saveTimeout);
     saveTimeout = setTimeout(() => {
-        fetch('/api/save-resume', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify(data)
-        }).then(response => {
-            if (response.ok) {
-                console.log('Saved to cloud');
-            }
-        }).catch(err => console.error('Error saving to cloud', err));
+        const snapshot = JSON.parse(JSON.stringify(data));
+        if (lastSavedData && resumeVersion) {
+            const ops = diffJSON(lastSavedData, snapshot);
+            if (ops.length === 0) return; // Nothing changed since the last save
+            patchCloud(ops, snapshot);
+        } else {
+            fullSaveToCloud(snapshot);
+        }
     }, 2000);
 }
 
+function fullSaveToCloud(snapshot) {
+    const headers = { 'Content-Type': 'application/json' };
+    // Without a version the server only accepts the save while there is no resume yet
+    if (resumeVersion) headers['If-Match'] = `"${resumeVersion}"`;
+    fetch('/api/save-resume', {
+        method: 'POST',
+        headers,
+        body: JSON.stringify(snapshot)
+    }).then(async response => {
+        if (response.ok) {
+            const result = await response.json();
+            lastSavedData = snapshot;
+            resumeVersion = result.version || null;
+            console.log('Saved to cloud');
+        } else if (response.status === 412 || response.status === 428) {
+            resolveSaveConflict(snapshot);
+        }
+    }).catch(err => console.error('Error saving to cloud', err));
+}
+
+// Send only the changes since the last acknowledged save
+function patchCloud(ops, snapshot) {
+    fetch('/api/save-resume', {
+        method: 'PATCH',
+        headers: {
+            'Content-Type': 'application/json-patch+json',
+            'If-Match': `"${resumeVersion}"`,
+        },
+        body: JSON.stringify(ops)
+    }).then(async response => {
+        if (response.ok) {
+            const result = await response.json();
+            lastSavedData = snapshot;
+            resumeVersion = result.version;
+            console.log(`Saved ${ops.length} change(s) to cloud`);
+        } else if ([400, 404, 412, 428].includes(response.status)) {
+            // Patch not applicable: resend the whole document, still against resumeVersion
+            fullSaveToCloud(snapshot);
+        }
+    }).catch(err => console.error('Error saving to cloud', err));
+}
+
+// Another tab or device saved since this page last did: load that copy and
+// let the user pick it or overwrite it with what is on screen
+let resolvingConflict = false;
+function resolveSaveConflict(snapshot) {
+    if (resolvingConflict) return;
+    resolvingConflict = true;
+    fetch('/api/resume-data', { cache: 'no-store' }).then(async response => {
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        const serverData = await response.json();
+        lastSavedData = serverData;
+        resumeVersion = (response.headers.get('ETag') || '').replace(/^W\//, '').replace(/"/g, '') || null;
+        if (diffJSON(serverData, snapshot).length === 0) return;
+
+        const keepMine = confirm('This resume was changed in another tab or on another device.\n\n'
+            + 'OK: keep the version on this page and overwrite the other one.\n'
+            + 'Cancel: load the other version.');
+        if (keepMine) {
+            fullSaveToCloud(snapshot);
+        } else {
+            populateFormData(serverData);
+            localStorage.setItem('resumeFormData', JSON.stringify({
+                owner: window.currentUserEmail,
+                content: serverData
+            }));
+            showToast('Loaded the latest saved version', 'success');
+        }
+    }).catch(err => console.error('Error reloading resume after a save conflict', err))
+      .finally(() => { resolvingConflict = false; });
+}
+
 // Load form data from localStorage
 function loadFormData() {
     // Check if we have server-side data injected into the page
@@ -822,6 +959,10 @@ function populateFormData(data) {
     document.getElementById('github').value = data.personal?.github || '';
     document.getElementById('portfolio').value = data.personal?.portfolio || '';
     document.getElementById('summary').value = data.summary || '';
+    const themeSelect = document.getElementById('pdfTheme');
+    if (themeSelect && data.theme && Array.from(themeSelect.options).some(option => option.value === data.theme)) {
+        themeSelect.value = data.theme;
+    }
 
     // Skills
     const skillContainer = document.getElementById('skillsContainer');
@@ -1047,6 +1188,9 @@ async function analyzeJD() {
     analyzeBtn.disabled = true;
     analyzeBtn.textContent = 'Analyzing...';
 
+    // The local keyword score comes back long before the Gemini analysis
+    if (jdText) showMatchScore(jdText);
+
     const formData = new FormData();
     if (jdText) formData.append('jd_text', jdText);
     if (jdFile) formData.append('jd_file', jdFile);
@@ -1075,6 +1219,22 @@ async function analyzeJD() {
     }
 }
 
+async function showMatchScore(jdText) {
+    try {
+        const response = await fetch('/api/match-score', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ jd_text: jdText, resume: collectFormData() })
+        });
+        if (!response.ok) return;
+        const result = await response.json();
+        const missing = result.missing.length ? ` Missing: ${result.missing.slice(0, 5).join(', ')}` : '';
+        showToast(`Keyword match: ${Math.round(result.score)}%.${missing}`, 'info');
+    } catch (error) {
+        console.error('Error scoring resume:', error);
+    }
+}
+
 function displayJDSuggestions(data) {
     const resultsDiv = document.getElementById('jdResults');
     resultsDiv.style.display = 'block';
@@ -1196,7 +1356,8 @@ async function generateCoverLetter() {
         const response = await fetch('/generate-cover-letter', {
             method: 'POST',
             headers: {
-                'Content-Type': 'application/json'
+                'Content-Type': 'application/json',
+                'Accept': 'text/event-stream'
             },
             body: JSON.stringify({
                 job_title: jobTitle,
@@ -1211,16 +1372,31 @@ async function generateCoverLetter() {
             })
         });
 
-        const data = await response.json();
+        const subjectField = document.getElementById('emailSubject');
+        const letterField = document.getElementById('coverLetterText');
+
+        if (response.ok && response.body && (response.headers.get('Content-Type') || '').startsWith('text/event-stream')) {
+            // Show the letter as it is written instead of after the whole generation
+            letterField.value = '';
+            document.getElementById('coverLetterContent').style.display = 'block';
+            await readEventStream(response, (event, payload) => {
+                if (event === 'subject') subjectField.value = payload.subject;
+                if (event === 'chunk') letterField.value += payload.text;
+                if (event === 'error') throw new Error(payload.error);
+            });
+            letterField.value = letterField.value.trim();
+        } else {
+            const data = await response.json();
 
-        if (!response.ok) {
-            throw new Error(data.error || 'Failed to generate cover letter');
-        }
+            if (!response.ok) {
+                throw new Error(data.error || 'Failed to generate cover letter');
+            }
 
-        // Display the cover letter
-        document.getElementById('emailSubject').value = data.subject;
-        document.getElementById('coverLetterText').value = data.cover_letter;
-        document.getElementById('coverLetterContent').style.display = 'block';
+            // Display the cover letter
+            subjectField.value = data.subject;
+            letterField.value = data.cover_letter;
+            document.getElementById('coverLetterContent').style.display = 'block';
+        }
         
         showToast('Cover letter generated!', 'success');
 
@@ -1233,6 +1409,30 @@ async function generateCoverLetter() {
     }
 }
 
+// Read a Server-Sent Events response body, calling onEvent(event, data) per event
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const raw = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            let event = 'message';
+            let data = '';
+            raw.split('\n').forEach(line => {
+                if (line.startsWith('event: ')) event = line.slice(7);
+                if (line.startsWith('data: ')) data += line.slice(6);
+            });
+            onEvent(event, data ? JSON.parse(data) : {});
+        }
+    }
+}
+
 function openMailto() {
     const recruiterEmail = document.getElementById('recruiterEmail').value;
     const subject = document.getElementById('emailSubject').value;
@@ -0,0 +1,375 @@
+"""Fingerprinted, minified and precompressed static assets.
+
+The stylesheet and script are minified and named after a hash of their
+content (`css/style.3f9a1c2e7b.css`), then gzip- and, with the optional
+`brotli` package, brotli-compressed once. `/assets/<name>` serves the variant
+the client accepts, marked `immutable`, so returning visitors never revalidate
+them. Templates link to the current name with `asset_url('css/style.css')`.
+
+    python static_assets.py
+
+writes the build to `static/dist/` so deployments ship it ready-made. Without
+a build, or when a source file has changed since, assets are built in memory on
+first use.
+
+`init_app` also compresses the JSON of the endpoints it is given.
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+
+from flask import Response, abort, request, url_for
+
+from instrumentation import phase
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ASSETS = ('css/style.css', 'js/script.js')
+MIMETYPES = {'.css': 'text/css', '.js': 'text/javascript'}
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# JSON smaller than this fits in a packet or two either way
+MIN_COMPRESS_SIZE = 1024
+
+# Comments and string literals are matched first, so comment-like text inside
+# a string survives
+CSS_TOKEN_RE = re.compile(r'/\*.*?\*/|"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|[^"\'/]+|/', re.S)
+CSS_PUNCTUATION_RE = re.compile(r'\s*([{};,>])\s*')
+
+# After these a `/` starts a regex literal rather than a division
+REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+REGEX_KEYWORDS = frozenset(('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void',
+                            'throw', 'yield', 'await'))
+WORD_RE = re.compile(r'[\w$]+')
+
+
+def minify_css(source):
+    """Drop comments and redundant whitespace; string literals are kept as is."""
+    out, code = [], []
+    for token in CSS_TOKEN_RE.findall(source) + ['']:
+        if token.startswith('/*'):
+            code.append(' ')
+        elif token[:1] in ('"', "'") or not token:
+            text = CSS_PUNCTUATION_RE.sub(r'\1', re.sub(r'\s+', ' ', ''.join(code)))
+            out.append(re.sub(r':\s+', ':', text).replace(';}', '}'))
+            out.append(token)
+            code = []
+        else:
+            code.append(token)
+    return ''.join(out).strip() + '\n'
+
+
+def minify_js(source):
+    """Drop comments, indentation and blank lines from JavaScript.
+
+    Line breaks are kept, so automatic semicolon insertion behaves as before,
+    and string, template and regex literals are copied untouched.
+    """
+    out = []
+    # One entry per open `${`: the brace depth inside that template expression
+    templates = []
+    prev = ''  # last significant token: a punctuator, 'word' or 'operand'
+    word = ''
+    i, n = 0, len(source)
+    while i < n:
+        c = source[i]
+        if c.isspace() or source.startswith(('//', '/*'), i):
+            newline = False
+            while i < n:
+                if source[i].isspace():
+                    newline = newline or source[i] == '\n'
+                    i += 1
+                elif source.startswith('//', i):
+                    end = source.find('\n', i)
+                    i = n if end < 0 else end
+                elif source.startswith('/*', i):
+                    end = source.find('*/', i + 2)
+                    end = n if end < 0 else end + 2
+                    newline = newline or '\n' in source[i:end]
+                    i = end
+                else:
+                    break
+            if out and i < n:
+                if newline:
+                    out.append('\n')
+                elif _needs_space(out[-1][-1], source[i]):
+                    out.append(' ')
+            continue
+        if c in '\'"':
+            i = _copy(out, source, i, _string_end(source, i))
+            prev = 'operand'
+        elif c == '`' or (c == '}' and templates and templates[-1] == 0):
+            if c == '}':
+                templates.pop()
+            end, closed = _template_end(source, i + 1)
+            if not closed:
+                templates.append(0)
+            i = _copy(out, source, i, end)
+            prev = 'operand' if closed else '{'
+        elif c == '/' and (prev in REGEX_PRECEDERS or prev == '' or (prev == 'word' and word in REGEX_KEYWORDS)):
+            i = _copy(out, source, i, _regex_end(source, i))
+            prev = 'operand'
+        elif _is_word_char(c):
+            word = WORD_RE.match(source, i).group()
+            i = _copy(out, source, i, i + len(word))
+            prev = 'word'
+        else:
+            if templates and c in '{}':
+                templates[-1] += 1 if c == '{' else -1
+            out.append(c)
+            i += 1
+            prev = c
+    return ''.join(out).strip() + '\n'
+
+
+def _needs_space(before, after):
+    """Whether dropping the space between two tokens would change them."""
+    if _is_word_char(before) and _is_word_char(after):
+        return True
+    # `a - -b`, `a + +b` and a division followed by a regex
+    return before == after and before in '+-/'
+
+
+def _is_word_char(c):
+    return c == '_' or c == '$' or c.isalnum() or ord(c) > 127
+
+
+def _copy(out, source, start, end):
+    out.append(source[start:end])
+    return end
+
+
+def _string_end(source, i):
+    quote, i = source[i], i + 1
+    while i < len(source) and source[i] not in (quote, '\n'):
+        i += 2 if source[i] == '\\' else 1
+    return i + 1
+
+
+def _template_end(source, i):
+    """End of a template literal chunk: `(index, True)` after its closing
+    backtick, or `(index, False)` after a `${` that opens an expression."""
+    while i < len(source):
+        if source[i] == '\\':
+            i += 2
+        elif source[i] == '`':
+            return i + 1, True
+        elif source.startswith('${', i):
+            return i + 2, False
+        else:
+            i += 1
+    return i, True
+
+
+def _regex_end(source, i):
+    in_class, i = False, i + 1
+    while i < len(source) and source[i] != '\n':
+        c = source[i]
+        if c == '\\':
+            i += 1
+        elif c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            break
+        i += 1
+    i += 1
+    while i < len(source) and source[i].isalnum():
+        i += 1
+    return i
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+class Asset:
+    """One built asset: its fingerprinted name and every encoding of its body."""
+
+    def __init__(self, path, name, digest, source_digest, bodies):
+        self.path = path
+        self.name = name
+        self.digest = digest
+        self.source_digest = source_digest
+        self.bodies = bodies  # {'identity' | 'gzip' | 'br': bytes}
+        self.mimetype = MIMETYPES.get(os.path.splitext(path)[1], 'application/octet-stream')
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def build_asset(static_folder, path, brotli_quality=11):
+    with open(os.path.join(static_folder, path), 'rb') as f:
+        source = f.read()
+    stem, ext = os.path.splitext(path)
+    minify = MINIFIERS.get(ext)
+    body = minify(source.decode('utf-8')).encode('utf-8') if minify else source
+    digest = _digest(body)
+    bodies = {'identity': body, 'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        bodies['br'] = brotli.compress(body, quality=brotli_quality)
+    return Asset(path, f'{stem}.{digest[:10]}{ext}', digest, _digest(source), bodies)
+
+
+def encoding_suffix(encoding):
+    return {'identity': '', 'gzip': '.gz', 'br': '.br'}[encoding]
+
+
+def write_build(static_folder, dist_folder, paths=ASSETS):
+    """Build `paths` into `dist_folder` with a manifest; returns the assets."""
+    assets = [build_asset(static_folder, path) for path in paths]
+    manifest = {}
+    for asset in assets:
+        for encoding, body in asset.bodies.items():
+            target = os.path.join(dist_folder, asset.name + encoding_suffix(encoding))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, 'wb') as f:
+                f.write(body)
+        manifest[asset.path] = {'name': asset.name, 'digest': asset.digest, 'source_digest': asset.source_digest,
+                                'encodings': sorted(asset.bodies)}
+    with open(os.path.join(dist_folder, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return assets
+
+
+class AssetPipeline:
+    """Assets for one static folder, loaded from its build or built in memory."""
+
+    def __init__(self, static_folder, dist_folder=None, paths=ASSETS):
+        self.static_folder = static_folder
+        self.dist_folder = dist_folder or os.path.join(static_folder, 'dist')
+        self.paths = paths
+        self._assets = None
+        self._by_name = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(os.path.join(self.dist_folder, 'manifest.json')) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+        assets = {}
+        for path in self.paths:
+            assets[path] = self._load_built(path, manifest.get(path)) or build_asset(
+                self.static_folder, path, brotli_quality=5)
+        return assets
+
+    def _load_built(self, path, entry):
+        """The asset from the build, or None if it is missing or stale."""
+        if not entry:
+            return None
+        try:
+            with open(os.path.join(self.static_folder, path), 'rb') as f:
+                if _digest(f.read()) != entry['source_digest']:
+                    return None
+            bodies = {}
+            for encoding in entry['encodings']:
+                with open(os.path.join(self.dist_folder, entry['name'] + encoding_suffix(encoding)), 'rb') as f:
+                    bodies[encoding] = f.read()
+        except (OSError, KeyError) as e:
+            print(f"Error loading built asset {path}: {e}")
+            return None
+        return Asset(path, entry['name'], entry['digest'], entry['source_digest'], bodies)
+
+    def assets(self):
+        with self._lock:
+            if self._assets is None:
+                self._assets = self._load()
+                self._by_name = {asset.name: asset for asset in self._assets.values()}
+            return self._assets
+
+    def get(self, path):
+        return self.assets()[path]
+
+    def find(self, name):
+        """The asset served as `name`, and whether `name` is its current fingerprint."""
+        self.assets()
+        asset = self._by_name.get(name)
+        if asset is not None:
+            return asset, True
+        # A page from before a deploy asking for an older build
+        stem, ext = os.path.splitext(name)
+        return self._assets.get(os.path.splitext(stem)[0] + ext), False
+
+
+def preferred_encoding(available):
+    """The best encoding in `available` that the current request accepts."""
+    for encoding in ('br', 'gzip'):
+        if encoding in available and request.accept_encodings[encoding] > 0:
+            return encoding
+    return 'identity'
+
+
+def compress_response(response):
+    """Compress a buffered JSON response for clients that accept it."""
+    response.vary.add('Accept-Encoding')
+    if (response.status_code != 200 or response.is_streamed or response.direct_passthrough
+            or response.mimetype != 'application/json' or 'Content-Encoding' in response.headers):
+        return response
+    body = response.get_data()
+    if len(body) < MIN_COMPRESS_SIZE:
+        return response
+    encoding = preferred_encoding(('br', 'gzip') if brotli is not None else ('gzip',))
+    if encoding == 'identity':
+        return response
+    with phase('compress', encoding):
+        if encoding == 'br':
+            response.set_data(brotli.compress(body, quality=4))
+        else:
+            response.set_data(gzip.compress(body, compresslevel=6, mtime=0))
+    response.headers['Content-Encoding'] = encoding
+    # The compressed bytes are a different representation of the same version
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_app(app, compress_endpoints=()):
+    """Install `/assets/<name>`, the `asset_url()` template helper and JSON
+    compression for `compress_endpoints`."""
+    pipeline = AssetPipeline(app.static_folder)
+    app.extensions['static_assets'] = pipeline
+
+    @app.context_processor
+    def asset_helpers():
+        return {'asset_url': lambda path: url_for('static_asset', name=pipeline.get(path).name)}
+
+    @app.route('/assets/<path:name>')
+    def static_asset(name):
+        asset, current = pipeline.find(name)
+        if asset is None:
+            abort(404)
+        encoding = preferred_encoding(asset.bodies)
+        response = Response(asset.bodies[encoding], mimetype=asset.mimetype)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.set_etag(f'{asset.digest[:16]}-{encoding}')
+        # An outdated fingerprint gets today's content, which must not be pinned
+        response.headers['Cache-Control'] = IMMUTABLE if current else 'no-cache'
+        return response.make_conditional(request)
+
+    @app.after_request
+    def compress_json(response):
+        if request.endpoint in compress_endpoints:
+            return compress_response(response)
+        return response
+
+
+if __name__ == '__main__':
+    static_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+    dist_folder = sys.argv[1] if len(sys.argv) > 1 else os.path.join(static_folder, 'dist')
+    for asset in write_build(static_folder, dist_folder):
+        with open(os.path.join(static_folder, asset.path), 'rb') as f:
+            size = len(f.read())
+        sizes = ', '.join(f'{encoding} {len(body):,}' for encoding, body in sorted(asset.bodies.items()))
+        print(f"{asset.path} -> {asset.name}: source {size:,} B; {sizes}")
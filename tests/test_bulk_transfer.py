@@ -0,0 +1,50 @@
+"""import_lines against an in-memory table."""
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bulk_transfer import import_lines
+
+USERS = [str(uuid.UUID(int=n + 1)) for n in range(4)]
+
+
+def lines(records):
+    return [(n, json.dumps(record).encode()) for n, record in enumerate(records, 1)]
+
+
+def test_a_later_line_wins_across_batches():
+    table, lock = {}, threading.Lock()
+
+    def write_batch(rows):
+        # Earlier batches are slower, so unordered writes would land last
+        time.sleep(0.05 if rows[0]['data']['n'] < 2 else 0)
+        with lock:
+            table.update((row['user_id'], row['data']['n']) for row in rows)
+
+    records = [{'user_id': USERS[n % 2], 'data': {'n': n}} for n in range(4)]
+    summary = import_lines(lines(records), write_batch, batch_size=1, concurrency=4)
+
+    assert summary['imported'] == 4
+    assert table == {USERS[0]: 2, USERS[1]: 3}
+
+
+def test_batches_of_different_users_still_overlap():
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def write_batch(rows):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+
+    records = [{'user_id': user, 'data': {}} for user in USERS]
+    import_lines(lines(records), write_batch, batch_size=1, concurrency=4)
+
+    assert peak[0] > 1
@@ -0,0 +1,92 @@
+"""/analyze-jd and /generate-cover-letter against the fake Gemini model."""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+import fakes.genai as fake_genai
+from fakes.genai import FakeGenerativeModel
+
+POSTING = 'Software Engineer at Example Corp. Python, Flask and PostgreSQL. 3+ years.'
+
+
+@pytest.fixture(scope='module')
+def resume_app():
+    # Module-scoped, so pytest's function-scoped `monkeypatch` cannot be used;
+    # everything set here is undone when the module's tests are done
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('GEMINI_API_KEY', 'test-key')
+        mp.setenv('JD_CACHE_PATH', '')
+        mp.setenv('RESUME_FLUSH_INTERVAL', '0')
+        import app as resume_app
+        mp.setattr(resume_app, 'genai', fake_genai)
+        mp.setattr(FakeGenerativeModel, 'latency', 0.0)
+        mp.setattr(FakeGenerativeModel, 'failure_rate', 0.0)
+        yield resume_app
+
+
+@pytest.fixture
+def client(resume_app):
+    resume_app.jd_cache.memory.clear()
+    FakeGenerativeModel.reset_counters()
+    client = resume_app.app.test_client()
+    with client.session_transaction() as s:
+        s['user'] = 'test-user'
+    return client
+
+
+def test_analyze_jd_parses_the_answer(client):
+    response = client.post('/analyze-jd', data={'jd_text': POSTING})
+
+    assert response.status_code == 200
+    analysis = response.get_json()
+    assert analysis['job_title'] == 'Software Engineer'
+    assert analysis['company_name'] == 'Example Corp'
+    assert 'Python' in analysis['skills']
+    assert FakeGenerativeModel.calls == 1
+
+
+def test_analyze_jd_serves_repeats_from_cache(resume_app, client):
+    hits = resume_app.jd_cache.stats()['hits']
+    first = client.post('/analyze-jd', data={'jd_text': POSTING}).get_json()
+    # Same posting up to whitespace and case
+    second = client.post('/analyze-jd', data={'jd_text': '  ' + POSTING.upper().replace(' ', '\n') + '\n'})
+
+    assert second.status_code == 200
+    assert second.get_json() == first
+    assert FakeGenerativeModel.calls == 1
+    assert resume_app.jd_cache.stats()['hits'] == hits + 1
+
+
+def test_analyze_jd_requires_a_posting(client):
+    response = client.post('/analyze-jd', data={})
+
+    assert response.status_code == 400
+    assert FakeGenerativeModel.calls == 0
+
+
+def test_generate_cover_letter(client):
+    response = client.post('/generate-cover-letter', json={
+        'job_title': 'Software Engineer',
+        'company_name': 'Example Corp',
+        'user_name': 'Alex Example',
+        'user_skills': 'Python, Flask',
+    })
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['cover_letter'].startswith('Dear Hiring Manager')
+    assert 'Software Engineer' in body['subject']
+    assert FakeGenerativeModel.calls == 1
+
+
+def test_generate_cover_letter_calls_the_model_every_time(client):
+    payload = {'job_title': 'Software Engineer', 'company_name': 'Example Corp'}
+    letters = [client.post('/generate-cover-letter', json=payload).get_json()['cover_letter'] for _ in range(2)]
+
+    # Letters are not cached; the fake model answers the same prompt the same way
+    assert letters[0] == letters[1]
+    assert FakeGenerativeModel.calls == 2
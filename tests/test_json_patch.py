@@ -0,0 +1,42 @@
+"""The RFC 6902 `test` operation compares values as JSON does."""
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from json_patch import JSONPatchError, apply_json_patch, diff_json
+
+DOC = {'count': 1, 'ratio': 1.5, 'flag': True, 'tags': ['a', 1], 'none': None}
+
+
+@pytest.mark.parametrize('path, value', [
+    ('/count', 1),
+    ('/count', 1.0),
+    ('/ratio', 1.5),
+    ('/flag', True),
+    ('/tags', ['a', 1.0]),
+    ('/none', None),
+])
+def test_equal_values_pass(path, value):
+    assert apply_json_patch(DOC, [{'op': 'test', 'path': path, 'value': value}]) == DOC
+
+
+@pytest.mark.parametrize('path, value', [
+    ('/count', True),
+    ('/flag', 1),
+    ('/flag', 1.0),
+    ('/count', '1'),
+    ('/tags', ['a', True]),
+    ('/tags', {'0': 'a', '1': 1}),
+    ('/none', False),
+    ('/none', 0),
+])
+def test_values_of_another_json_type_fail(path, value):
+    with pytest.raises(JSONPatchError):
+        apply_json_patch(DOC, [{'op': 'test', 'path': path, 'value': value}])
+
+
+def test_diff_keeps_int_and_float_apart():
+    assert diff_json({'n': 1}, {'n': 1.0}) == [{'op': 'replace', 'path': '/n', 'value': 1.0}]
@@ -0,0 +1,127 @@
+"""LLMCache: single flight, expiry, the SQLite tier and failures."""
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_cache import LLMCache
+
+CALLERS = 8
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.001)
+
+
+class Upstream:
+    """compute() stand-in that counts calls and can be held until released."""
+
+    def __init__(self, value='answer', error=None):
+        self.value = value
+        self.error = error
+        self.calls = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self):
+        self.calls += 1
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+def test_concurrent_misses_make_one_upstream_call():
+    cache, upstream = LLMCache(), Upstream()
+    upstream.release.clear()
+
+    with ThreadPoolExecutor(max_workers=CALLERS) as pool:
+        results = [pool.submit(cache.get_or_compute, 'k', upstream) for _ in range(CALLERS)]
+        # Hold the first call until every other caller is waiting on it
+        wait_for(lambda: cache.shared == CALLERS - 1)
+        upstream.release.set()
+        values = [r.result() for r in results]
+
+    assert values == ['answer'] * CALLERS
+    assert upstream.calls == 1
+    assert cache.stats()['upstream_calls'] == 1
+
+
+def test_concurrent_async_misses_make_one_upstream_call():
+    cache, calls = LLMCache(), []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return 'answer'
+
+    async def main():
+        return await asyncio.gather(*(cache.aget_or_compute('k', compute) for _ in range(CALLERS)))
+
+    assert asyncio.run(main()) == ['answer'] * CALLERS
+    assert len(calls) == 1
+    assert cache.shared == CALLERS - 1
+
+
+def test_entries_expire_after_the_ttl():
+    cache, upstream = LLMCache(ttl=0.05), Upstream()
+    cache.get_or_compute('k', upstream)
+    cache.get_or_compute('k', upstream)
+    assert upstream.calls == 1
+
+    time.sleep(0.1)
+    cache.get_or_compute('k', upstream)
+
+    assert upstream.calls == 2
+
+
+def test_sqlite_tier_survives_a_restart(tmp_path):
+    path = str(tmp_path / 'llm.sqlite3')
+    first = LLMCache(path=path)
+    first.get_or_compute('k', Upstream({'skills': ['Python']}))
+
+    second, upstream = LLMCache(path=path), Upstream()
+    value = second.get_or_compute('k', upstream)
+
+    assert value == {'skills': ['Python']}
+    assert upstream.calls == 0
+    assert second.stats()['disk_hits'] == 1
+    assert second.stats()['path'] == path
+
+
+def test_sqlite_tier_drops_expired_rows(tmp_path):
+    path = str(tmp_path / 'llm.sqlite3')
+    LLMCache(ttl=0.05, path=path).get_or_compute('k', Upstream())
+    time.sleep(0.1)
+
+    upstream = Upstream()
+    LLMCache(ttl=0.05, path=path).get_or_compute('k', upstream)
+
+    assert upstream.calls == 1
+
+
+def test_failures_are_shared_but_not_cached():
+    cache, failing = LLMCache(), Upstream(error=RuntimeError('503 overloaded'))
+    failing.release.clear()
+
+    with ThreadPoolExecutor(max_workers=CALLERS) as pool:
+        results = [pool.submit(cache.get_or_compute, 'k', failing) for _ in range(CALLERS)]
+        wait_for(lambda: cache.shared == CALLERS - 1)
+        failing.release.set()
+        for r in results:
+            with pytest.raises(RuntimeError):
+                r.result()
+    assert failing.calls == 1
+
+    upstream = Upstream()
+    assert cache.get_or_compute('k', upstream) == 'answer'
+    assert upstream.calls == 1
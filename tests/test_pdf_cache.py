@@ -0,0 +1,63 @@
+"""PDFCache's on-disk tier."""
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_cache import PDFCache
+
+
+def age(cache, key, seconds):
+    then = time.time() - seconds
+    os.utime(cache._path(key), (then, then))
+
+
+def test_files_live_under_the_render_version(tmp_path):
+    (tmp_path / 'v1').mkdir()
+    (tmp_path / 'v1' / 'old.pdf').write_bytes(b'old')
+    (tmp_path / 'flat.pdf').write_bytes(b'old')
+
+    cache = PDFCache(directory=str(tmp_path), version=2)
+    cache.set('k', b'pdf')
+
+    assert sorted(os.listdir(tmp_path)) == ['v2']
+    assert (tmp_path / 'v2' / 'k.pdf').read_bytes() == b'pdf'
+
+
+def test_least_recently_used_files_go_first(tmp_path):
+    cache = PDFCache(maxsize=1, directory=str(tmp_path), disk_maxbytes=350)
+    for n, key in enumerate('abc'):
+        cache.set(key, b'x' * 100)
+        age(cache, key, 100 - n)
+    cache.memory.clear()
+    assert cache.get('a') == b'x' * 100  # a disk hit makes it the newest
+
+    cache.set('d', b'x' * 100)
+
+    assert sorted(os.listdir(cache.directory)) == ['a.pdf', 'c.pdf', 'd.pdf']
+    assert cache.stats()['disk_bytes'] == 300
+    assert cache.stats()['disk_evictions'] == 1
+
+
+def test_unused_files_expire(tmp_path):
+    cache = PDFCache(directory=str(tmp_path), disk_ttl=60)
+    cache.set('old', b'old')
+    cache.set('new', b'new')
+    age(cache, 'old', 120)
+
+    cache.prune()
+
+    assert os.listdir(cache.directory) == ['new.pdf']
+
+
+def test_write_errors_are_counted_but_printed_once(tmp_path, capsys):
+    cache = PDFCache(directory=str(tmp_path))
+    os.rmdir(cache.directory)
+
+    for n in range(5):
+        cache.set(str(n), b'pdf')
+
+    assert cache.stats()['disk_errors'] == 5
+    assert capsys.readouterr().out.count('Error writing PDF cache') == 1
+    assert cache.get('4') == b'pdf'  # still served from memory
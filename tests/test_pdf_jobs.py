@@ -0,0 +1,41 @@
+"""JobQueue capacity: a batch starts whole or not at all."""
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_jobs import JobQueue, QueueFull
+
+
+@pytest.fixture
+def queue():
+    queue = JobQueue(workers=1, max_pending=2, sync_max_bytes=0)
+    yield queue
+    if queue._pool is not None:
+        queue._pool.shutdown()
+
+
+def test_a_batch_over_capacity_starts_nothing(queue):
+    with pytest.raises(QueueFull):
+        queue.start_all([(pow, (2, n)) for n in range(3)], size=1)
+
+    stats = queue.stats()
+    assert (stats['pending'], stats['submitted'], stats['rejected']) == (0, 0, 1)
+    assert queue._pool is None
+
+
+def test_a_batch_within_capacity_runs_in_order(queue):
+    futures = queue.start_all([(pow, (2, n)) for n in range(2)], size=1)
+
+    assert [f.result(timeout=30) for f in futures] == [1, 2]
+    assert queue.stats()['submitted'] == 2
+
+
+def test_small_inputs_run_inline(queue):
+    futures = queue.start_all([(pow, (2, 3))], size=0)
+
+    assert futures[0].result() == 8
+    assert queue.stats()['inline'] == 1
+    assert queue._pool is None
@@ -0,0 +1,174 @@
+import atexit
+import threading
+
+
+class VersionConflict(Exception):
+    """Raised by a conditional write whose base version is no longer stored."""
+
+
+class WriteBehindBuffer:
+    """Coalesces resume saves per user and writes them on a fixed cadence.
+
+    Only the newest pending document per user is kept, so a burst of autosaves
+    costs at most one database write per user per flush window. With an
+    interval of 0 every `put()` is written through immediately. A document
+    stays pending, and readable through `get()`, until its write succeeds; one
+    that fails `max_attempts` writes in a row is dropped.
+
+    `put_if()` queues a save made against a known version. Its write only
+    replaces the stored row if that version is still stored, so a save from
+    another worker in between is not overwritten; `write` raises
+    `VersionConflict` then and the document is dropped.
+    """
+
+    def __init__(self, write, interval=5.0, max_attempts=3):
+        self.write = write  # write(db, user_id, data, version, base); base None writes unconditionally
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.enqueued = 0
+        self.coalesced = 0
+        self.flushed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.conflicts = 0
+        self.discarded = 0
+
+    @property
+    def enabled(self):
+        return self.interval > 0
+
+    def start(self):
+        if not self.enabled or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='resume-write-behind', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        self._stop.set()
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def put(self, user_id, db, data, version):
+        """Queue the newest document for a user (or write it now if disabled)."""
+        if not self.enabled:
+            self.write(db, user_id, data, version, None)
+            return
+        with self._lock:
+            if user_id in self._pending:
+                self.coalesced += 1
+            self._pending[user_id] = (db, data, version, None, 0)
+            self.enqueued += 1
+
+    def put_if(self, user_id, db, data, expected_version, version):
+        """Queue a save made against `expected_version`; False if that is no longer current.
+
+        `expected_version` is the version the caller last read: the pending one,
+        or the stored one when nothing was pending.
+        """
+        if not self.enabled:
+            try:
+                self.write(db, user_id, data, version, expected_version)
+                return True
+            except VersionConflict:
+                return False
+        with self._lock:
+            entry = self._pending.get(user_id)
+            if entry is not None and entry[2] != expected_version:
+                return False
+            # A coalesced save keeps the base of the save it replaces
+            base = entry[3] if entry is not None else expected_version
+            if entry is not None:
+                self.coalesced += 1
+            self._pending[user_id] = (db, data, version, base, 0)
+            self.enqueued += 1
+            return True
+
+    def replace(self, user_id, db, data, expected_version, version):
+        """Swap a pending document only if it is still at `expected_version`."""
+        with self._lock:
+            entry = self._pending.get(user_id)
+            if entry is None or entry[2] != expected_version:
+                return False
+            self._pending[user_id] = (db, data, version, entry[3], 0)
+            self.enqueued += 1
+            self.coalesced += 1
+            return True
+
+    def discard(self, user_ids):
+        """Drop pending documents for `user_ids`; returns how many were dropped.
+
+        Waits for a flush in progress, so none of them is still being written
+        when this returns.
+        """
+        with self._flush_lock, self._lock:
+            dropped = [uid for uid in user_ids if self._pending.pop(uid, None) is not None]
+            self.discarded += len(dropped)
+        return len(dropped)
+
+    def get(self, user_id):
+        """Return `(data, version)` of a pending document, or None."""
+        with self._lock:
+            entry = self._pending.get(user_id)
+        return (entry[1], entry[2]) if entry else None
+
+    def flush(self, user_id=None):
+        """Write pending documents now; all users when `user_id` is None."""
+        with self._flush_lock:
+            with self._lock:
+                if user_id is None:
+                    batch = dict(self._pending)
+                else:
+                    entry = self._pending.get(user_id)
+                    batch = {user_id: entry} if entry else {}
+
+            for uid, entry in batch.items():
+                db, data, version, base, attempts = entry
+                try:
+                    self.write(db, uid, data, version, base)
+                    self.flushed += 1
+                    with self._lock:
+                        # A save that came in during the write stays queued
+                        if self._pending.get(uid) is entry:
+                            del self._pending[uid]
+                except VersionConflict:
+                    self.conflicts += 1
+                    print(f"Dropping resume for {uid}: version {base} was replaced by another save")
+                    with self._lock:
+                        if self._pending.get(uid) is entry:
+                            del self._pending[uid]
+                except Exception as e:
+                    self.failed += 1
+                    print(f"Error flushing resume for {uid}: {e}")
+                    with self._lock:
+                        if self._pending.get(uid) is not entry:
+                            continue  # a newer save replaced it and gets its own attempts
+                        if attempts + 1 >= self.max_attempts:
+                            del self._pending[uid]
+                            self.dropped += 1
+                            print(f"Dropping resume for {uid} after {attempts + 1} failed writes")
+                        else:
+                            self._pending[uid] = (db, data, version, base, attempts + 1)
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            'interval': self.interval,
+            'pending': pending,
+            'enqueued': self.enqueued,
+            'coalesced': self.coalesced,
+            'flushed': self.flushed,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'conflicts': self.conflicts,
+            'discarded': self.discarded,
+        }